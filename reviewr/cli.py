@@ -1,5 +1,4 @@
 import sys
-import asyncio
 from pathlib import Path
 from typing import Optional, List
 import click
@@ -11,6 +10,7 @@ from .config.defaults import DEFAULT_CONFIG_TEMPLATE_YAML, DEFAULT_CONFIG_TEMPLA
 from .providers import ReviewType, ProviderFactory
 from .review.orchestrator import ReviewOrchestrator
 from .utils.formatters import TerminalFormatter, MarkdownFormatter
+from .utils.event_loop import run_async
 
 console = Console()
 
@@ -276,7 +276,7 @@ def cli(path: Optional[str], security: bool, performance: bool,
             console.print(f"[blue]Min severity:[/blue] {min_severity}")
 
         # Run review
-        result = asyncio.run(_run_review(
+        result = run_async(_run_review(
             config=cfg,
             path=path,
             review_types=review_types,
@@ -513,7 +513,13 @@ async def _run_review(
         if not provider_config:
             raise ValueError(f"Provider '{provider_name}' not configured")
 
-        provider = ProviderFactory.create_provider(provider_name, provider_config)
+        # Responses to unchanged code are reused across runs unless --no-cache
+        response_cache = None
+        if use_cache:
+            from .utils.cache import LLMResponseCache
+            response_cache = LLMResponseCache()
+
+        provider = ProviderFactory.create_provider(provider_name, provider_config, response_cache)
 
     # Create diff analyzer if needed
     diff_analyzer = None
@@ -3,7 +3,6 @@ CLI commands for Bitbucket integration.
 """
 
 import sys
-import asyncio
 from pathlib import Path
 from typing import Optional, List
 import click
@@ -12,6 +11,7 @@ from rich.console import Console
 from .config import ConfigLoader
 from .providers import ReviewType, ProviderFactory
 from .review.orchestrator import ReviewOrchestrator
+from .utils.event_loop import run_async
 from .integrations.bitbucket import BitbucketIntegration, BitbucketReviewStatus
 
 console = Console()
@@ -149,7 +149,7 @@ def review(
         
         # Run review
         console.print("[blue]Running code review...[/blue]")
-        result = asyncio.run(orchestrator.review_path(
+        result = run_async(orchestrator.review_path(
             path='.',
             review_types=review_types,
             language=None
@@ -1,5 +1,4 @@
 import sys
-import asyncio
 import os
 from pathlib import Path
 from typing import Optional, List
@@ -9,6 +8,7 @@ from rich.console import Console
 from .config import ConfigLoader
 from .providers import ReviewType, ProviderFactory
 from .review.orchestrator import ReviewOrchestrator
+from .utils.event_loop import run_async
 from .integrations.github import GitHubIntegration, GitHubReviewStatus
 
 console = Console()
@@ -169,7 +169,7 @@ def github_pr(
             return
         
         # Run review
-        result = asyncio.run(orchestrator.review_files(files_to_review, review_types))
+        result = run_async(orchestrator.review_files(files_to_review, review_types))
         
         # Display summary
         console.print(f"\n[bold]Review Complete![/bold]")
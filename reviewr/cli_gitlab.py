@@ -1,6 +1,5 @@
 """GitLab CLI integration for reviewr."""
 
-import asyncio
 import sys
 from pathlib import Path
 from typing import List, Optional
@@ -12,6 +11,7 @@ from .config.loader import load_config
 from .providers.factory import create_provider
 from .providers.base import ReviewType
 from .review.orchestrator import ReviewOrchestrator
+from .utils.event_loop import run_async
 from .integrations.gitlab import GitLabIntegration, GitLabReviewStatus
 
 
@@ -180,7 +180,7 @@ def gitlab_mr(
             return result
         
         # Run async review
-        result = asyncio.run(review_files())
+        result = run_async(review_files())
         
         console.print(f"[green]Review complete! Found {len(result.findings)} finding(s)[/green]")
         
@@ -3,7 +3,6 @@ Jenkins CLI commands for reviewr.
 """
 
 import sys
-import asyncio
 from pathlib import Path
 from typing import Optional
 import click
@@ -17,6 +16,7 @@ from .integrations.jenkins import (
 )
 from .config import ConfigLoader
 from .providers import ReviewType
+from .utils.event_loop import run_async
 
 console = Console()
 
@@ -84,7 +84,7 @@ def review_command(
         config = ReviewrConfig()
         
         # Run the review
-        result = asyncio.run(_run_review(
+        result = run_async(_run_review(
             config=config,
             path=path,
             review_types=[ReviewType.SECURITY, ReviewType.CORRECTNESS, ReviewType.MAINTAINABILITY],
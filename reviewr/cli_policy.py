@@ -194,12 +194,12 @@ def check_policies(path: str, scope: str, branch: Optional[str], verbose: bool):
         reviewr policy check --branch main --verbose
     """
     from .cli import run_review_internal
-    import asyncio
+    from .utils.event_loop import run_async
     
     try:
         # Run review to get findings
         console.print("[dim]Running code review...[/dim]")
-        findings = asyncio.run(run_review_internal(path, verbose=verbose))
+        findings = run_async(run_review_internal(path, verbose=verbose))
         
         # Get files
         from pathlib import Path
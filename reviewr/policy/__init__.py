@@ -10,6 +10,7 @@ from .engine import PolicyEngine, PolicyViolation, PolicyResult
 from .rules import (
     PolicyRule,
     RuleViolation,
+    FindingIndex,
     SeverityRule,
     FilePatternRule,
     ComplexityRule,
@@ -41,6 +42,7 @@ __all__ = [
     # Rules
     'PolicyRule',
     'RuleViolation',
+    'FindingIndex',
     'SeverityRule',
     'FilePatternRule',
     'ComplexityRule',
@@ -3,15 +3,78 @@ Core policy enforcement engine.
 """
 
 from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional
+from functools import lru_cache
+from typing import List, Dict, Any, Optional, Set, Tuple
 from pathlib import Path
 import fnmatch
+import os
+import re
 
-from .schema import Policy, PolicyConfig, PolicyScope, PolicyAction, PolicyEnforcement
-from .rules import PolicyRule, RuleViolation
+from .schema import (
+    Policy, PolicyScope, PolicyAction, PolicyEnforcement, ENTERPRISE_POLICIES
+)
+from .rules import PolicyRule, RuleViolation, FindingIndex, DATACLASS_SLOTS
 
 
-@dataclass
+_SEVERITY_ORDER = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1, 'info': 0}
+_ORDER_TO_SEVERITY = ('info', 'low', 'medium', 'high', 'critical')
+
+
+@lru_cache(maxsize=256)
+def _glob_alternation(patterns: Tuple[str, ...]) -> str:
+    """Translate glob patterns into a single regex alternation (memoized per pattern set)."""
+    return '|'.join(fnmatch.translate(os.path.normcase(p)) for p in patterns)
+
+
+def _policy_pattern_group(name: str, patterns: List[str]) -> str:
+    """
+    Build an optional lookahead group that captures when any pattern matches.
+    
+    Lookaheads don't consume input, so a single match against a regex made of
+    these groups reports every policy whose patterns match the path.
+    """
+    return f'(?:(?=(?P<{name}>{_glob_alternation(tuple(patterns))})))?'
+
+
+def _combinable(patterns: List[str]) -> bool:
+    """
+    Whether patterns can join the combined index.
+    
+    Before Python 3.11, fnmatch.translate() emits its own named groups for
+    patterns with several '*'; those would clash between policies sharing
+    patterns, so such policies are matched with fnmatch instead.
+    """
+    return not patterns or '(?P<' not in _glob_alternation(tuple(patterns))
+
+
+def _matches_any(path: str, patterns: List[str]) -> bool:
+    """Whether a (normcased) path matches any glob pattern."""
+    return any(fnmatch.fnmatchcase(path, os.path.normcase(p)) for p in patterns)
+
+
+# The built-in templates are registered by most deployments, so translate their
+# globs once at import rather than on the first file index rebuild
+for _config in ENTERPRISE_POLICIES.values():
+    for _patterns in (_config.file_patterns, _config.exclude_patterns):
+        if _patterns:
+            _glob_alternation(tuple(_patterns))
+
+
+def _rule_violation_to_dict(rv: RuleViolation) -> Dict[str, Any]:
+    """Convert a rule violation to a dictionary."""
+    return {
+        'rule_id': rv.rule_id,
+        'rule_name': rv.rule_name,
+        'severity': rv.severity,
+        'message': rv.message,
+        'file_path': rv.file_path,
+        'line_number': rv.line_number,
+        'suggestion': rv.suggestion,
+        'metadata': rv.metadata,
+    }
+
+
+@dataclass(**DATACLASS_SLOTS)
 class PolicyViolation:
     """A violation of a policy."""
     policy_id: str
@@ -30,16 +93,11 @@ class PolicyViolation:
         if not self.rule_violations:
             return "low"
         
-        severity_order = {'critical': 4, 'high': 3, 'medium': 2, 'low': 1, 'info': 0}
         max_severity = max(
-            (severity_order.get(v.severity, 0) for v in self.rule_violations),
+            (_SEVERITY_ORDER.get(v.severity, 0) for v in self.rule_violations),
             default=0
         )
-        
-        for sev, order in severity_order.items():
-            if order == max_severity:
-                return sev
-        return "low"
+        return _ORDER_TO_SEVERITY[max_severity]
     
     @property
     def should_block(self) -> bool:
@@ -52,7 +110,7 @@ class PolicyViolation:
         return False
 
 
-@dataclass
+@dataclass(**DATACLASS_SLOTS)
 class PolicyResult:
     """Result of policy evaluation."""
     passed: bool
@@ -62,21 +120,10 @@ class PolicyResult:
     approval_teams: List[str] = field(default_factory=list)
     approval_roles: List[str] = field(default_factory=list)
     metadata: Dict[str, Any] = field(default_factory=dict)
-    
-    @property
-    def should_block(self) -> bool:
-        """Check if any violation should block the operation."""
-        return any(v.should_block for v in self.violations)
-    
-    @property
-    def critical_violations(self) -> List[PolicyViolation]:
-        """Get critical violations."""
-        return [v for v in self.violations if v.severity == 'critical']
-    
-    @property
-    def high_violations(self) -> List[PolicyViolation]:
-        """Get high severity violations."""
-        return [v for v in self.violations if v.severity == 'high']
+    # Populated by PolicyEngine.evaluate() as violations are recorded
+    should_block: bool = False
+    critical_violations: List[PolicyViolation] = field(default_factory=list)
+    high_violations: List[PolicyViolation] = field(default_factory=list)
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary."""
@@ -90,24 +137,12 @@ class PolicyResult:
                 {
                     'policy_id': v.policy_id,
                     'policy_name': v.policy_name,
-                    'action': v.action.value if hasattr(v.action, 'value') else str(v.action),
-                    'enforcement': v.enforcement.value if hasattr(v.enforcement, 'value') else str(v.enforcement),
+                    'action': v.action.value,
+                    'enforcement': v.enforcement.value,
                     'severity': v.severity,
                     'can_override': v.can_override,
                     'requires_approval': v.requires_approval,
-                    'rule_violations': [
-                        {
-                            'rule_id': rv.rule_id,
-                            'rule_name': rv.rule_name,
-                            'severity': rv.severity,
-                            'message': rv.message,
-                            'file_path': rv.file_path,
-                            'line_number': rv.line_number,
-                            'suggestion': rv.suggestion,
-                            'metadata': rv.metadata,
-                        }
-                        for rv in v.rule_violations
-                    ]
+                    'rule_violations': list(map(_rule_violation_to_dict, v.rule_violations)),
                 }
                 for v in self.violations
             ],
@@ -120,23 +155,35 @@ class PolicyEngine:
     """Core policy enforcement engine."""
     
     def __init__(self):
+        """Initialize policy engine."""
         self.policies: Dict[str, Policy] = {}
         self.rules: Dict[str, PolicyRule] = {}
+        self._rules_by_cost: Dict[str, List[PolicyRule]] = {}
+        self._file_index: Optional[Tuple[Any, ...]] = None
+        self._branch_filters: Dict[str, Tuple[frozenset, frozenset]] = {}
     
     def register_policy(self, policy: Policy) -> None:
         """Register a policy."""
         self.policies[policy.id] = policy
+        self._branch_filters[policy.id] = (
+            frozenset(policy.config.branches or ()),
+            frozenset(policy.config.exclude_branches or ()),
+        )
+        self._rules_by_cost.pop(policy.id, None)
+        self._file_index = None
     
     def register_rule(self, rule: PolicyRule) -> None:
         """Register a rule."""
         self.rules[rule.rule_id] = rule
+        self._rules_by_cost.clear()
     
     def evaluate(
         self,
         context: Dict[str, Any],
         scope: PolicyScope,
         branch: Optional[str] = None,
-        files: Optional[List[str]] = None
+        files: Optional[List[str]] = None,
+        fail_fast: bool = False
     ) -> PolicyResult:
         """
         Evaluate policies against the given context.
@@ -146,11 +193,20 @@ class PolicyEngine:
             scope: Scope to evaluate (pre-commit, pull-request, etc.)
             branch: Current branch name
             files: List of files being evaluated
+            fail_fast: Stop evaluating once the result is blocked and no
+                remaining policy can add approval requirements, and skip a
+                strict blocking policy's remaining rules after a critical
+                violation
             
         Returns:
             PolicyResult with violations and recommendations
         """
         result = PolicyResult(passed=True)
+        approval_teams = set()
+        approval_roles = set()
+        
+        # Index findings once, shared by every rule in this evaluation
+        index = FindingIndex.from_context(context)
         
         # Get applicable policies
         applicable_policies = self._get_applicable_policies(scope, branch, files)
@@ -159,27 +215,44 @@ class PolicyEngine:
         applicable_policies.sort(key=lambda p: p.config.priority, reverse=True)
         
         # Evaluate each policy
-        for policy in applicable_policies:
+        for i, policy in enumerate(applicable_policies):
             if not policy.config.enabled:
                 continue
             
-            violation = self._evaluate_policy(policy, context)
+            violation = self._evaluate_policy(policy, context, fail_fast, index)
             
             if violation and violation.rule_violations:
                 result.violations.append(violation)
                 
+                severity = violation.severity
+                if severity == 'critical':
+                    result.critical_violations.append(violation)
+                elif severity == 'high':
+                    result.high_violations.append(violation)
+                
                 if violation.should_block:
                     result.passed = False
+                    result.should_block = True
                 
                 if violation.requires_approval:
                     result.requires_approval = True
-                    result.approval_teams.extend(violation.approval_teams)
-                    result.approval_roles.extend(violation.approval_roles)
+                    approval_teams.update(violation.approval_teams)
+                    approval_roles.update(violation.approval_roles)
                 
                 if violation.action == PolicyAction.WARN:
                     result.warnings.append(
                         f"Policy '{policy.config.name}' has {len(violation.rule_violations)} violation(s)"
                     )
+                
+                if fail_fast and not result.passed and not any(
+                    p.config.enabled and p.config.action == PolicyAction.REQUIRE_APPROVAL
+                    for p in applicable_policies[i + 1:]
+                ):
+                    result.metadata['fail_fast'] = True
+                    break
+        
+        result.approval_teams = sorted(approval_teams)
+        result.approval_roles = sorted(approval_roles)
         
         # Add metadata
         result.metadata['evaluated_policies'] = len(applicable_policies)
@@ -196,6 +269,7 @@ class PolicyEngine:
     ) -> List[Policy]:
         """Get policies applicable to the current context."""
         applicable = []
+        file_matched = self._get_file_matched_policies(files) if files else None
         
         for policy in self.policies.values():
             # Check scope
@@ -204,50 +278,134 @@ class PolicyEngine:
             
             # Check branch filters
             if branch:
-                if policy.config.branches and branch not in policy.config.branches:
+                branches, exclude_branches = self._branch_filters[policy.id]
+                if branches and branch not in branches:
                     continue
-                if policy.config.exclude_branches and branch in policy.config.exclude_branches:
+                if branch in exclude_branches:
                     continue
             
             # Check file filters
             if files and (policy.config.file_patterns or policy.config.exclude_patterns):
-                if not self._matches_file_filters(files, policy.config):
+                if policy.id not in file_matched:
                     continue
             
             applicable.append(policy)
         
         return applicable
     
-    def _matches_file_filters(self, files: List[str], config: PolicyConfig) -> bool:
-        """Check if any file matches the policy's file filters."""
-        for file_path in files:
-            # Check include patterns
-            if config.file_patterns:
-                if not any(fnmatch.fnmatch(file_path, pattern) for pattern in config.file_patterns):
-                    continue
+    def _get_file_index(self) -> Tuple[Any, ...]:
+        """
+        Build (or reuse) the combined file pattern index for all policies.
+        
+        Returns:
+            Tuple of (include regex, its group names to policy IDs, exclude
+            regex, its group names to policy IDs, policies matched with
+            fnmatch as (ID, include patterns, exclude patterns), IDs of
+            filtered policies without include patterns, IDs of all filtered
+            policies)
+        """
+        if self._file_index is None:
+            include_groups = []
+            exclude_groups = []
+            include_policies: Dict[str, str] = {}
+            exclude_policies: Dict[str, str] = {}
+            unindexed: List[Tuple[str, List[str], List[str]]] = []
+            no_include: Set[str] = set()
+            filtered: Set[str] = set()
             
-            # Check exclude patterns
-            if config.exclude_patterns:
-                if any(fnmatch.fnmatch(file_path, pattern) for pattern in config.exclude_patterns):
+            for i, policy in enumerate(self.policies.values()):
+                config = policy.config
+                if not (config.file_patterns or config.exclude_patterns):
+                    continue
+                
+                filtered.add(policy.id)
+                if not (_combinable(config.file_patterns) and _combinable(config.exclude_patterns)):
+                    unindexed.append((policy.id, config.file_patterns, config.exclude_patterns))
                     continue
+                if config.file_patterns:
+                    include_policies[f'p{i}'] = policy.id
+                    include_groups.append(_policy_pattern_group(f'p{i}', config.file_patterns))
+                else:
+                    no_include.add(policy.id)
+                if config.exclude_patterns:
+                    exclude_policies[f'p{i}'] = policy.id
+                    exclude_groups.append(_policy_pattern_group(f'p{i}', config.exclude_patterns))
             
-            # File matches filters
-            return True
+            self._file_index = (
+                re.compile(''.join(include_groups)),
+                include_policies,
+                re.compile(''.join(exclude_groups)),
+                exclude_policies,
+                unindexed,
+                frozenset(no_include),
+                frozenset(filtered),
+            )
         
-        return False
+        return self._file_index
+    
+    def _get_file_matched_policies(self, files: List[str]) -> Set[str]:
+        """
+        Get IDs of file-filtered policies that match at least one file.
+        
+        Each file is matched once against the combined include and exclude
+        regexes instead of testing every policy's patterns separately.
+        """
+        (include_re, include_policies, exclude_re, exclude_policies,
+         unindexed, no_include, filtered) = self._get_file_index()
+        matched: Set[str] = set()
+        
+        for file_path in files:
+            file_path = os.path.normcase(file_path)
+            included = set(no_include)
+            # Only our own groups are read; translated globs may add others
+            match = include_re.match(file_path)
+            included.update(
+                policy_id for name, policy_id in include_policies.items()
+                if match.group(name) is not None
+            )
+            match = exclude_re.match(file_path)
+            included.difference_update(
+                policy_id for name, policy_id in exclude_policies.items()
+                if match.group(name) is not None
+            )
+            for policy_id, include, exclude in unindexed:
+                if (not include or _matches_any(file_path, include)) and not _matches_any(file_path, exclude):
+                    included.add(policy_id)
+            
+            matched |= included
+            if len(matched) == len(filtered):
+                break
+        
+        return matched
     
-    def _evaluate_policy(self, policy: Policy, context: Dict[str, Any]) -> Optional[PolicyViolation]:
+    def _evaluate_policy(
+        self,
+        policy: Policy,
+        context: Dict[str, Any],
+        fail_fast: bool = False,
+        index: Optional[FindingIndex] = None
+    ) -> Optional[PolicyViolation]:
         """Evaluate a single policy."""
         rule_violations = []
+        if index is None:
+            index = FindingIndex.from_context(context)
         
-        # Evaluate each rule in the policy
-        for rule_id in policy.rules:
-            rule = self.rules.get(rule_id)
-            if not rule:
-                continue
-            
-            violations = rule.evaluate(context)
-            rule_violations.extend(violations)
+        if fail_fast:
+            # Run cheap rules first and stop once the policy is certain to
+            # block with critical severity; later rules cannot change that.
+            blocks = (
+                policy.config.action == PolicyAction.BLOCK
+                and policy.config.enforcement == PolicyEnforcement.STRICT
+            )
+            for rule in self._get_rules_by_cost(policy):
+                violations = rule.evaluate(context, index)
+                rule_violations.extend(violations)
+                if blocks and any(v.severity == 'critical' for v in violations):
+                    break
+        else:
+            # Evaluate each rule in the policy
+            rules = [self.rules[r] for r in policy.rules if r in self.rules]
+            rule_violations = self.evaluate_all(rules, context, index)
         
         # If no violations, policy passes
         if not rule_violations:
@@ -271,6 +429,39 @@ class PolicyEngine:
         
         return violation
     
+    def evaluate_all(
+        self,
+        rules: List[PolicyRule],
+        context: Dict[str, Any],
+        index: Optional[FindingIndex] = None
+    ) -> List[RuleViolation]:
+        """
+        Evaluate rules against a context.
+        
+        Rules are cheap and CPU-bound, and share one finding index, so they
+        run serially; a thread pool would only add overhead.
+        
+        Args:
+            rules: Rules to evaluate
+            context: Context containing findings, metrics, etc.
+            index: Index of the context's findings; built once here when not given
+            
+        Returns:
+            Violations from all rules, in rule order
+        """
+        if index is None:
+            index = FindingIndex.from_context(context)
+        return [v for rule in rules for v in rule.evaluate(context, index)]
+    
+    def _get_rules_by_cost(self, policy: Policy) -> List[PolicyRule]:
+        """Get a policy's registered rules ordered from cheapest to most expensive."""
+        rules = self._rules_by_cost.get(policy.id)
+        if rules is None:
+            rules = [self.rules[r] for r in policy.rules if r in self.rules]
+            rules.sort(key=lambda r: r.cost)
+            self._rules_by_cost[policy.id] = rules
+        return rules
+    
     def get_policy(self, policy_id: str) -> Optional[Policy]:
         """Get a policy by ID."""
         return self.policies.get(policy_id)
@@ -285,6 +476,9 @@ class PolicyEngine:
         """Remove a policy."""
         if policy_id in self.policies:
             del self.policies[policy_id]
+            del self._branch_filters[policy_id]
+            self._rules_by_cost.pop(policy_id, None)
+            self._file_index = None
             return True
         return False
 
@@ -4,9 +4,12 @@ Policy manager for loading and managing policies.
 
 import json
 import yaml
+from dataclasses import replace
 from pathlib import Path
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Tuple
 from datetime import datetime
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
 
 from .schema import Policy, PolicyConfig, ENTERPRISE_POLICIES
 from .rules import (
@@ -20,6 +23,67 @@ from .rules import (
 )
 from .engine import PolicyEngine
 
+try:
+    from yaml import CSafeLoader as _YamlLoader, CSafeDumper as _YamlDumper  # libyaml C extension
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader, SafeDumper as _YamlDumper
+
+try:
+    import orjson
+except ImportError:
+    orjson = None  # type: ignore
+
+
+# File pattern tokens that select the default file pattern rules
+_SECURITY_PATH_TOKENS = frozenset({'auth', 'security', 'crypto'})
+_API_PATH_TOKENS = frozenset({'api', 'endpoints'})
+
+
+@lru_cache(maxsize=64)
+def _default_rules_for(
+    max_critical_issues: int,
+    max_high_issues: int,
+    max_complexity: Optional[int],
+    min_test_coverage: Optional[float],
+    file_patterns: Tuple[str, ...]
+) -> Tuple[str, ...]:
+    """Select default rule IDs for a set of policy thresholds."""
+    rules = []
+
+    # Add severity rule
+    if max_critical_issues == 0 and max_high_issues == 0:
+        rules.append("severity-strict")
+    else:
+        rules.append("severity-moderate")
+
+    # Add security rule if applicable
+    if max_critical_issues == 0:
+        rules.append("security-zero-tolerance")
+
+    # Add complexity rule if specified
+    if max_complexity:
+        if max_complexity <= 10:
+            rules.append("complexity-strict")
+        else:
+            rules.append("complexity-moderate")
+
+    # Add coverage rule if specified
+    if min_test_coverage:
+        if min_test_coverage >= 0.9:
+            rules.append("coverage-90")
+        elif min_test_coverage >= 0.8:
+            rules.append("coverage-80")
+
+    # Add file pattern rules if applicable
+    if file_patterns:
+        patterns = str(list(file_patterns))
+        if any(p in patterns for p in _SECURITY_PATH_TOKENS):
+            rules.append("security-files-zero-issues")
+        if any(p in patterns for p in _API_PATH_TOKENS):
+            rules.append("api-files-low-issues")
+
+    return tuple(rules)
+
 
 class PolicyManager:
     """Manages policies and rules."""
@@ -124,40 +188,13 @@ class PolicyManager:
     
     def _get_default_rules_for_policy(self, config: PolicyConfig) -> List[str]:
         """Get default rules for a policy based on its configuration."""
-        rules = []
-
-        # Add severity rule
-        if config.max_critical_issues == 0 and config.max_high_issues == 0:
-            rules.append("severity-strict")
-        else:
-            rules.append("severity-moderate")
-
-        # Add security rule if applicable
-        if config.max_critical_issues == 0:
-            rules.append("security-zero-tolerance")
-
-        # Add complexity rule if specified
-        if config.max_complexity:
-            if config.max_complexity <= 10:
-                rules.append("complexity-strict")
-            else:
-                rules.append("complexity-moderate")
-
-        # Add coverage rule if specified
-        if config.min_test_coverage:
-            if config.min_test_coverage >= 0.9:
-                rules.append("coverage-90")
-            elif config.min_test_coverage >= 0.8:
-                rules.append("coverage-80")
-
-        # Add file pattern rules if applicable
-        if config.file_patterns:
-            if any(p in str(config.file_patterns) for p in ['auth', 'security', 'crypto']):
-                rules.append("security-files-zero-issues")
-            if any(p in str(config.file_patterns) for p in ['api', 'endpoints']):
-                rules.append("api-files-low-issues")
-
-        return rules
+        return list(_default_rules_for(
+            config.max_critical_issues,
+            config.max_high_issues,
+            config.max_complexity,
+            config.min_test_coverage,
+            tuple(config.file_patterns),
+        ))
     
     def load_policy_file(self, file_path: Path) -> Policy:
         """
@@ -169,9 +206,11 @@ class PolicyManager:
         Returns:
             Loaded policy
         """
-        with open(file_path, 'r') as f:
+        with open(file_path, 'rb') as f:
             if file_path.suffix in ['.yaml', '.yml']:
-                data = yaml.safe_load(f)
+                data = yaml.load(f, Loader=_YamlLoader)
+            elif orjson is not None:
+                data = orjson.loads(f.read())
             else:
                 data = json.load(f)
         
@@ -221,10 +260,14 @@ class PolicyManager:
         
         data = policy.to_dict()
         
-        with open(file_path, 'w') as f:
-            if file_path.suffix in ['.yaml', '.yml']:
-                yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-            else:
+        if file_path.suffix in ['.yaml', '.yml']:
+            with open(file_path, 'w') as f:
+                yaml.dump(data, f, Dumper=_YamlDumper, default_flow_style=False, sort_keys=False)
+        elif orjson is not None:
+            with open(file_path, 'wb') as f:
+                f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+        else:
+            with open(file_path, 'w') as f:
                 json.dump(data, f, indent=2)
         
         return file_path
@@ -251,11 +294,11 @@ class PolicyManager:
         
         config = ENTERPRISE_POLICIES[template_name]
         
-        # Apply overrides
+        # Apply overrides (to a copy, leaving the shared template untouched)
         if overrides:
-            for key, value in overrides.items():
-                if hasattr(config, key):
-                    setattr(config, key, value)
+            config = replace(config, **{
+                key: value for key, value in overrides.items() if hasattr(config, key)
+            })
         
         policy = Policy(
             id=policy_id,
@@ -288,13 +331,18 @@ class PolicyManager:
         """
         output_dir.mkdir(parents=True, exist_ok=True)
         
-        count = 0
-        for policy in self.engine.list_policies():
-            file_path = output_dir / f"{policy.id}.yaml"
-            self.save_policy(policy, file_path)
-            count += 1
+        policies = self.engine.list_policies()
+        if not policies:
+            return 0
         
-        return count
+        # Each policy is written to its own file, so saves can run concurrently
+        with ThreadPoolExecutor(max_workers=min(8, len(policies))) as executor:
+            saved = list(executor.map(
+                lambda policy: self.save_policy(policy, output_dir / f"{policy.id}.yaml"),
+                policies
+            ))
+        
+        return len(saved)
     
     def import_policies(self, input_dir: Path) -> int:
         """
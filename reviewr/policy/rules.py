@@ -3,13 +3,70 @@ Policy rules for enterprise enforcement.
 """
 
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Dict, Any, Optional, Pattern
+from collections import OrderedDict
+from dataclasses import dataclass, replace
+from functools import lru_cache
+from typing import List, Dict, Any, Callable, FrozenSet, Hashable, Optional, Pattern, Tuple
+import fnmatch
 import re
+import sys
 from pathlib import Path
 
 
-@dataclass
+# dataclass(slots=True) is only available on Python 3.10+
+DATACLASS_SLOTS: Dict[str, Any] = {'slots': True} if sys.version_info >= (3, 10) else {}
+
+_GLOB_CHARS = frozenset('*?[')
+
+
+class FindingIndex:
+    """
+    Findings bucketed by severity, category and file path in a single pass.
+    
+    Built once per evaluation (see PolicyEngine.evaluate()) and passed to
+    every rule, so that rules read precomputed views instead of each walking
+    every finding.
+    """
+    
+    __slots__ = ('findings', 'by_severity', 'by_category', 'complexity_metrics', 'with_path')
+    
+    def __init__(self, findings: List[Any]):
+        self.findings = findings
+        self.by_severity: Dict[str, List[Any]] = {}
+        self.by_category: Dict[str, List[Any]] = {}
+        self.complexity_metrics: List[Tuple[Any, Any]] = []
+        self.with_path: List[Tuple[Any, str]] = []
+        
+        for f in findings:
+            severity = f.severity.lower() if hasattr(f, 'severity') else 'low'
+            category = f.category.lower() if hasattr(f, 'category') else ''
+            self.by_severity.setdefault(severity, []).append(f)
+            self.by_category.setdefault(category, []).append(f)
+            if 'complexity' in category and getattr(f, 'metric_value', None):
+                self.complexity_metrics.append((f, f.metric_value))
+            if hasattr(f, 'file_path'):
+                self.with_path.append((f, f.file_path))
+    
+    @classmethod
+    def from_context(cls, context: Dict[str, Any]) -> 'FindingIndex':
+        """Build the index for a context's findings."""
+        return cls(context.get('findings', []))
+    
+    def count_severity(self, severity: str) -> int:
+        """Number of findings with the given (lowercase) severity."""
+        return len(self.by_severity.get(severity, ()))
+    
+    def in_category(self, token: str) -> List[Any]:
+        """Findings whose category contains the given (lowercase) token."""
+        return [
+            f
+            for category, findings in self.by_category.items()
+            if token in category
+            for f in findings
+        ]
+
+
+@dataclass(**DATACLASS_SLOTS)
 class RuleViolation:
     """A violation of a policy rule."""
     rule_id: str
@@ -29,19 +86,59 @@ class RuleViolation:
 class PolicyRule(ABC):
     """Base class for policy rules."""
     
+    __slots__ = ('rule_id', 'name', 'description', 'severity', '_cache')
+    
+    # Relative evaluation cost; cheaper rules run first when failing fast
+    cost: int = 1
+    
+    # Maximum number of memoized results kept by _cached_evaluate()
+    cache_size: int = 128
+    
     def __init__(self, rule_id: str, name: str, description: str, severity: str = "high"):
         self.rule_id = rule_id
         self.name = name
         self.description = description
         self.severity = severity
+        self._cache: 'OrderedDict[Hashable, List[RuleViolation]]' = OrderedDict()
+    
+    def _cached_evaluate(
+        self,
+        key: Hashable,
+        compute: Callable[[], List[RuleViolation]]
+    ) -> List[RuleViolation]:
+        """
+        Memoize evaluation results for rules that depend only on a small context slice.
+        
+        Args:
+            key: Hashable value of the context fields the rule reads
+            compute: Function producing the violations on a cache miss
+            
+        Returns:
+            Fresh copies of the violations, so callers may modify them freely
+        """
+        if key in self._cache:
+            self._cache.move_to_end(key)
+            violations = self._cache[key]
+        else:
+            violations = compute()
+            self._cache[key] = violations
+            if len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return [replace(v, metadata=dict(v.metadata)) for v in violations]
     
     @abstractmethod
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(
+        self,
+        context: Dict[str, Any],
+        index: Optional[FindingIndex] = None
+    ) -> List[RuleViolation]:
         """
         Evaluate the rule against the given context.
         
         Args:
             context: Context containing findings, files, metrics, etc.
+            index: Index of the context's findings, shared by all rules in an
+                evaluation; built from the context when not given
             
         Returns:
             List of violations found
@@ -61,13 +158,18 @@ class PolicyRule(ABC):
 class SeverityRule(PolicyRule):
     """Rule that checks severity thresholds."""
     
+    __slots__ = ('max_critical', 'max_high', 'max_medium', 'max_low', 'aggregate')
+    
+    cost = 0
+    
     def __init__(
         self,
         rule_id: str = "severity-threshold",
         max_critical: int = 0,
         max_high: int = 0,
         max_medium: int = 10,
-        max_low: int = 50
+        max_low: int = 50,
+        aggregate: bool = True
     ):
         super().__init__(
             rule_id=rule_id,
@@ -79,56 +181,65 @@ class SeverityRule(PolicyRule):
         self.max_high = max_high
         self.max_medium = max_medium
         self.max_low = max_low
+        # Report all exceeded thresholds as one violation (False: one per severity)
+        self.aggregate = aggregate
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Check if findings exceed severity thresholds."""
-        findings = context.get('findings', [])
+        if index is None:
+            index = FindingIndex.from_context(context)
         
-        # Count by severity
-        counts = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
-        for finding in findings:
-            severity = finding.severity.lower() if hasattr(finding, 'severity') else 'low'
-            if severity in counts:
-                counts[severity] += 1
+        # Checked most severe first, so exceeded[0] is the worst severity
+        exceeded = []
+        for severity, threshold, label, suggestion in (
+            ('critical', self.max_critical, 'critical', 'Fix {} critical issue(s) before proceeding'),
+            ('high', self.max_high, 'high severity', 'Fix {} high severity issue(s) before proceeding'),
+            ('medium', self.max_medium, 'medium severity', 'Consider fixing {} medium severity issue(s)'),
+        ):
+            count = index.count_severity(severity)
+            if count > threshold:
+                exceeded.append((severity, count, threshold, label, suggestion.format(count - threshold)))
         
-        violations = []
+        if not exceeded:
+            return []
         
-        if counts['critical'] > self.max_critical:
-            violations.append(RuleViolation(
-                rule_id=self.rule_id,
-                rule_name=self.name,
-                severity='critical',
-                message=f"Found {counts['critical']} critical issues (max: {self.max_critical})",
-                suggestion=f"Fix {counts['critical'] - self.max_critical} critical issue(s) before proceeding",
-                metadata={'count': counts['critical'], 'threshold': self.max_critical}
-            ))
-        
-        if counts['high'] > self.max_high:
-            violations.append(RuleViolation(
-                rule_id=self.rule_id,
-                rule_name=self.name,
-                severity='high',
-                message=f"Found {counts['high']} high severity issues (max: {self.max_high})",
-                suggestion=f"Fix {counts['high'] - self.max_high} high severity issue(s) before proceeding",
-                metadata={'count': counts['high'], 'threshold': self.max_high}
-            ))
-        
-        if counts['medium'] > self.max_medium:
-            violations.append(RuleViolation(
-                rule_id=self.rule_id,
-                rule_name=self.name,
-                severity='medium',
-                message=f"Found {counts['medium']} medium severity issues (max: {self.max_medium})",
-                suggestion=f"Consider fixing {counts['medium'] - self.max_medium} medium severity issue(s)",
-                metadata={'count': counts['medium'], 'threshold': self.max_medium}
-            ))
+        if not self.aggregate:
+            return [
+                RuleViolation(
+                    rule_id=self.rule_id,
+                    rule_name=self.name,
+                    severity=severity,
+                    message=f"Found {count} {label} issues (max: {threshold})",
+                    suggestion=suggestion,
+                    metadata={'count': count, 'threshold': threshold}
+                )
+                for severity, count, threshold, label, suggestion in exceeded
+            ]
         
-        return violations
+        return [RuleViolation(
+            rule_id=self.rule_id,
+            rule_name=self.name,
+            severity=exceeded[0][0],
+            message="Severity thresholds exceeded: " + ", ".join(
+                f"{count} {label} issues (max: {threshold})"
+                for _, count, threshold, label, _ in exceeded
+            ),
+            suggestion="; ".join(suggestion for *_, suggestion in exceeded),
+            metadata={
+                'breakdown': {
+                    severity: index.count_severity(severity)
+                    for severity in ('critical', 'high', 'medium', 'low')
+                },
+                'overages': {severity: count - threshold for severity, count, threshold, _, _ in exceeded},
+            }
+        )]
 
 
 class FilePatternRule(PolicyRule):
     """Rule that checks for issues in specific file patterns."""
     
+    __slots__ = ('max_issues', '_segments', '_extensions', '_basenames', '_combined', '_ext_only')
+    
     def __init__(
         self,
         rule_id: str,
@@ -143,31 +254,94 @@ class FilePatternRule(PolicyRule):
             description=f"Max {max_issues} issues in files matching: {', '.join(patterns)}",
             severity=severity
         )
-        self.patterns = [self._glob_to_regex(p) for p in patterns]
         self.max_issues = max_issues
+        
+        self._segments, self._extensions, self._basenames, self._combined = (
+            self._compile_patterns(tuple(patterns))
+        )
+        # Pattern lists made only of '*.ext' globs reduce to a single endswith()
+        self._ext_only = bool(self._extensions) and not (
+            self._segments or self._basenames or self._combined
+        )
+    
+    @classmethod
+    @lru_cache(maxsize=64)
+    def _compile_patterns(
+        cls,
+        patterns: Tuple[str, ...]
+    ) -> Tuple[FrozenSet[str], Tuple[str, ...], FrozenSet[str], Optional[Pattern]]:
+        """
+        Split patterns into string-matchable sets plus one combined glob regex.
+        
+        Common glob shapes are matched with plain string operations; anything
+        else falls back to a single combined fnmatch regex. Memoized so rules
+        sharing a pattern list share the compiled form.
+        
+        Returns:
+            Tuple of (directory segments, extensions, basenames, combined regex or None)
+        """
+        segments, extensions, basenames, globs = set(), [], set(), []
+        for pattern in patterns:
+            kind, value = cls._classify_pattern(pattern)
+            if kind == 'segment':
+                segments.add(value)
+            elif kind == 'ext':
+                extensions.append(value)
+            elif kind == 'base':
+                basenames.add(value)
+            else:
+                globs.append(value)
+        
+        combined = re.compile('|'.join(fnmatch.translate(g) for g in globs)) if globs else None
+        return frozenset(segments), tuple(extensions), frozenset(basenames), combined
     
     @staticmethod
-    def _glob_to_regex(pattern: str) -> Pattern:
-        """Convert glob pattern to regex."""
-        # Simple glob to regex conversion
-        regex = pattern.replace('.', r'\.')
-        regex = regex.replace('*', '.*')
-        regex = regex.replace('?', '.')
-        return re.compile(regex)
+    def _classify_pattern(pattern: str) -> Tuple[str, str]:
+        """
+        Classify a glob pattern by how it can be matched.
+        
+        Returns:
+            ('segment', dir) for '**/dir/**', ('ext', '.ext') for '*.ext',
+            ('base', name) for a literal file name, else ('glob', pattern)
+        """
+        if pattern.startswith('**/') and pattern.endswith('/**'):
+            segment = pattern[3:-3]
+            if segment and '/' not in segment and not _GLOB_CHARS.intersection(segment):
+                return 'segment', segment
+        if pattern.startswith('*.'):
+            extension = pattern[1:]
+            if '/' not in extension and not _GLOB_CHARS.intersection(extension):
+                return 'ext', extension
+        if '/' not in pattern and not _GLOB_CHARS.intersection(pattern):
+            return 'base', pattern
+        return 'glob', pattern
     
     def _matches_pattern(self, file_path: str) -> bool:
         """Check if file path matches any pattern."""
-        return any(pattern.match(file_path) for pattern in self.patterns)
+        if self._ext_only:
+            return file_path.endswith(self._extensions)
+        if self._extensions and file_path.endswith(self._extensions):
+            return True
+        if self._segments or self._basenames:
+            parts = file_path.split('/')
+            if parts[-1] in self._basenames:
+                return True
+            if self._segments and not self._segments.isdisjoint(parts[:-1]):
+                return True
+        return self._combined is not None and self._combined.match(file_path) is not None
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Check for issues in files matching patterns."""
-        findings = context.get('findings', [])
+        if index is None:
+            index = FindingIndex.from_context(context)
+        with_path = index.with_path
         
         # Filter findings to matching files
-        matching_findings = [
-            f for f in findings
-            if hasattr(f, 'file_path') and self._matches_pattern(f.file_path)
-        ]
+        if self._ext_only:
+            extensions = self._extensions
+            matching_findings = [f for f, file_path in with_path if file_path.endswith(extensions)]
+        else:
+            matching_findings = [f for f, file_path in with_path if self._matches_pattern(file_path)]
         
         if len(matching_findings) > self.max_issues:
             return [RuleViolation(
@@ -185,6 +359,10 @@ class FilePatternRule(PolicyRule):
 class ComplexityRule(PolicyRule):
     """Rule that checks code complexity."""
     
+    __slots__ = ('max_complexity',)
+    
+    cost = 0
+    
     def __init__(
         self,
         rule_id: str = "complexity-threshold",
@@ -199,26 +377,23 @@ class ComplexityRule(PolicyRule):
         )
         self.max_complexity = max_complexity
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Check if complexity exceeds threshold."""
-        findings = context.get('findings', [])
-        
         violations = []
-        for finding in findings:
-            # Check if this is a complexity finding
-            if hasattr(finding, 'category') and 'complexity' in finding.category.lower():
-                if hasattr(finding, 'metric_value') and finding.metric_value:
-                    if finding.metric_value > self.max_complexity:
-                        violations.append(RuleViolation(
-                            rule_id=self.rule_id,
-                            rule_name=self.name,
-                            severity=self.severity,
-                            message=f"Complexity {finding.metric_value} exceeds threshold {self.max_complexity}",
-                            file_path=finding.file_path if hasattr(finding, 'file_path') else None,
-                            line_number=finding.line_start if hasattr(finding, 'line_start') else None,
-                            suggestion="Refactor to reduce complexity",
-                            metadata={'complexity': finding.metric_value, 'threshold': self.max_complexity}
-                        ))
+        if index is None:
+            index = FindingIndex.from_context(context)
+        for finding, complexity in index.complexity_metrics:
+            if complexity > self.max_complexity:
+                violations.append(RuleViolation(
+                    rule_id=self.rule_id,
+                    rule_name=self.name,
+                    severity=self.severity,
+                    message=f"Complexity {complexity} exceeds threshold {self.max_complexity}",
+                    file_path=finding.file_path if hasattr(finding, 'file_path') else None,
+                    line_number=finding.line_start if hasattr(finding, 'line_start') else None,
+                    suggestion="Refactor to reduce complexity",
+                    metadata={'complexity': complexity, 'threshold': self.max_complexity}
+                ))
         
         return violations
 
@@ -226,6 +401,8 @@ class ComplexityRule(PolicyRule):
 class SecurityRule(PolicyRule):
     """Rule that checks for security issues."""
     
+    __slots__ = ('max_issues',)
+    
     def __init__(
         self,
         rule_id: str = "security-issues",
@@ -240,15 +417,12 @@ class SecurityRule(PolicyRule):
         )
         self.max_issues = max_issues
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Check for security issues."""
-        findings = context.get('findings', [])
-        
         # Filter to security findings
-        security_findings = [
-            f for f in findings
-            if hasattr(f, 'category') and 'security' in f.category.lower()
-        ]
+        if index is None:
+            index = FindingIndex.from_context(context)
+        security_findings = index.in_category('security')
         
         if len(security_findings) > self.max_issues:
             return [RuleViolation(
@@ -266,6 +440,10 @@ class SecurityRule(PolicyRule):
 class LicenseRule(PolicyRule):
     """Rule that checks license compliance."""
     
+    __slots__ = ('allowed_licenses',)
+    
+    cost = 2
+    
     def __init__(
         self,
         rule_id: str = "license-compliance",
@@ -280,7 +458,7 @@ class LicenseRule(PolicyRule):
         )
         self.allowed_licenses = set(allowed_licenses or [])
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Check license compliance."""
         # This would integrate with the existing license checker
         # For now, return empty list
@@ -290,6 +468,10 @@ class LicenseRule(PolicyRule):
 class CoverageRule(PolicyRule):
     """Rule that checks test coverage."""
     
+    __slots__ = ('min_coverage',)
+    
+    cost = 0
+    
     def __init__(
         self,
         rule_id: str = "test-coverage",
@@ -304,26 +486,35 @@ class CoverageRule(PolicyRule):
         )
         self.min_coverage = min_coverage
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Check test coverage."""
         coverage = context.get('test_coverage')
         
         if coverage is not None and coverage < self.min_coverage:
-            return [RuleViolation(
-                rule_id=self.rule_id,
-                rule_name=self.name,
-                severity=self.severity,
-                message=f"Test coverage {coverage * 100:.1f}% is below threshold {self.min_coverage * 100}%",
-                suggestion=f"Add tests to reach {self.min_coverage * 100}% coverage",
-                metadata={'coverage': coverage, 'threshold': self.min_coverage}
-            )]
+            key = (coverage, self.min_coverage, self.severity, self.name)
+            return self._cached_evaluate(key, lambda: self._below_threshold(coverage))
         
         return []
+    
+    def _below_threshold(self, coverage: float) -> List[RuleViolation]:
+        """Build the violation for coverage below the threshold."""
+        return [RuleViolation(
+            rule_id=self.rule_id,
+            rule_name=self.name,
+            severity=self.severity,
+            message=f"Test coverage {coverage * 100:.1f}% is below threshold {self.min_coverage * 100}%",
+            suggestion=f"Add tests to reach {self.min_coverage * 100}% coverage",
+            metadata={'coverage': coverage, 'threshold': self.min_coverage}
+        )]
 
 
 class CustomRule(PolicyRule):
     """Custom rule defined by user."""
     
+    __slots__ = ('evaluator',)
+    
+    cost = 2
+    
     def __init__(
         self,
         rule_id: str,
@@ -335,7 +526,7 @@ class CustomRule(PolicyRule):
         super().__init__(rule_id, name, description, severity)
         self.evaluator = evaluator
     
-    def evaluate(self, context: Dict[str, Any]) -> List[RuleViolation]:
+    def evaluate(self, context: Dict[str, Any], index: Optional[FindingIndex] = None) -> List[RuleViolation]:
         """Evaluate using custom evaluator function."""
         return self.evaluator(context, self)
 
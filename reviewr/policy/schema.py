@@ -2,9 +2,16 @@
 Policy schema definitions for enterprise policy enforcement.
 """
 
-from dataclasses import dataclass, field
-from typing import List, Dict, Any, Optional, Set
+from dataclasses import dataclass, field, asdict
+from functools import cached_property
+from typing import List, Dict, Any, FrozenSet, Optional, Tuple
 from enum import Enum
+import sys
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None  # type: ignore
 
 
 class PolicyScope(str, Enum):
@@ -33,17 +40,48 @@ class PolicyEnforcement(str, Enum):
     ADVISORY = "advisory"  # Informational only
 
 
-@dataclass
+def _to_builtin(value: Any) -> Any:
+    """Coerce enums and sets to plain JSON/YAML-serializable values."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    if isinstance(value, list):
+        return [_to_builtin(v) for v in value]
+    return value
+
+
+def _copy_builtin(value: Any) -> Any:
+    """Copy the dicts and lists of a plain value, sharing only immutable leaves."""
+    if isinstance(value, dict):
+        return {key: _copy_builtin(v) for key, v in value.items()}
+    if isinstance(value, list):
+        return [_copy_builtin(v) for v in value]
+    return value
+
+
+def _dict_factory(items: List[Tuple[str, Any]]) -> Dict[str, Any]:
+    """dict_factory for dataclasses.asdict that coerces enums and sets."""
+    return {key: _to_builtin(value) for key, value in items}
+
+
+@dataclass(frozen=True)
 class ApprovalRequirement:
-    """Requirements for manual approval."""
+    """Requirements for manual approval (immutable and hashable)."""
     required_approvers: int = 1
-    required_roles: Set[str] = field(default_factory=set)  # e.g., "security-team", "tech-lead"
-    required_teams: Set[str] = field(default_factory=set)  # e.g., "security", "architecture"
+    required_roles: FrozenSet[str] = field(default_factory=frozenset)  # e.g., "security-team", "tech-lead"
+    required_teams: FrozenSet[str] = field(default_factory=frozenset)  # e.g., "security", "architecture"
     allow_self_approval: bool = False
     timeout_hours: Optional[int] = None  # Auto-reject after timeout
+    
+    def __post_init__(self):
+        # Accept any iterable of names; intern them since the same few role
+        # and team names repeat across every loaded policy
+        for name in ('required_roles', 'required_teams'):
+            object.__setattr__(self, name, frozenset(sys.intern(v) for v in getattr(self, name)))
 
 
-@dataclass
+@dataclass(frozen=True)
 class PolicyConfig:
     """Configuration for a policy."""
     name: str
@@ -82,7 +120,7 @@ class PolicyConfig:
     notify_on_override: List[str] = field(default_factory=list)
 
 
-@dataclass
+@dataclass(frozen=True)
 class Policy:
     """A complete policy definition."""
     id: str
@@ -93,50 +131,34 @@ class Policy:
     created_by: Optional[str] = None
     version: int = 1
     
+    @cached_property
+    def as_dict(self) -> Dict[str, Any]:
+        """Dictionary form of the policy, built once (policies are immutable)."""
+        if msgspec is not None:
+            return msgspec.to_builtins(self)
+        return asdict(self, dict_factory=_dict_factory)
+    
     def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
-        return {
-            'id': self.id,
-            'config': {
-                'name': self.config.name,
-                'description': self.config.description,
-                'enabled': self.config.enabled,
-                'scope': [s.value for s in self.config.scope],
-                'action': self.config.action.value,
-                'enforcement': self.config.enforcement.value,
-                'file_patterns': self.config.file_patterns,
-                'exclude_patterns': self.config.exclude_patterns,
-                'branches': self.config.branches,
-                'exclude_branches': self.config.exclude_branches,
-                'max_critical_issues': self.config.max_critical_issues,
-                'max_high_issues': self.config.max_high_issues,
-                'max_medium_issues': self.config.max_medium_issues,
-                'max_complexity': self.config.max_complexity,
-                'min_test_coverage': self.config.min_test_coverage,
-                'approval': {
-                    'required_approvers': self.config.approval.required_approvers,
-                    'required_roles': list(self.config.approval.required_roles),
-                    'required_teams': list(self.config.approval.required_teams),
-                    'allow_self_approval': self.config.approval.allow_self_approval,
-                    'timeout_hours': self.config.approval.timeout_hours,
-                } if self.config.approval else None,
-                'custom_rules': self.config.custom_rules,
-                'owner': self.config.owner,
-                'tags': self.config.tags,
-                'priority': self.config.priority,
-                'notify_on_violation': self.config.notify_on_violation,
-                'notify_on_override': self.config.notify_on_override,
-            },
-            'rules': self.rules,
-            'created_at': self.created_at,
-            'updated_at': self.updated_at,
-            'created_by': self.created_by,
-            'version': self.version,
-        }
+        """Convert to dictionary (a fresh copy the caller may modify)."""
+        return _copy_builtin(self.as_dict)
     
     @classmethod
     def from_dict(cls, data: Dict[str, Any]) -> 'Policy':
         """Create from dictionary."""
+        # msgspec validates and converts in C. An empty approval mapping means
+        # "no approval" here, which msgspec would turn into a default
+        # requirement, so that (rare) case and anything msgspec rejects take
+        # the lenient manual path.
+        if msgspec is not None and data.get('config', {}).get('approval', None) != {}:
+            try:
+                return msgspec.convert(data, cls)
+            except msgspec.ValidationError:
+                pass
+        return cls._from_dict_manual(data)
+    
+    @classmethod
+    def _from_dict_manual(cls, data: Dict[str, Any]) -> 'Policy':
+        """Create from dictionary field by field (used when msgspec is unavailable)."""
         config_data = data['config']
         
         approval = None
@@ -144,8 +166,8 @@ class Policy:
             approval_data = config_data['approval']
             approval = ApprovalRequirement(
                 required_approvers=approval_data.get('required_approvers', 1),
-                required_roles=set(approval_data.get('required_roles', [])),
-                required_teams=set(approval_data.get('required_teams', [])),
+                required_roles=approval_data.get('required_roles', ()),
+                required_teams=approval_data.get('required_teams', ()),
                 allow_self_approval=approval_data.get('allow_self_approval', False),
                 timeout_hours=approval_data.get('timeout_hours'),
             )
@@ -1,16 +1,38 @@
+import os
+import re
 import sys
-import asyncio
+import mmap
 import argparse
 from pathlib import Path
-from typing import List, Optional
-from rich.console import Console
+from typing import TYPE_CHECKING, Any, List, Optional, Tuple
 
-from .config import ConfigLoader
-from .providers import ReviewType, ProviderFactory
-from .review.orchestrator import ReviewOrchestrator
-from .utils.secrets_scanner import SecretsScanner
+# The hook runs on every commit, so heavy modules (asyncio, rich, providers,
+# orchestrator) are imported only on the code paths that need them.
+if TYPE_CHECKING:
+    from .providers import ReviewType
+    from .utils.secrets_scanner import SecretMatch
 
-console = Console()
+# Only the rich styles this module emits, so paths like pages/[id].tsx survive
+_STYLE = r'(?:bold|red|green|yellow|cyan|dim)'
+_MARKUP_TAG = re.compile(rf'\[(?:/|/?{_STYLE}(?: {_STYLE})*)\]')
+
+
+class _PlainConsole:
+    """Minimal stand-in for rich's Console when output is not a terminal."""
+    
+    def print(self, *objects: Any) -> None:
+        print(*(_MARKUP_TAG.sub('', str(obj)) for obj in objects))
+
+
+def _make_console():
+    """Use rich for interactive terminals, plain prints otherwise (e.g. under pre-commit)."""
+    if sys.stdout.isatty():
+        from rich.console import Console
+        return Console()
+    return _PlainConsole()
+
+
+console = _make_console()
 
 
 def parse_args() -> argparse.Namespace:
@@ -28,14 +50,20 @@ def parse_args() -> argparse.Namespace:
 
 async def run_review(
     files: List[str],
-    review_types: List[ReviewType],
+    review_types: List['ReviewType'],
     config_path: Optional[str],
-    verbose: bool
+    verbose: bool,
+    max_concurrent_files: int = 5
 ) -> int:
     """Run review on files."""
     if not files:
         return 0
     
+    import asyncio
+    from .config import ConfigLoader
+    from .providers import ProviderFactory
+    from .review.orchestrator import ReviewOrchestrator
+    
     try:
         # Load configuration
         loader = ConfigLoader()
@@ -66,22 +94,32 @@ async def run_review(
             verbose=1 if verbose else 0
         )
         
-        # Review each file
-        all_findings = []
-        for file_path in files:
-            if verbose:
-                console.print(f"Reviewing {file_path}...")
-            
-            try:
-                findings = await orchestrator._review_file(
+        # Review files concurrently with a concurrency limit
+        semaphore = asyncio.Semaphore(max_concurrent_files)
+        
+        async def review_with_limit(file_path: str):
+            """Review a file with concurrency limit."""
+            async with semaphore:
+                if verbose:
+                    console.print(f"Reviewing {file_path}...")
+                return await orchestrator._review_file(
                     Path(file_path),
                     review_types,
                     None
                 )
-                all_findings.extend(findings)
-            except Exception as e:
+        
+        results = await asyncio.gather(
+            *(review_with_limit(file_path) for file_path in files),
+            return_exceptions=True
+        )
+        
+        all_findings = []
+        for file_path, findings in zip(files, results):
+            if isinstance(findings, Exception):
                 if verbose:
-                    console.print(f"[yellow]Warning:[/yellow] Error reviewing {file_path}: {e}")
+                    console.print(f"[yellow]Warning:[/yellow] Error reviewing {file_path}: {findings}")
+                continue
+            all_findings.extend(findings)
         
         return len(all_findings)
         
@@ -93,32 +131,74 @@ async def run_review(
         return 1
 
 
-def run_secrets_scan(files: List[str], verbose: bool) -> int:
+# Files larger than this are only scanned up to this many bytes; anything
+# that size is almost always a generated or binary artifact
+MAX_SCAN_BYTES = 5 * 1024 * 1024
+
+# Below this size a plain read() is cheaper than setting up a memory map
+_MMAP_MIN_BYTES = 64 * 1024
+
+
+def _scan_file(file_path: str) -> Tuple[str, List['SecretMatch'], Optional[str], bool]:
+    """
+    Scan a single file's bytes for secrets.
+    
+    Returns:
+        Tuple of (file path, matches, error message or None, whether only
+        the first MAX_SCAN_BYTES were scanned)
+    """
+    from .utils.secrets_scanner import SecretsScanner
+    
+    try:
+        with open(file_path, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if size == 0:
+                return file_path, [], None, False
+            
+            truncated = size > MAX_SCAN_BYTES
+            length = MAX_SCAN_BYTES if truncated else size
+            if length < _MMAP_MIN_BYTES:
+                return file_path, SecretsScanner().scan_bytes(f.read(length), file_path), None, truncated
+            
+            # Scan the mapped bytes directly; only lines with hits get decoded
+            with mmap.mmap(f.fileno(), length, access=mmap.ACCESS_READ) as data:
+                return file_path, SecretsScanner().scan_bytes(data, file_path), None, truncated
+    except Exception as e:
+        return file_path, [], str(e), False
+
+
+def run_secrets_scan(files: List[str], verbose: bool, min_parallel_files: int = 4) -> int:
     """Run secrets scan on files."""
     if not files:
         return 0
     
-    scanner = SecretsScanner()
     total_secrets = 0
     
-    for file_path in files:
-        try:
-            with open(file_path, 'r', encoding='utf-8') as f:
-                content = f.read()
-            
-            matches = scanner.scan_content(content, file_path)
-            
-            if matches:
-                console.print(f"\n[red]⚠️  Secrets detected in {file_path}:[/red]")
-                for match in matches:
-                    console.print(f"  Line {match.line_number}: {match.type.replace('_', ' ')} - {match.matched_text}")
-                    if verbose:
-                        console.print(f"    Context: {match.context}")
-                total_secrets += len(matches)
-        
-        except Exception as e:
+    # Regex scanning is CPU-bound, so larger commits are spread across processes;
+    # small ones stay serial to avoid worker startup cost
+    if len(files) < min_parallel_files:
+        results = [_scan_file(file_path) for file_path in files]
+    else:
+        from concurrent.futures import ProcessPoolExecutor
+        with ProcessPoolExecutor() as executor:
+            results = list(executor.map(_scan_file, files, chunksize=4))
+    
+    for file_path, matches, error, truncated in results:
+        if error is not None:
             if verbose:
-                console.print(f"[yellow]Warning:[/yellow] Error scanning {file_path}: {e}")
+                console.print(f"[yellow]Warning:[/yellow] Error scanning {file_path}: {error}")
+            continue
+        
+        if truncated and verbose:
+            console.print(f"[yellow]Note:[/yellow] Only the first {MAX_SCAN_BYTES // (1024 * 1024)} MiB of {file_path} were scanned")
+        
+        if matches:
+            console.print(f"\n[red]⚠️  Secrets detected in {file_path}:[/red]")
+            for match in matches:
+                console.print(f"  Line {match.line_number}: {match.type.replace('_', ' ')} - {match.matched_text}")
+                if verbose:
+                    console.print(f"    Context: {match.context}")
+            total_secrets += len(matches)
     
     if total_secrets > 0:
         console.print(f"\n[red]❌ Found {total_secrets} potential secret(s)[/red]")
@@ -135,6 +215,9 @@ def main() -> int:
     if args.secrets_only:
         return 1 if run_secrets_scan(args.filenames, args.verbose) > 0 else 0
     
+    from .providers import ReviewType
+    from .utils.event_loop import run_async
+    
     # Determine review types
     if args.security_only:
         review_types = [ReviewType.SECURITY]
@@ -143,7 +226,7 @@ def main() -> int:
         review_types = [ReviewType.SECURITY, ReviewType.CORRECTNESS]
     
     # Run review
-    findings_count = asyncio.run(run_review(
+    findings_count = run_async(run_review(
         args.filenames,
         review_types,
         args.config,
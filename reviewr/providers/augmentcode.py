@@ -1,124 +1,152 @@
+import gzip
 import json
+import hashlib
+import logging
 import asyncio
-from typing import List, Optional, Dict, Any
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import weakref
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+from email.utils import parsedate_to_datetime
+from datetime import datetime, timezone
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception
 import httpx
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
+
 from .base import LLMProvider, CodeChunk, ReviewType, ReviewFinding
+from ..utils.cache import LLMResponseCache
+from ..utils.json_salvage import salvage_json_array
+from ..utils.tokens import count_tokens
 
 try:
     from ..security import get_security_prompt_context
     SECURITY_CONTEXT_AVAILABLE = True
+    # The vulnerability database context is constant; build it once per process
+    _security_prompt_context = lru_cache(maxsize=1)(get_security_prompt_context)
 except ImportError:
     SECURITY_CONTEXT_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
 
-class AugmentCodeProvider(LLMProvider):
-    """Augment Code LLM provider."""
 
-    def __init__(self, api_key: str, model: str = "augment-code-1",
-                 max_tokens: int = 8192, temperature: float = 0.0, timeout: int = 60):
-        """Initialize Augment Code provider."""
-        super().__init__(api_key, model, max_tokens, temperature, timeout)
-        self.base_url = "https://api.augmentcode.com/v1"
-        self.client = httpx.AsyncClient(
-            headers={
-                "Authorization": f"Bearer {api_key}",
-                "Content-Type": "application/json"
-            },
-            timeout=timeout
-        )
+def _json_dumps(obj: Any) -> bytes:
+    """Serialize to JSON bytes, with orjson when available."""
+    return orjson.dumps(obj) if orjson is not None else json.dumps(obj).encode()
 
-        # Model context sizes
-        self._context_sizes = {
-            "augment-code-1": 200000,
-            "augment-code-2": 200000,
-        }
 
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
-    async def review_code(
-        self,
-        chunk: CodeChunk,
-        review_types: List[ReviewType],
-        additional_context: Optional[Dict[str, Any]] = None
-    ) -> List[ReviewFinding]:
-        """Review code using Augment Code."""
-        prompt = self._build_augmentcode_prompt(chunk, review_types)
+def _json_loads(data: Any) -> Any:
+    """Parse JSON from str or bytes, with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
 
-        try:
-            response = await self.client.post(
-                f"{self.base_url}/chat/completions",
-                json={
-                    "model": self.model,
-                    "messages": [
-                        {
-                            "role": "system",
-                            "content": "You are an expert code security reviewer specializing in identifying critical security vulnerabilities. Provide specific, actionable feedback with multiple solution options and clear tradeoffs."
-                        },
-                        {
-                            "role": "user",
-                            "content": prompt
-                        }
-                    ],
-                    "max_tokens": self.max_tokens,
-                    "temperature": self.temperature
-                }
-            )
 
-            response.raise_for_status()
-            data = response.json()
+if msgspec is not None:
+    class _FindingRecord(msgspec.Struct):
+        """Schema of one finding in a response, decoded and validated in C."""
+        type: ReviewType
+        severity: str
+        line_start: int
+        line_end: int
+        message: str
+        suggestion: Optional[str] = None
+        confidence: float = 1.0
 
-            # Track usage
-            usage = data.get("usage", {})
-            input_tokens = usage.get("prompt_tokens", 0)
-            output_tokens = usage.get("completion_tokens", 0)
-            self._track_usage(input_tokens, output_tokens)
+    class _ChunkRecord(msgspec.Struct):
+        """Findings for one chunk of a batched review."""
+        chunk_id: int
+        findings: List[_FindingRecord] = []
 
-            # Parse response
-            content = data["choices"][0]["message"]["content"]
-            findings = self._parse_response(content, chunk)
+    class _BatchRecord(msgspec.Struct):
+        """Response to a batched review."""
+        results: List[_ChunkRecord]
 
-            return findings
+    _decode_findings = msgspec.json.Decoder(List[_FindingRecord]).decode
+    _decode_batch = msgspec.json.Decoder(_BatchRecord).decode
+else:
+    _decode_findings = None
+    _decode_batch = None
 
-        except Exception as e:
-            print(f"Error reviewing code with Augment Code: {e}")
-            raise
 
-    def _build_augmentcode_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> str:
-        """Build Augment Code-specific prompt focused on critical security issues."""
-        # Check if this is an explain-only request
-        if len(review_types) == 1 and review_types[0] == ReviewType.EXPLAIN:
-            return self._build_augmentcode_explain_prompt(chunk)
+# Responses this short are checked for "no findings" before decoding
+_EMPTY_RESPONSE_MAX_CHARS = 16
 
-        # Use comprehensive security context if security review is requested
-        if ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE:
-            security_context = get_security_prompt_context()
-            return self._build_augmentcode_security_prompt(chunk, review_types, security_context)
 
-        review_types_str = ', '.join(rt.value for rt in review_types)
+# Request bodies at least this large are sent gzip-compressed
+_GZIP_MIN_BYTES = 1024
 
-        prompt = f"""CRITICAL SECURITY CODE REVIEW
+# Failures worth retrying; anything else (bad requests, auth errors, parse
+# errors, bugs) fails on the first attempt
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 529})
+_TRANSIENT_ERRORS = (httpx.TimeoutException, httpx.ConnectError, httpx.RemoteProtocolError)
+_MAX_RETRY_AFTER = 60.0
+# Jittered, so concurrent reviews don't retry in lockstep against rate limits
+_backoff = wait_random_exponential(multiplier=2, max=30)
 
-File: {chunk.file_path}
-Lines: {chunk.start_line}-{chunk.end_line}
-Language: {chunk.language}
-Review Types: {review_types_str}
 
-CODE TO REVIEW:
-```{chunk.language}
-{chunk.content}
+def _is_retryable(exc: BaseException) -> bool:
+    """Whether a failed request is transient and worth retrying."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code in _RETRYABLE_STATUS_CODES
+    return isinstance(exc, _TRANSIENT_ERRORS)
+
+
+def _retry_after(response: httpx.Response) -> Optional[float]:
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date)."""
+    value = response.headers.get("retry-after")
+    if not value:
+        return None
+    try:
+        seconds = float(value)
+    except ValueError:
+        try:
+            seconds = (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds()
+        except (TypeError, ValueError):
+            return None
+    return min(max(seconds, 0.0), _MAX_RETRY_AFTER)
+
+
+def _retry_wait(retry_state) -> float:
+    """Honor the server's Retry-After, else back off exponentially with jitter."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, httpx.HTTPStatusError):
+        delay = _retry_after(exc.response)
+        if delay is not None:
+            return delay
+    return _backoff(retry_state)
+
+
+_SYSTEM_PROMPT = (
+    "You are an expert code security reviewer specializing in identifying critical security "
+    "vulnerabilities. Provide specific, actionable feedback with multiple solution options and clear tradeoffs."
+)
+
+# Prompt skeletons, filled per chunk with str.format_map() so the constant
+# scaffolding is not rebuilt for every request. Literal braces are doubled.
+# The stable instructions lead and the per-chunk code comes last, so
+# consecutive requests share a long prompt prefix (for server-side caching).
+_CONTEXT_BLOCK = "\nSURROUNDING CONTEXT:\n```{language}\n{context}\n```\n"
+
+_SECURITY_CONTEXT_BLOCK = """
+SURROUNDING CODE CONTEXT:
+```{language}
+{context}
 ```
 """
 
-        if chunk.context:
-            prompt += f"\nSURROUNDING CONTEXT:\n```{chunk.language}\n{chunk.context}\n```\n"
-
-        prompt += f"""
-INSTRUCTIONS:
+_REVIEW_INSTRUCTIONS = """INSTRUCTIONS:
 Focus ONLY on critical and high-severity security issues that could lead to:
 - Data breaches or unauthorized access
 - Code injection vulnerabilities (SQL, XSS, Command, etc.)
@@ -137,9 +165,10 @@ For each critical issue found:
 4. Include concrete code snippets for EACH solution
 5. Rate confidence (0.9-1.0 for critical security issues)
 
-RESPONSE FORMAT (JSON array):
-[
-  {{
+"""
+
+# One finding in the response format (inside a JSON array)
+_FINDING_FORMAT = """  {{
     "type": "security|performance|correctness|maintainability|architecture|standards",
     "severity": "critical|high",
     "line_start": number,
@@ -148,153 +177,128 @@ RESPONSE FORMAT (JSON array):
     "suggestion": "Multiple fix options with tradeoffs:\n\nOPTION 1 - Quick Fix:\nCode: [snippet]\nPros: [benefits]\nCons: [drawbacks]\n\nOPTION 2 - Secure Fix:\nCode: [snippet]\nPros: [benefits]\nCons: [drawbacks]\n\nOPTION 3 - Best Practice:\nCode: [snippet]\nPros: [benefits]\nCons: [drawbacks]\n\nRECOMMENDATION: [which option and why]",
     "confidence": 0.9-1.0
   }}
-]
+"""
 
-IMPORTANT: Only report critical/high severity issues. Ignore minor style or low-impact items.
-If no critical/high issues found, return: []
+# Response formats, emitted verbatim by every request of a kind
+_RESP_FMT_REVIEW = """RESPONSE FORMAT (JSON array):
+[
+""" + _FINDING_FORMAT + """]
 """
-        return prompt
 
-    def _build_augmentcode_explain_prompt(self, chunk: CodeChunk) -> str:
-        """Build Augment Code-specific explanation prompt."""
-        prompt = f"""COMPREHENSIVE CODE EXPLANATION
+_REVIEW_PROMPT = """CRITICAL SECURITY CODE REVIEW
+
+""" + _REVIEW_INSTRUCTIONS + _RESP_FMT_REVIEW + """
+IMPORTANT: Only report critical/high severity issues. Ignore minor style or low-impact items.
+If no critical/high issues found, return: []
 
-File: {chunk.file_path}
-Lines: {chunk.start_line}-{chunk.end_line}
-Language: {chunk.language}
+Review Types: {review_types}
 
-CODE TO EXPLAIN:
-```{chunk.language}
-{chunk.content}
+CODE TO REVIEW:
+File: {file_path}
+Lines: {start_line}-{end_line}
+Language: {language}
+```{language}
+{content}
 ```
+{context}"""
+
+_RESP_FMT_BATCH = """RESPONSE FORMAT (JSON object with one result per chunk):
+{{
+  "results": [
+    {{
+      "chunk_id": number,
+      "findings": [
+""" + _FINDING_FORMAT + """      ]
+    }}
+  ]
+}}
 """
 
-        if chunk.context:
-            prompt += f"\nSURROUNDING CONTEXT:\n```{chunk.language}\n{chunk.context}\n```\n"
+# Several chunks in one request
+_BATCH_PROMPT = """CRITICAL SECURITY CODE REVIEW
 
-        prompt += f"""
-Provide a detailed technical explanation covering:
+Review Types: {review_types}
 
-1. **Purpose & Functionality**: What does this code accomplish?
-2. **Key Components**: Main classes, functions, variables, and their relationships
-3. **Execution Flow**: Step-by-step logic flow and decision points
-4. **Design Patterns**: Any patterns or architectural approaches used
-5. **Dependencies**: External libraries, APIs, or modules required
-6. **Security Considerations**: Any security-relevant aspects or concerns
-7. **Performance Characteristics**: Notable performance implications
-8. **Potential Issues**: Edge cases, limitations, or improvement opportunities
+""" + _REVIEW_INSTRUCTIONS + """The code to review follows as {count} independent chunks. Each chunk starts
+with a <<<CHUNK_ID=n>>> line. Review every chunk on its own and report line
+numbers within that chunk's Lines range.
+
+""" + _RESP_FMT_BATCH + """
+IMPORTANT: Only report critical/high severity issues. Ignore minor style or low-impact items.
+Use an empty findings list for chunks without critical/high issues.
+
+{chunks}"""
+
+_BATCH_CHUNK = """<<<CHUNK_ID={chunk_id}>>>
+File: {file_path}
+Lines: {start_line}-{end_line}
+Language: {language}
+```{language}
+{content}
+```
+{context}
+"""
 
-RESPONSE FORMAT (JSON array with single finding):
+_RESP_FMT_EXPLAIN = """RESPONSE FORMAT (JSON array with single finding):
 [
   {{
     "type": "explain",
     "severity": "info",
-    "line_start": {chunk.start_line},
-    "line_end": {chunk.end_line},
+    "line_start": number,
+    "line_end": number,
     "message": "Comprehensive explanation covering all 8 points above in clear, structured format",
     "suggestion": "Recommendations for improvements, security hardening, or performance optimization with specific code examples",
     "confidence": 1.0
   }}
 ]
 """
-        return prompt
-
-    def _parse_response(self, content: str, chunk: CodeChunk) -> List[ReviewFinding]:
-        """Parse Augment Code's response into ReviewFinding objects."""
-        # Remove markdown code blocks if present
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-
-        try:
-            findings_data = json.loads(content)
-
-            if not isinstance(findings_data, list):
-                print(f"Warning: Expected list, got {type(findings_data)}")
-                return []
-
-            findings = []
-            for item in findings_data:
-                try:
-                    # Map type string to ReviewType enum
-                    review_type = ReviewType(item["type"])
-
-                    finding = ReviewFinding(
-                        type=review_type,
-                        severity=item["severity"],
-                        file_path=chunk.file_path,
-                        line_start=item["line_start"],
-                        line_end=item["line_end"],
-                        message=item["message"],
-                        suggestion=item.get("suggestion"),
-                        code_snippet=None,  # Will be filled by orchestrator
-                        confidence=item.get("confidence", 1.0),
-                    )
-                    findings.append(finding)
-                except (KeyError, ValueError) as e:
-                    print(f"Warning: Skipping invalid finding: {e}")
-                    continue
-
-            return findings
-
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Response content: {content[:500]}")
-            return []
-
-    def estimate_tokens(self, text: str) -> int:
-        """Estimate tokens using standard approximation (roughly 4 chars per token)."""
-        return len(text) // 4
 
-    def get_max_context_size(self) -> int:
-        """Get maximum context size for the current model."""
-        return self._context_sizes.get(self.model, 200000)
+_EXPLAIN_PROMPT = """COMPREHENSIVE CODE EXPLANATION
 
-    async def __aenter__(self):
-        """Async context manager entry."""
-        return self
-
-    async def __aexit__(self, exc_type, exc_val, exc_tb):
-        """Async context manager exit - close HTTP client."""
-        await self.client.aclose()
-
-    def _build_augmentcode_security_prompt(self, chunk: CodeChunk, review_types: List[ReviewType], security_context: str) -> str:
-        """Build Augment Code-specific security-focused prompt with comprehensive vulnerability database."""
-
-        prompt = f"""{security_context}
+Provide a detailed technical explanation covering:
 
-═══════════════════════════════════════════════════════════════════════════════
-CODE UNDER REVIEW
-═══════════════════════════════════════════════════════════════════════════════
+1. **Purpose & Functionality**: What does this code accomplish?
+2. **Key Components**: Main classes, functions, variables, and their relationships
+3. **Execution Flow**: Step-by-step logic flow and decision points
+4. **Design Patterns**: Any patterns or architectural approaches used
+5. **Dependencies**: External libraries, APIs, or modules required
+6. **Security Considerations**: Any security-relevant aspects or concerns
+7. **Performance Characteristics**: Notable performance implications
+8. **Potential Issues**: Edge cases, limitations, or improvement opportunities
 
-FILE: {chunk.file_path}
-LINES: {chunk.start_line}-{chunk.end_line}
-LANGUAGE: {chunk.language}
+""" + _RESP_FMT_EXPLAIN + """
+Set line_start and line_end to the Lines range of the code below.
 
-```{chunk.language}
-{chunk.content}
+CODE TO EXPLAIN:
+File: {file_path}
+Lines: {start_line}-{end_line}
+Language: {language}
+```{language}
+{content}
 ```
-"""
+{context}"""
 
-        if chunk.context:
-            prompt += f"""
-SURROUNDING CODE CONTEXT:
-```{chunk.language}
-{chunk.context}
-```
+_RESP_FMT_SECURITY = """RESPONSE FORMAT (JSON array):
+[
+  {{
+    "type": "security",
+    "severity": "critical|high",
+    "line_start": <number>,
+    "line_end": <number>,
+    "message": "CWE-XXX: [Name]\\n\\nDETAILS:\\n[description]\\n\\nEXPLOITATION:\\n[scenario]\\n\\nIMPACT:\\n[consequences]",
+    "suggestion": "[Format as shown above with 3 options]",
+    "confidence": <0.9-1.0>
+  }}
+]
 """
 
-        prompt += """
+_SECURITY_PROMPT = """{security_context}
+
 ═══════════════════════════════════════════════════════════════════════════════
 YOUR CRITICAL SECURITY AUDIT TASK
 ═══════════════════════════════════════════════════════════════════════════════
 
-As an EXPERT SECURITY RESEARCHER, systematically analyze this code for ALL exploitable vulnerabilities.
+As an EXPERT SECURITY RESEARCHER, systematically analyze the code under review below for ALL exploitable vulnerabilities.
 
 For EACH critical/high severity vulnerability, provide:
 
@@ -333,19 +337,7 @@ For EACH critical/high severity vulnerability, provide:
 
 6. RECOMMENDATION with clear justification
 
-RESPONSE FORMAT (JSON array):
-[
-  {
-    "type": "security",
-    "severity": "critical|high",
-    "line_start": <number>,
-    "line_end": <number>,
-    "message": "CWE-XXX: [Name]\\n\\nDETAILS:\\n[description]\\n\\nEXPLOITATION:\\n[scenario]\\n\\nIMPACT:\\n[consequences]",
-    "suggestion": "[Format as shown above with 3 options]",
-    "confidence": <0.9-1.0>
-  }
-]
-
+""" + _RESP_FMT_SECURITY + """
 CRITICAL RULES:
 ✓ ONLY critical/high severity
 ✓ CONCRETE code examples
@@ -354,5 +346,541 @@ CRITICAL RULES:
 ✓ Confidence ≥0.9
 
 Return [] if no critical/high issues found.
-"""
-        return prompt
+
+═══════════════════════════════════════════════════════════════════════════════
+CODE UNDER REVIEW
+═══════════════════════════════════════════════════════════════════════════════
+
+FILE: {file_path}
+LINES: {start_line}-{end_line}
+LANGUAGE: {language}
+
+```{language}
+{content}
+```
+{context}"""
+
+
+@lru_cache(maxsize=8)
+def _security_prompt_template(security_context: str) -> str:
+    """Specialize the security prompt skeleton for a (constant) security context."""
+    escaped = security_context.replace("{", "{{").replace("}", "}}")
+    return _SECURITY_PROMPT.replace("{security_context}", escaped, 1)
+
+
+@lru_cache(maxsize=8)
+def _batch_prompt_template(security_context: str) -> str:
+    """The batch prompt skeleton, led by a security context when one is given."""
+    if not security_context:
+        return _BATCH_PROMPT
+    escaped = security_context.replace("{", "{{").replace("}", "}}")
+    return f"{escaped}\n\n{_BATCH_PROMPT}"
+
+
+@lru_cache(maxsize=32)
+def _template_digest(template: str) -> str:
+    """
+    Short digest of a prompt skeleton, computed once per skeleton.
+
+    Request keys hash this instead of the thousands of constant characters
+    (security context, instructions) repeated in every prompt.
+    """
+    return hashlib.blake2b(template.encode("utf-8"), digest_size=8).hexdigest()
+
+
+@lru_cache(maxsize=32)
+def _review_types_str(review_types: Tuple[ReviewType, ...]) -> str:
+    """The review types as listed in prompts, joined once per combination."""
+    return ', '.join(rt.value for rt in review_types)
+
+
+class AugmentCodeProvider(LLMProvider):
+    """Augment Code LLM provider."""
+
+    # One keep-alive connection pool per event loop, shared by all instances
+    # (the Authorization header is sent per request)
+    _shared_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]' = (
+        weakref.WeakKeyDictionary()
+    )
+    _pool_limits = httpx.Limits(max_connections=100, max_keepalive_connections=20, keepalive_expiry=30)
+
+    def __init__(self, api_key: str, model: str = "augment-code-1",
+                 max_tokens: int = 8192, temperature: float = 0.0, timeout: int = 60,
+                 response_cache: Optional[LLMResponseCache] = None, stream: bool = True,
+                 compress_requests: bool = True):
+        """
+        Initialize Augment Code provider.
+        
+        Args:
+            response_cache: Cache for raw API responses of deterministic
+                (temperature 0) requests; no caching when None
+            stream: Receive completions as server-sent events
+            compress_requests: Gzip request bodies larger than 1 KB; turned
+                off automatically if the server rejects them
+        """
+        super().__init__(api_key, model, max_tokens, temperature, timeout, response_cache)
+        self.stream = stream
+        self.compress_requests = compress_requests
+        self.base_url = "https://api.augmentcode.com/v1"
+        self._headers = {
+            "Authorization": f"Bearer {api_key}",
+            "Content-Type": "application/json"
+        }
+        self._gzip_headers = {**self._headers, "Content-Encoding": "gzip"}
+        # Overrides the shared client when set (e.g. a custom transport)
+        self._client: Optional[httpx.AsyncClient] = None
+
+        # In-flight requests by request key, so identical concurrent
+        # requests share a single API call
+        self._inflight: Dict[str, asyncio.Future] = {}
+
+        # Model context sizes
+        self._context_sizes = {
+            "augment-code-1": 200000,
+            "augment-code-2": 200000,
+        }
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_retry_wait,
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    )
+    async def review_code(
+        self,
+        chunk: CodeChunk,
+        review_types: List[ReviewType],
+        additional_context: Optional[Dict[str, Any]] = None
+    ) -> List[ReviewFinding]:
+        """Review code using Augment Code."""
+        if not self._is_reviewable(chunk, review_types):
+            return []
+        template, fields = self._prompt_parts(chunk, review_types)
+
+        try:
+            data = await self._complete(
+                self._payload(template.format_map(fields)), self._key_material(template, fields)
+            )
+
+            # Parse response
+            content = data["choices"][0]["message"]["content"]
+            findings = self._parse_response(content, chunk)
+
+            return findings
+
+        except Exception as e:
+            logger.error("Error reviewing code with Augment Code: %s", e)
+            raise
+
+    async def review_many(
+        self,
+        chunks: List[CodeChunk],
+        review_types: List[ReviewType],
+        concurrency: int = 10
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review chunks concurrently, one request per chunk.
+
+        Args:
+            chunks: Code chunks to review
+            review_types: Types of reviews to perform
+            concurrency: Maximum requests in flight at once
+
+        Returns:
+            Findings for each chunk, in the order of chunks
+        """
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def review(chunk: CodeChunk) -> List[ReviewFinding]:
+            async with semaphore:
+                return await self.review_code(chunk, review_types)
+
+        return list(await asyncio.gather(*(review(chunk) for chunk in chunks)))
+
+    async def review_code_batch(
+        self,
+        chunks: List[CodeChunk],
+        review_types: List[ReviewType],
+        batch_size: int = 8
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review several chunks with one request per batch.
+
+        Batches are sent concurrently. A batch whose request fails, or whose
+        response doesn't follow the batch format, is reviewed again chunk by
+        chunk, so one failure doesn't lose the other batches' findings.
+
+        Args:
+            chunks: Code chunks to review
+            review_types: Types of reviews to perform
+            batch_size: Maximum chunks per request
+
+        Returns:
+            Findings for each chunk, in the order of chunks
+        """
+        # Chunks with nothing to review aren't sent
+        skipped = [not self._is_reviewable(chunk, review_types) for chunk in chunks]
+        if any(skipped):
+            reviewed = [chunk for chunk, skip in zip(chunks, skipped) if not skip]
+            findings = iter(await self.review_code_batch(reviewed, review_types, batch_size))
+            return [[] if skip else next(findings) for skip in skipped]
+
+        # Explanations are written per chunk
+        if batch_size <= 1 or review_types == [ReviewType.EXPLAIN]:
+            return [await self.review_code(chunk, review_types) for chunk in chunks]
+
+        batches = [chunks[i:i + batch_size] for i in range(0, len(chunks), batch_size)]
+        return await self._gather_batches(
+            batches, review_types, lambda batch: self._review_batch(batch, review_types)
+        )
+
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_retry_wait,
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    )
+    async def _review_batch(self, batch: List[CodeChunk], review_types: List[ReviewType]) -> List[List[ReviewFinding]]:
+        """Review one batch of chunks in a single request."""
+        if len(batch) == 1:
+            return [await self.review_code(batch[0], review_types)]
+
+        template, fields = self._batch_prompt_parts(batch, review_types)
+        data = await self._complete(
+            self._payload(template.format_map(fields)), self._key_material(template, fields)
+        )
+        results = self._parse_batch_response(data["choices"][0]["message"]["content"], batch)
+        if results is None:
+            logger.warning("Unexpected batch response, reviewing chunks individually")
+            return [await self.review_code(chunk, review_types) for chunk in batch]
+        return results
+
+    def _payload(self, prompt: str) -> Dict[str, Any]:
+        """Build the chat completion request for a prompt."""
+        return {
+            "model": self.model,
+            "messages": [
+                {"role": "system", "content": _SYSTEM_PROMPT},
+                {"role": "user", "content": prompt},
+            ],
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature
+        }
+
+    async def _complete(self, payload: Dict[str, Any],
+                        key_material: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+        """
+        Get the completion for a request.
+
+        Identical deterministic requests are answered from the cache, or share
+        the response of an identical request already in flight. The request
+        key is computed from key_material when given, else from the payload.
+        """
+        key = self._request_key(payload if key_material is None else key_material)
+        if key and self.response_cache is not None:
+            data = self.response_cache.get(key)
+            if data is not None:
+                return data
+
+        if key is None:
+            return await self._fetch_completion(payload, key)
+
+        request = self._inflight.get(key)
+        if request is None:
+            request = asyncio.ensure_future(self._fetch_completion(payload, key))
+            self._inflight[key] = request
+            request.add_done_callback(
+                lambda done: self._inflight.pop(key) if self._inflight.get(key) is done else None
+            )
+        # Shielded so one caller's cancellation doesn't cancel the others
+        return await asyncio.shield(request)
+
+    async def _fetch_completion(self, payload: Dict[str, Any], key: Optional[str]) -> Dict[str, Any]:
+        """Send a chat completion request and cache the raw response."""
+        if self.stream:
+            payload = {**payload, "stream": True, "stream_options": {"include_usage": True}}
+
+        # Serialized up front (in C with orjson) instead of through httpx's json=
+        body = _json_dumps(payload)
+        data = None
+        if self.compress_requests and len(body) >= _GZIP_MIN_BYTES:
+            # Prompts are mostly repetitive text, which gzip shrinks several times over
+            data = await self._post_completion(gzip.compress(body, compresslevel=1), compressed=True)
+            if data is None:
+                # The server doesn't take compressed bodies; send them plain from now on
+                self.compress_requests = False
+        if data is None:
+            data = await self._post_completion(body, compressed=False)
+
+        # Track usage
+        usage = data.get("usage", {})
+        input_tokens = usage.get("prompt_tokens", 0)
+        output_tokens = usage.get("completion_tokens", 0)
+        self._track_usage(input_tokens, output_tokens)
+
+        if key and self.response_cache is not None:
+            self.response_cache.set(key, data)
+
+        return data
+
+    async def _post_completion(self, body: bytes, compressed: bool) -> Optional[Dict[str, Any]]:
+        """
+        POST a serialized chat completion request and read the completion.
+
+        Returns None if the server rejects a compressed body (HTTP 415).
+        Responses are decompressed by httpx, which advertises the encodings it
+        can decode in Accept-Encoding.
+        """
+        async with self.client.stream(
+            "POST",
+            f"{self.base_url}/chat/completions",
+            content=body,
+            headers=self._gzip_headers if compressed else self._headers,
+            timeout=self.timeout
+        ) as response:
+            if compressed and response.status_code == 415:
+                return None
+            response.raise_for_status()
+            if response.headers.get("content-type", "").startswith("text/event-stream"):
+                return await self._read_event_stream(response)
+            return _json_loads(await response.aread())
+
+    async def _read_event_stream(self, response: httpx.Response) -> Dict[str, Any]:
+        """
+        Assemble a streamed completion into the shape of a non-streamed one.
+
+        Deltas are decoded as they arrive, overlapping parsing with generation
+        instead of buffering the whole body and decoding it afterwards.
+        """
+        parts = []
+        usage: Dict[str, Any] = {}
+
+        async for line in response.aiter_lines():
+            if not line.startswith("data:"):
+                continue
+            event = line[5:].strip()
+            if event == "[DONE]":
+                break
+
+            chunk = _json_loads(event)
+            for choice in chunk.get("choices") or ():
+                content = (choice.get("delta") or {}).get("content")
+                if content:
+                    parts.append(content)
+            if chunk.get("usage"):
+                usage = chunk["usage"]
+
+        return {"choices": [{"message": {"content": "".join(parts)}}], "usage": usage}
+
+    def _build_augmentcode_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> str:
+        """Build Augment Code-specific prompt focused on critical security issues."""
+        template, fields = self._prompt_parts(chunk, review_types)
+        return template.format_map(fields)
+
+    def _prompt_parts(self, chunk: CodeChunk, review_types: List[ReviewType]) -> Tuple[str, Dict[str, Any]]:
+        """Select the prompt skeleton for a review and collect the chunk's fields for it."""
+        # Check if this is an explain-only request
+        if len(review_types) == 1 and review_types[0] == ReviewType.EXPLAIN:
+            return _EXPLAIN_PROMPT, self._prompt_fields(chunk, _CONTEXT_BLOCK)
+
+        # Use comprehensive security context if security review is requested
+        if ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE:
+            return (
+                _security_prompt_template(_security_prompt_context()),
+                self._prompt_fields(chunk, _SECURITY_CONTEXT_BLOCK),
+            )
+
+        return _REVIEW_PROMPT, self._prompt_fields(
+            chunk, _CONTEXT_BLOCK, review_types=_review_types_str(tuple(review_types))
+        )
+
+    def _build_augmentcode_explain_prompt(self, chunk: CodeChunk) -> str:
+        """Build Augment Code-specific explanation prompt."""
+        return _EXPLAIN_PROMPT.format_map(self._prompt_fields(chunk, _CONTEXT_BLOCK))
+
+    def _build_augmentcode_batch_prompt(self, batch: List[CodeChunk], review_types: List[ReviewType]) -> str:
+        """Build one prompt reviewing several chunks, each tagged with its index."""
+        template, fields = self._batch_prompt_parts(batch, review_types)
+        return template.format_map(fields)
+
+    def _batch_prompt_parts(self, batch: List[CodeChunk],
+                            review_types: List[ReviewType]) -> Tuple[str, Dict[str, Any]]:
+        """Select the batch prompt skeleton and collect the fields for a batch."""
+        use_security = ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE
+        return _batch_prompt_template(_security_prompt_context() if use_security else ""), {
+            "review_types": _review_types_str(tuple(review_types)),
+            "count": len(batch),
+            "chunks": "".join(
+                _BATCH_CHUNK.format_map(self._prompt_fields(chunk, _CONTEXT_BLOCK, chunk_id=str(chunk_id)))
+                for chunk_id, chunk in enumerate(batch)
+            ),
+        }
+
+    def _key_material(self, template: str, fields: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Stand-in for a request payload when computing its request key.
+
+        Identifies the same request as the payload, with the constant prompt
+        text replaced by digests.
+        """
+        return {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "system": _template_digest(_SYSTEM_PROMPT),
+            "template": _template_digest(template),
+            "fields": fields,
+        }
+
+    def _parse_response(self, content: str, chunk: CodeChunk) -> List[ReviewFinding]:
+        """Parse Augment Code's response into ReviewFinding objects."""
+        # Remove markdown code blocks if present
+        content = self._strip_code_fence(content)
+
+        # No findings (the common case) needs no JSON decode
+        if len(content) <= _EMPTY_RESPONSE_MAX_CHARS and content.strip() in ("", "[]"):
+            return []
+
+        # Typed decode in one pass; a response with any invalid record falls
+        # through to the lenient parse below, which skips just that record
+        if _decode_findings is not None:
+            try:
+                return self._findings_from_records(_decode_findings(content), chunk)
+            except msgspec.DecodeError:
+                pass
+
+        try:
+            findings_data = _json_loads(content)
+
+            if not isinstance(findings_data, list):
+                logger.warning("Expected list, got %s", type(findings_data))
+                return []
+
+            return self._findings_from_items(findings_data, chunk)
+
+        except json.JSONDecodeError as e:
+            # Prose around the array or a truncated response still holds findings
+            items = salvage_json_array(content)
+            if items:
+                return self._findings_from_items(items, chunk)
+            # %.500s truncates only if the record is emitted
+            logger.error("Error parsing JSON response: %s; response content: %.500s", e, content)
+            return []
+
+    def _parse_batch_response(self, content: str, batch: List[CodeChunk]) -> Optional[List[List[ReviewFinding]]]:
+        """
+        Parse a batched review into findings per chunk.
+
+        Returns None when the response doesn't follow the batch format.
+        """
+        content = self._strip_code_fence(content)
+        results: List[List[ReviewFinding]] = [[] for _ in batch]
+
+        if _decode_batch is not None:
+            try:
+                records = _decode_batch(content).results
+            except msgspec.DecodeError:
+                pass
+            else:
+                for record in records:
+                    if not 0 <= record.chunk_id < len(batch):
+                        return None
+                    results[record.chunk_id].extend(self._findings_from_records(record.findings, batch[record.chunk_id]))
+                return results
+
+        try:
+            data = _json_loads(content)
+            for entry in data["results"]:
+                chunk_id = entry["chunk_id"]
+                if not isinstance(chunk_id, int) or not 0 <= chunk_id < len(batch):
+                    return None
+                results[chunk_id].extend(self._findings_from_items(entry.get("findings") or [], batch[chunk_id]))
+        except (ValueError, KeyError, TypeError, AttributeError):
+            return None
+        return results
+
+    @staticmethod
+    def _findings_from_records(records: List[Any], chunk: CodeChunk) -> List[ReviewFinding]:
+        """Build findings from validated msgspec records."""
+        file_path = chunk.file_path
+        # Positional, in field order; code_snippet is filled by the orchestrator
+        return [
+            ReviewFinding(
+                record.type,
+                record.severity,
+                file_path,
+                record.line_start,
+                record.line_end,
+                record.message,
+                record.suggestion,
+                None,
+                record.confidence,
+            )
+            for record in records
+        ]
+
+    def estimate_tokens(self, text: str) -> int:
+        """Count tokens with tiktoken when available (roughly 4 chars per token otherwise)."""
+        return count_tokens(text)
+
+    def get_max_context_size(self) -> int:
+        """Get maximum context size for the current model."""
+        return self._context_sizes.get(self.model, 200000)
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """HTTP client for the running event loop (shared unless overridden)."""
+        if self._client is not None:
+            return self._client
+
+        loop = asyncio.get_running_loop()
+        client = self._shared_clients.get(loop)
+        if client is None or client.is_closed:
+            client = httpx.AsyncClient(http2=HTTP2_AVAILABLE, limits=self._pool_limits)
+            self._shared_clients[loop] = client
+        return client
+
+    @client.setter
+    def client(self, client: httpx.AsyncClient) -> None:
+        self._client = client
+
+    @classmethod
+    async def close_shared_client(cls) -> None:
+        """Close the shared connection pool of the running event loop."""
+        client = cls._shared_clients.pop(asyncio.get_running_loop(), None)
+        if client is not None:
+            await client.aclose()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """
+        Async context manager exit - close an overriding HTTP client.
+
+        The shared pool outlives individual providers; close it with
+        close_shared_client() at shutdown.
+        """
+        if self._client is not None:
+            await self._client.aclose()
+
+    def _build_augmentcode_security_prompt(self, chunk: CodeChunk, review_types: List[ReviewType], security_context: str) -> str:
+        """Build Augment Code-specific security-focused prompt with comprehensive vulnerability database."""
+        return _security_prompt_template(security_context).format_map(
+            self._prompt_fields(chunk, _SECURITY_CONTEXT_BLOCK)
+        )
+
+    @staticmethod
+    def _prompt_fields(chunk: CodeChunk, context_block: str, **extra: str) -> Dict[str, Any]:
+        """Collect the per-chunk fields substituted into a prompt skeleton."""
+        fields = {
+            "file_path": chunk.file_path,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "language": chunk.language,
+            "content": chunk.content,
+            "context": context_block.format(language=chunk.language, context=chunk.context) if chunk.context else "",
+        }
+        fields.update(extra)
+        return fields
@@ -1,14 +1,30 @@
+import sys
+import asyncio
+import logging
+import threading
+import weakref
 from abc import ABC, abstractmethod
-from dataclasses import dataclass
-from typing import List, Optional, Dict, Any
+from dataclasses import dataclass, FrozenInstanceError
+from functools import lru_cache
+from typing import Any, Awaitable, Callable, ClassVar, Dict, FrozenSet, Iterable, List, Optional, Tuple
 from enum import Enum
 
+from ..utils.cache import LLMResponseCache
+
 try:
     from ..security import get_security_prompt_context
     SECURITY_CONTEXT_AVAILABLE = True
+    # The vulnerability database context is constant; build it once per process
+    _security_prompt_context = lru_cache(maxsize=1)(get_security_prompt_context)
 except ImportError:
     SECURITY_CONTEXT_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
+
+
+# Slotted dataclasses (no per-instance __dict__) need Python 3.10+
+_SLOTS: Dict[str, bool] = {"slots": True} if sys.version_info >= (3, 10) else {}
+
 
 class ReviewType(Enum):
     """Types of code reviews."""
@@ -20,19 +36,313 @@ class ReviewType(Enum):
     STANDARDS = "standards"
     EXPLAIN = "explain"
 
+    # from_value(value) looks a member up by value like ReviewType(value),
+    # as a single dict lookup; unknown values raise KeyError. Set below.
+    from_value: ClassVar[Callable[[str], "ReviewType"]]
 
-@dataclass
-class CodeChunk:
-    """A chunk of code to be reviewed."""
-    content: str
-    file_path: str
-    start_line: int
-    end_line: int
-    language: str
-    context: Optional[str] = None  # Surrounding code for context
 
+_REVIEW_TYPE_BY_VALUE: Dict[str, ReviewType] = {member.value: member for member in ReviewType}
+ReviewType.from_value = staticmethod(_REVIEW_TYPE_BY_VALUE.__getitem__)
+
+
+# Review instructions for each review type, joined in the order requested
+_INSTRUCTION_FRAGMENTS: Dict[ReviewType, str] = {
+    ReviewType.SECURITY: """SECURITY REVIEW (CRITICAL FOCUS):
+Focus on HIGH and CRITICAL severity vulnerabilities:
+- SQL injection, XSS, CSRF, command injection vulnerabilities
+- Authentication/authorization bypasses and privilege escalation
+- Insecure data handling (passwords, tokens, PII, secrets in code)
+- Cryptographic weaknesses (weak algorithms, hardcoded keys, improper cert validation)
+- Input validation failures leading to code execution
+- Path traversal vulnerabilities and arbitrary file access
+- Insecure deserialization leading to RCE
+- Race conditions and TOCTOU issues with security impact
+
+For EACH security issue, provide:
+1. Vulnerability type and potential CWE/CVE reference
+2. Exploitation scenario and real-world impact
+3. MULTIPLE fix options (2-3) with specific code examples:
+   - Quick fix: Immediate mitigation (pros/cons)
+   - Secure fix: Comprehensive solution (pros/cons)
+   - Best practice: Industry-standard approach (pros/cons)
+4. Recommended approach with justification""",
+
+    ReviewType.PERFORMANCE: """PERFORMANCE REVIEW:
+- Inefficient algorithms (O(n²) where O(n) possible)
+- Unnecessary loops or nested iterations
+- Memory leaks and excessive allocations
+- Database N+1 queries
+- Blocking I/O in performance-critical paths
+- Missing caching opportunities
+- Inefficient data structures
+- Resource contention issues""",
+
+    ReviewType.CORRECTNESS: """CORRECTNESS REVIEW:
+- Logic errors and edge case handling
+- Null pointer/undefined reference risks
+- Off-by-one errors and boundary conditions
+- Race conditions and concurrency issues
+- Exception handling gaps
+- Type mismatches and casting errors
+- Resource cleanup failures
+- State management inconsistencies""",
+
+    ReviewType.MAINTAINABILITY: """MAINTAINABILITY REVIEW:
+- Code clarity and readability
+- Function/class size and complexity
+- Naming conventions and descriptiveness
+- Code duplication and DRY violations
+- Missing or inadequate documentation
+- Hard-coded values that should be configurable
+- Overly complex conditional logic
+- Tight coupling between components""",
+
+    ReviewType.ARCHITECTURE: """ARCHITECTURE REVIEW:
+- SOLID principle violations
+- Design pattern misuse or opportunities
+- Separation of concerns issues
+- Dependency injection opportunities
+- Layer boundary violations
+- Circular dependencies
+- Interface segregation needs
+- Single responsibility violations""",
+
+    ReviewType.STANDARDS: """STANDARDS REVIEW:
+- Language-specific idiom violations
+- Code style and formatting issues
+- Naming convention inconsistencies
+- Import/include organization
+- Comment style and placement
+- Error handling patterns
+- Logging and debugging practices
+- API design consistency""",
+}
+
+
+# One-line versions of the instructions, for review types that aren't the
+# focus of a review
+_INSTRUCTION_SUMMARIES: Dict[ReviewType, str] = {
+    ReviewType.SECURITY: "SECURITY: injection, auth bypass, secrets, weak crypto, path traversal, RCE",
+    ReviewType.PERFORMANCE: "PERFORMANCE: slow algorithms, N+1 queries, blocking I/O, leaks, no caching",
+    ReviewType.CORRECTNESS: "CORRECTNESS: logic errors, edge cases, null refs, races, error handling gaps",
+    ReviewType.MAINTAINABILITY: "MAINTAINABILITY: complexity, duplication, naming, docs, hard-coded values",
+    ReviewType.ARCHITECTURE: "ARCHITECTURE: SOLID violations, coupling, layering, circular dependencies",
+    ReviewType.STANDARDS: "STANDARDS: language idioms, style, naming, imports, error-handling patterns",
+}
+
+
+@lru_cache(maxsize=256)
+def _review_instructions(review_types: Tuple[ReviewType, ...], primary_types: FrozenSet[ReviewType]) -> str:
+    """Instructions for a combination of review types, built once per combination."""
+    return "\n\n".join(
+        (_INSTRUCTION_FRAGMENTS if review_type in primary_types else _INSTRUCTION_SUMMARIES)[review_type]
+        for review_type in review_types
+        if review_type in _INSTRUCTION_FRAGMENTS
+    )
+
+
+# Review and explain prompts, filled per chunk with a single str.format();
+# literal braces are doubled. The review prompt puts the chunk last, so its
+# instructions form a prefix shared by every chunk of a run, which providers
+# with automatic prefix caching (OpenAI, Gemini) can reuse.
+_REVIEW_INSTRUCTIONS = """You are a senior software engineer conducting a comprehensive code review. Analyze the code at the end of this prompt for the specified review types.
+
+REVIEW CRITERIA:
+{instructions}
+
+INSTRUCTIONS:
+- Only report genuine issues with clear impact on code quality, security, or maintainability
+- Be specific about the problem and provide actionable suggestions
+- Include line numbers for precise issue location
+- Rate confidence based on certainty of the issue (0.0-1.0)
+- Use appropriate severity levels: critical (security/data loss), high (bugs/major issues), medium (improvements), low (minor issues), info (suggestions)
+
+RESPONSE FORMAT (JSON array):
+[{{"type":"<review_type>","severity":"critical|high|medium|low|info","line_start":<n>,"line_end":<n>,"message":"<specific issue description>","suggestion":"<actionable fix>","confidence":<0.0-1.0>}}]
+
+Return [] if no issues found.
+
+"""
+
+_CHUNK_BLOCK = """FILE: {file_path} (Lines {start_line}-{end_line})
+
+```{language}
+{content}
+```{context}
+"""
 
-@dataclass
+_REVIEW_PROMPT = _REVIEW_INSTRUCTIONS + _CHUNK_BLOCK
+
+# Inserted after the instructions of a prompt reviewing several chunks
+_BATCH_FORMAT = """BATCH FORMAT:
+The code to review is split into chunks, each wrapped in <chunk id="N"> tags.
+Review every chunk on its own, and add "chunk_id": N (the id of the chunk the
+issue is in) to each finding. Line numbers refer to that chunk's file.
+
+"""
+
+_EXPLAIN_PROMPT = """You are a senior software engineer providing a comprehensive code explanation. Analyze and explain the following {language} code in detail.
+
+FILE: {file_path} (Lines {start_line}-{end_line})
+
+```{language}
+{content}
+```{context}
+
+EXPLANATION REQUIREMENTS:
+1. PURPOSE: What does this code accomplish? What problem does it solve?
+2. KEY COMPONENTS: Identify main classes, functions, variables, and their roles
+3. LOGIC FLOW: Trace the execution path and decision points
+4. PATTERNS: Identify design patterns, algorithms, or architectural approaches used
+5. DEPENDENCIES: External libraries, modules, or services this code relies on
+6. ENTRY POINTS: How is this code typically invoked or used?
+7. DATA FLOW: How data moves through the code and transforms
+8. ERROR HANDLING: How errors and edge cases are managed
+9. PERFORMANCE CONSIDERATIONS: Any notable performance characteristics
+10. RECOMMENDATIONS: Suggestions for improvements or best practices
+
+RESPONSE FORMAT (JSON):
+[{{"type":"explain","severity":"info","line_start":{start_line},"line_end":{end_line},"message":"<comprehensive explanation covering all requirements>","suggestion":"<recommendations for improvements, usage tips, or related best practices>","confidence":1.0}}]
+"""
+
+_CONTEXT_BLOCK = "\n\nCONTEXT:\n```{language}\n{context}\n```"
+
+
+# Security prompt skeleton, specialized once for the security context and
+# filled per chunk with str.format(); literal braces are doubled
+_SECURITY_CODE_UNDER_REVIEW = """
+
+═══════════════════════════════════════════════════════════════════════════════
+CODE UNDER REVIEW
+═══════════════════════════════════════════════════════════════════════════════
+
+FILE: {file_path}
+LINES: {start_line}-{end_line}
+LANGUAGE: {language}
+
+```{language}
+{content}
+```
+{context}"""
+
+_SECURITY_CONTEXT_BLOCK = """
+SURROUNDING CODE CONTEXT:
+```{language}
+{context}
+```
+"""
+
+_SECURITY_ANALYSIS_TASK = """
+═══════════════════════════════════════════════════════════════════════════════
+YOUR ANALYSIS TASK
+═══════════════════════════════════════════════════════════════════════════════
+
+Systematically analyze this code for ALL critical security vulnerabilities.
+For EACH vulnerability found, provide a complete report following the format above.
+
+RESPONSE FORMAT (JSON array):
+[
+  {
+    "type": "security",
+    "severity": "critical|high",
+    "line_start": <line_number>,
+    "line_end": <line_number>,
+    "message": "CWE-XXX: [Vulnerability Name]\\n\\nDETAILS:\\n[Full description]\\n\\nEXPLOITATION:\\n[How to exploit]\\n\\nIMPACT:\\n[Real-world consequences]",
+    "suggestion": "OPTION 1 - Quick Fix:\\n```\\n[code]\\n```\\n✅ PROS: [list]\\n❌ CONS: [list]\\n⏱️ Time: [estimate]\\n\\nOPTION 2 - Secure Fix:\\n```\\n[code]\\n```\\n✅ PROS: [list]\\n❌ CONS: [list]\\n⏱️ Time: [estimate]\\n\\nOPTION 3 - Best Practice:\\n```\\n[code]\\n```\\n✅ PROS: [list]\\n❌ CONS: [list]\\n⏱️ Time: [estimate]\\n\\nRECOMMENDATION: [Which option and why]",
+    "confidence": <0.9-1.0 for critical issues>
+  }
+]
+
+REMEMBER:
+- ONLY report CRITICAL and HIGH severity vulnerabilities
+- MUST provide 2-3 fix options with code examples
+- MUST include exploitation scenario
+- MUST use CWE references
+- Confidence 0.9+ for critical issues
+- Return [] if NO critical/high issues found
+
+BEGIN ANALYSIS NOW:
+"""
+
+
+def _escape_braces(text: str) -> str:
+    """Escape text for use as literal text in a str.format() template."""
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+@lru_cache(maxsize=8)
+def _security_prompt_template(security_context: str) -> str:
+    """The security prompt skeleton for a (constant) security context."""
+    return _escape_braces(security_context) + _SECURITY_CODE_UNDER_REVIEW + _escape_braces(_SECURITY_ANALYSIS_TASK)
+
+
+class CodeChunk:
+    """
+    A chunk of code to be reviewed.
+
+    The code is held as offsets into the text it was cut from, so the
+    overlapping chunks of a file share one string instead of each copying
+    their lines; ``content`` slices it on access. Chunks are immutable.
+    """
+
+    __slots__ = ("file_path", "start_line", "end_line", "language", "context", "_source", "_start", "_end")
+
+    def __init__(self, content: str, file_path: str, start_line: int, end_line: int,
+                 language: str, context: Optional[str] = None):
+        self._init(content, 0, len(content), file_path, start_line, end_line, language, context)
+
+    @classmethod
+    def from_source(cls, source: str, start_offset: int, end_offset: int, file_path: str,
+                    start_line: int, end_line: int, language: str,
+                    context: Optional[str] = None) -> "CodeChunk":
+        """Create a chunk over ``source[start_offset:end_offset]`` without copying it."""
+        chunk = cls.__new__(cls)
+        chunk._init(source, start_offset, end_offset, file_path, start_line, end_line, language, context)
+        return chunk
+
+    def _init(self, source: str, start_offset: int, end_offset: int, file_path: str,
+              start_line: int, end_line: int, language: str, context: Optional[str]) -> None:
+        set_attr = object.__setattr__
+        set_attr(self, "_source", source)
+        set_attr(self, "_start", start_offset)
+        set_attr(self, "_end", end_offset)
+        set_attr(self, "file_path", file_path)
+        set_attr(self, "start_line", start_line)
+        set_attr(self, "end_line", end_line)
+        set_attr(self, "language", language)
+        set_attr(self, "context", context)  # Surrounding code for context
+
+    @property
+    def content(self) -> str:
+        """The chunk's code."""
+        return self._source[self._start:self._end]
+
+    def __setattr__(self, name: str, value: Any) -> None:
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name: str) -> None:
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def _key(self) -> tuple:
+        return (self.content, self.file_path, self.start_line, self.end_line, self.language, self.context)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, CodeChunk):
+            return NotImplemented
+        return self._key() == other._key()
+
+    def __hash__(self) -> int:
+        return hash(self._key())
+
+    def __repr__(self) -> str:
+        return (
+            f"CodeChunk(content={self.content!r}, file_path={self.file_path!r}, "
+            f"start_line={self.start_line!r}, end_line={self.end_line!r}, "
+            f"language={self.language!r}, context={self.context!r})"
+        )
+
+
+@dataclass(frozen=True, **_SLOTS)
 class ReviewFinding:
     """A single finding from a code review."""
     type: ReviewType
@@ -76,7 +386,8 @@ class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
     
     def __init__(self, api_key: str, model: str, max_tokens: int = 4096, 
-                 temperature: float = 0.0, timeout: int = 60):
+                 temperature: float = 0.0, timeout: int = 60,
+                 response_cache: Optional[LLMResponseCache] = None):
         """
         Initialize the provider.
         
@@ -86,15 +397,34 @@ class LLMProvider(ABC):
             max_tokens: Maximum tokens for responses
             temperature: Temperature for generation
             timeout: Request timeout in seconds
+            response_cache: Cache of raw API responses, used by providers that
+                support it for deterministic (temperature 0) requests
         """
         self.api_key = api_key
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
         self.timeout = timeout
+        # Usage counters may be updated from executor threads as well as
+        # the event loop, so every update holds the lock
+        self._usage_lock = threading.Lock()
         self._request_count = 0
         self._total_input_tokens = 0
         self._total_output_tokens = 0
+        # Prompt tokens served from (read) or written to (creation) a
+        # server-side prompt cache; both are reported apart from input tokens
+        self._total_cache_read_tokens = 0
+        self._total_cache_creation_tokens = 0
+        self.response_cache = response_cache
+        # Semaphores bounding requests in flight, per event loop like the
+        # SDK clients, for providers that set max_concurrency
+        self._request_slots: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, asyncio.Semaphore]' = (
+            weakref.WeakKeyDictionary()
+        )
+    
+    # Chunks estimated below this many tokens are not sent for review. Off
+    # by default: a one-line chunk such as eval(data) can hold a real issue
+    min_reviewable_tokens: int = 0
     
     @abstractmethod
     async def review_code(
@@ -109,7 +439,8 @@ class LLMProvider(ABC):
         Args:
             chunk: Code chunk to review
             review_types: Types of reviews to perform
-            additional_context: Optional additional context
+            additional_context: Optional additional context, such as
+                "primary_types": the review types to give detailed instructions for
             
         Returns:
             List of review findings
@@ -146,25 +477,98 @@ class LLMProvider(ABC):
         Returns:
             Dictionary of statistics
         """
-        return {
-            "request_count": self._request_count,
-            "total_input_tokens": self._total_input_tokens,
-            "total_output_tokens": self._total_output_tokens,
-        }
+        with self._usage_lock:
+            stats = {
+                "request_count": self._request_count,
+                "total_input_tokens": self._total_input_tokens,
+                "total_output_tokens": self._total_output_tokens,
+                "total_cache_read_tokens": self._total_cache_read_tokens,
+                "total_cache_creation_tokens": self._total_cache_creation_tokens,
+                "cache_hit_rate": self._cache_hit_rate(),
+            }
+        if self.response_cache is not None:
+            stats["response_cache"] = self.response_cache.get_stats()
+        return stats
+    
+    def _get_request_slots(self) -> asyncio.Semaphore:
+        """
+        Get the semaphore bounding requests in flight in the running event loop.
+        
+        A semaphore belongs to the loop it is first awaited in, so a provider
+        used from several loops (one per run_async() call) gets one per loop.
+        """
+        loop = asyncio.get_running_loop()
+        slots = self._request_slots.get(loop)
+        if slots is None:
+            slots = self._request_slots[loop] = asyncio.Semaphore(self.max_concurrency)
+        return slots
+    
+    def _request_key(self, payload: Dict[str, Any]) -> Optional[str]:
+        """
+        Get the key identifying a request payload for caching and deduplication.
+        
+        Only deterministic (temperature 0) requests can share a response.
+        
+        Args:
+            payload: Request body sent to the API
+            
+        Returns:
+            Request key, or None if the response must not be shared
+        """
+        if self.temperature != 0:
+            return None
+        return LLMResponseCache.make_key(payload)
+    
+    def _is_reviewable(self, chunk: CodeChunk, review_types: List[ReviewType]) -> bool:
+        """Check whether a chunk is worth a request, i.e. it has code and something to review."""
+        if not review_types or not chunk.content.strip():
+            return False
+        return (self.min_reviewable_tokens <= 0
+                or self.estimate_tokens(chunk.content) >= self.min_reviewable_tokens)
+    
+    def _cache_hit_rate(self) -> float:
+        """Get the share of prompt tokens served from the prompt cache."""
+        prompt_tokens = self._total_cache_read_tokens + self._total_input_tokens
+        if prompt_tokens == 0:
+            return 0.0
+        return self._total_cache_read_tokens / prompt_tokens
     
-    def _track_usage(self, input_tokens: int, output_tokens: int) -> None:
-        """Track token usage."""
-        self._request_count += 1
-        self._total_input_tokens += input_tokens
-        self._total_output_tokens += output_tokens
+    def _track_usage(self, input_tokens: int, output_tokens: int,
+                     cache_read_tokens: int = 0, cache_creation_tokens: int = 0) -> None:
+        """Track token usage (safe to call from any thread)."""
+        with self._usage_lock:
+            self._request_count += 1
+            self._total_input_tokens += input_tokens
+            self._total_output_tokens += output_tokens
+            self._total_cache_read_tokens += cache_read_tokens
+            self._total_cache_creation_tokens += cache_creation_tokens
     
-    def _build_review_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> str:
+    @staticmethod
+    def _strip_code_fence(content: str) -> str:
+        """
+        Remove a markdown code fence around a response, slicing at most once.
+        
+        Whitespace inside the fence is left for the JSON parser, which skips it.
+        """
+        content = content.strip()
+        start = 0
+        end = len(content)
+        if content.startswith("```"):
+            start = 7 if content.startswith("```json") else 3
+        if end - start >= 3 and content.endswith("```"):
+            end -= 3
+        return content[start:end] if start or end < len(content) else content
+    
+    def _build_review_prompt(self, chunk: CodeChunk, review_types: List[ReviewType],
+                             primary_types: Optional[Iterable[ReviewType]] = None) -> str:
         """
         Build a review prompt for the given chunk and review types.
 
         Args:
             chunk: Code chunk to review
             review_types: Types of reviews to perform
+            primary_types: Review types to give detailed instructions for
+                (default: the first review type); the others get a summary line
 
         Returns:
             Formatted prompt string
@@ -177,121 +581,214 @@ class LLMProvider(ABC):
         if ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE:
             return self._build_security_focused_prompt(chunk, review_types)
 
-        # Build comprehensive review instructions
-        review_instructions = self._build_review_instructions(review_types)
-
-        prompt = f"""You are a senior software engineer conducting a comprehensive code review. Analyze the following {chunk.language} code for the specified review types.
+        return self._fill_prompt(
+            _REVIEW_PROMPT, chunk, instructions=self._build_review_instructions(review_types, primary_types)
+        )
 
-FILE: {chunk.file_path} (Lines {chunk.start_line}-{chunk.end_line})
-
-```{chunk.language}
-{chunk.content}
-```"""
-
-        if chunk.context:
-            prompt += f"\n\nCONTEXT:\n```{chunk.language}\n{chunk.context}\n```"
-
-        prompt += f"""
+    def _build_review_instructions(self, review_types: List[ReviewType],
+                                   primary_types: Optional[Iterable[ReviewType]] = None) -> str:
+        """
+        Build instructions for each review type.
 
-REVIEW CRITERIA:
-{review_instructions}
+        Primary review types get detailed instructions and the others a
+        one-line summary, which keeps multi-type prompts short.
 
-INSTRUCTIONS:
-- Only report genuine issues with clear impact on code quality, security, or maintainability
-- Be specific about the problem and provide actionable suggestions
-- Include line numbers for precise issue location
-- Rate confidence based on certainty of the issue (0.0-1.0)
-- Use appropriate severity levels: critical (security/data loss), high (bugs/major issues), medium (improvements), low (minor issues), info (suggestions)
+        Args:
+            review_types: Types of reviews to perform
+            primary_types: Review types to detail (default: the first review type)
 
-RESPONSE FORMAT (JSON array):
-[{{"type":"<review_type>","severity":"critical|high|medium|low|info","line_start":<n>,"line_end":<n>,"message":"<specific issue description>","suggestion":"<actionable fix>","confidence":<0.0-1.0>}}]
+        Returns:
+            Instructions text
+        """
+        if primary_types is None:
+            primary_types = review_types[:1]
+        return _review_instructions(tuple(review_types), frozenset(primary_types))
 
-Return [] if no issues found.
-"""
-        return prompt
+    def _build_batch_review_prompt(self, batch: List[CodeChunk], review_types: List[ReviewType]) -> str:
+        """
+        Build one prompt reviewing several chunks, each tagged with its index.
 
-    def _build_review_instructions(self, review_types: List[ReviewType]) -> str:
-        """Build detailed instructions for each review type."""
-        instructions = []
+        Args:
+            batch: Code chunks to review
+            review_types: Types of reviews to perform
 
-        for review_type in review_types:
-            if review_type == ReviewType.SECURITY:
-                instructions.append("""SECURITY REVIEW (CRITICAL FOCUS):
-Focus on HIGH and CRITICAL severity vulnerabilities:
-- SQL injection, XSS, CSRF, command injection vulnerabilities
-- Authentication/authorization bypasses and privilege escalation
-- Insecure data handling (passwords, tokens, PII, secrets in code)
-- Cryptographic weaknesses (weak algorithms, hardcoded keys, improper cert validation)
-- Input validation failures leading to code execution
-- Path traversal vulnerabilities and arbitrary file access
-- Insecure deserialization leading to RCE
-- Race conditions and TOCTOU issues with security impact
+        Returns:
+            Formatted prompt string
+        """
+        parts = [
+            _REVIEW_INSTRUCTIONS.format(instructions=self._build_review_instructions(review_types)),
+            _BATCH_FORMAT,
+        ]
+        for chunk_id, chunk in enumerate(batch):
+            parts.append(f'<chunk id="{chunk_id}">\n{self._fill_prompt(_CHUNK_BLOCK, chunk)}</chunk>\n')
+        return "".join(parts)
+
+    def _parse_batch_items(self, items: Any, batch: List[CodeChunk]) -> Optional[List[List[ReviewFinding]]]:
+        """
+        Split the findings of a batched review by chunk.
 
-For EACH security issue, provide:
-1. Vulnerability type and potential CWE/CVE reference
-2. Exploitation scenario and real-world impact
-3. MULTIPLE fix options (2-3) with specific code examples:
-   - Quick fix: Immediate mitigation (pros/cons)
-   - Secure fix: Comprehensive solution (pros/cons)
-   - Best practice: Industry-standard approach (pros/cons)
-4. Recommended approach with justification""")
+        Args:
+            items: Decoded response, a list of findings tagged with chunk_id
+            batch: Code chunks of the batch
 
-            elif review_type == ReviewType.PERFORMANCE:
-                instructions.append("""PERFORMANCE REVIEW:
-- Inefficient algorithms (O(n²) where O(n) possible)
-- Unnecessary loops or nested iterations
-- Memory leaks and excessive allocations
-- Database N+1 queries
-- Blocking I/O in performance-critical paths
-- Missing caching opportunities
-- Inefficient data structures
-- Resource contention issues""")
+        Returns:
+            Findings for each chunk, or None when a finding can't be
+            attributed to a chunk of the batch
+        """
+        if not isinstance(items, list):
+            return None
+        # Locals for the loop, which runs once per finding
+        count = len(batch)
+        items_by_chunk: List[List[Any]] = [[] for _ in batch]
+        for item in items:
+            chunk_id = item.get("chunk_id") if isinstance(item, dict) else None
+            if not isinstance(chunk_id, int) or not 0 <= chunk_id < count:
+                return None
+            items_by_chunk[chunk_id].append(item)
+        return [self._findings_from_items(items, chunk) for items, chunk in zip(items_by_chunk, batch)]
+
+    def _pack_batches(self, chunks: List[CodeChunk], review_types: List[ReviewType],
+                      batch_size: int) -> List[List[CodeChunk]]:
+        """Group consecutive chunks into batches using at most half the context window."""
+        budget = self.get_max_context_size() // 2
+
+        batches: List[List[CodeChunk]] = []
+        batch: List[CodeChunk] = []
+        used = 0
+        for chunk in chunks:
+            tokens = self.estimate_tokens(chunk.content) + self.estimate_tokens(chunk.context or "")
+            if batch and (len(batch) >= batch_size or used + tokens > budget):
+                batches.append(batch)
+                batch, used = [], 0
+            batch.append(chunk)
+            used += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _review_in_batches(
+        self,
+        chunks: List[CodeChunk],
+        review_types: List[ReviewType],
+        batch_size: int,
+        complete: Callable[[str], Awaitable[str]],
+        parse: Callable[[str, List[CodeChunk]], Optional[List[List[ReviewFinding]]]],
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review chunks with one request per batch, for providers with a plain-text API.
 
-            elif review_type == ReviewType.CORRECTNESS:
-                instructions.append("""CORRECTNESS REVIEW:
-- Logic errors and edge case handling
-- Null pointer/undefined reference risks
-- Off-by-one errors and boundary conditions
-- Race conditions and concurrency issues
-- Exception handling gaps
-- Type mismatches and casting errors
-- Resource cleanup failures
-- State management inconsistencies""")
+        The instructions are sent once per batch instead of once per chunk.
+        Explanations and security reviews, whose prompts are built per chunk,
+        are reviewed chunk by chunk, as is a batch whose request fails or
+        whose response can't be attributed to its chunks.
 
-            elif review_type == ReviewType.MAINTAINABILITY:
-                instructions.append("""MAINTAINABILITY REVIEW:
-- Code clarity and readability
-- Function/class size and complexity
-- Naming conventions and descriptiveness
-- Code duplication and DRY violations
-- Missing or inadequate documentation
-- Hard-coded values that should be configurable
-- Overly complex conditional logic
-- Tight coupling between components""")
+        Args:
+            chunks: Code chunks to review
+            review_types: Types of reviews to perform
+            batch_size: Maximum chunks per request
+            complete: Sends a prompt and returns the response text
+            parse: Parses a batch response into findings per chunk, or None
 
-            elif review_type == ReviewType.ARCHITECTURE:
-                instructions.append("""ARCHITECTURE REVIEW:
-- SOLID principle violations
-- Design pattern misuse or opportunities
-- Separation of concerns issues
-- Dependency injection opportunities
-- Layer boundary violations
-- Circular dependencies
-- Interface segregation needs
-- Single responsibility violations""")
+        Returns:
+            Findings for each chunk, in the order of chunks
+        """
+        # Chunks with nothing to review aren't sent
+        skipped = [not self._is_reviewable(chunk, review_types) for chunk in chunks]
+        if any(skipped):
+            reviewed = [chunk for chunk, skip in zip(chunks, skipped) if not skip]
+            findings = iter(await self._review_in_batches(reviewed, review_types, batch_size, complete, parse))
+            return [[] if skip else next(findings) for skip in skipped]
+
+        per_chunk_prompt = review_types == [ReviewType.EXPLAIN] or (
+            ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE
+        )
+        if batch_size <= 1 or per_chunk_prompt:
+            return [await self.review_code(chunk, review_types) for chunk in chunks]
+
+        async def review_batch(batch: List[CodeChunk]) -> List[List[ReviewFinding]]:
+            if len(batch) == 1:
+                return [await self.review_code(batch[0], review_types)]
+            results = parse(await complete(self._build_batch_review_prompt(batch, review_types)), batch)
+            if results is None:
+                logger.warning("Unexpected batch response, reviewing chunks individually")
+                return [await self.review_code(chunk, review_types) for chunk in batch]
+            return results
+
+        return await self._gather_batches(self._pack_batches(chunks, review_types, batch_size),
+                                          review_types, review_batch)
+
+    async def _gather_batches(
+        self,
+        batches: List[List[CodeChunk]],
+        review_types: List[ReviewType],
+        review_batch: Callable[[List[CodeChunk]], Awaitable[List[List[ReviewFinding]]]],
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review batches concurrently, keeping the findings of the batches that succeed.
 
-            elif review_type == ReviewType.STANDARDS:
-                instructions.append("""STANDARDS REVIEW:
-- Language-specific idiom violations
-- Code style and formatting issues
-- Naming convention inconsistencies
-- Import/include organization
-- Comment style and placement
-- Error handling patterns
-- Logging and debugging practices
-- API design consistency""")
+        A batch whose request fails is reviewed again chunk by chunk, and a
+        chunk that still fails has no findings, as when reviewing without
+        batches.
 
-        return "\n\n".join(instructions)
+        Returns:
+            Findings for each chunk, in the order of the batches
+        """
+        results = await asyncio.gather(*(review_batch(batch) for batch in batches), return_exceptions=True)
+        findings: List[List[ReviewFinding]] = []
+        for batch, result in zip(batches, results):
+            if isinstance(result, BaseException):
+                if not isinstance(result, Exception):
+                    raise result
+                if len(batch) == 1:
+                    # The request was the chunk's own review; don't repeat it
+                    logger.error("Error reviewing %s: %s", batch[0].file_path, result)
+                    result = [[]]
+                else:
+                    logger.warning("Error reviewing a batch of %d chunks, reviewing them individually: %s",
+                                   len(batch), result)
+                    result = await asyncio.gather(*(self._review_chunk_or_nothing(chunk, review_types)
+                                                    for chunk in batch))
+            findings.extend(result)
+        return findings
+
+    async def _review_chunk_or_nothing(self, chunk: CodeChunk, review_types: List[ReviewType]) -> List[ReviewFinding]:
+        """Review one chunk, logging a failure as no findings."""
+        try:
+            return await self.review_code(chunk, review_types)
+        except Exception as e:
+            logger.error("Error reviewing %s: %s", chunk.file_path, e)
+            return []
+
+    @staticmethod
+    def _findings_from_items(items: List[Any], chunk: CodeChunk) -> List[ReviewFinding]:
+        """Build findings from decoded JSON objects, skipping invalid ones."""
+        # Locals for the loop, which runs once per finding
+        review_type = ReviewType.from_value
+        make_finding = ReviewFinding
+        file_path = chunk.file_path
+        findings = []
+        append = findings.append
+        for item in items:
+            try:
+                # Positional, in field order: type, severity, file_path,
+                # line_start, line_end, message, suggestion, code_snippet
+                # (filled by the orchestrator) and confidence
+                append(make_finding(
+                    review_type(item["type"]),
+                    item["severity"],
+                    file_path,
+                    item["line_start"],
+                    item["line_end"],
+                    item["message"],
+                    item.get("suggestion"),
+                    None,
+                    item.get("confidence", 1.0),
+                ))
+            except (KeyError, ValueError, TypeError) as e:
+                logger.warning("Skipping invalid finding: %s", e)
+                continue
+
+        return findings
 
     def _build_explain_prompt(self, chunk: CodeChunk) -> str:
         """
@@ -303,35 +800,24 @@ For EACH security issue, provide:
         Returns:
             Formatted prompt string
         """
-        prompt = f"""You are a senior software engineer providing a comprehensive code explanation. Analyze and explain the following {chunk.language} code in detail.
-
-FILE: {chunk.file_path} (Lines {chunk.start_line}-{chunk.end_line})
-
-```{chunk.language}
-{chunk.content}
-```"""
+        return self._fill_prompt(_EXPLAIN_PROMPT, chunk)
 
+    @staticmethod
+    def _fill_prompt(template: str, chunk: CodeChunk, context_block: str = _CONTEXT_BLOCK,
+                     **fields: str) -> str:
+        """Fill a prompt template with the chunk's location, code and context."""
+        context = ""
         if chunk.context:
-            prompt += f"\n\nCONTEXT:\n```{chunk.language}\n{chunk.context}\n```"
-
-        prompt += f"""
-
-EXPLANATION REQUIREMENTS:
-1. PURPOSE: What does this code accomplish? What problem does it solve?
-2. KEY COMPONENTS: Identify main classes, functions, variables, and their roles
-3. LOGIC FLOW: Trace the execution path and decision points
-4. PATTERNS: Identify design patterns, algorithms, or architectural approaches used
-5. DEPENDENCIES: External libraries, modules, or services this code relies on
-6. ENTRY POINTS: How is this code typically invoked or used?
-7. DATA FLOW: How data moves through the code and transforms
-8. ERROR HANDLING: How errors and edge cases are managed
-9. PERFORMANCE CONSIDERATIONS: Any notable performance characteristics
-10. RECOMMENDATIONS: Suggestions for improvements or best practices
-
-RESPONSE FORMAT (JSON):
-[{{"type":"explain","severity":"info","line_start":{chunk.start_line},"line_end":{chunk.end_line},"message":"<comprehensive explanation covering all requirements>","suggestion":"<recommendations for improvements, usage tips, or related best practices>","confidence":1.0}}]
-"""
-        return prompt
+            context = context_block.format(language=chunk.language, context=chunk.context)
+        return template.format_map({
+            "file_path": chunk.file_path,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "language": chunk.language,
+            "content": chunk.content,
+            "context": context,
+            **fields,
+        })
 
     def _build_security_focused_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> str:
         """Build security-focused prompt with comprehensive vulnerability detection."""
@@ -339,61 +825,7 @@ RESPONSE FORMAT (JSON):
             # Fallback to regular security review if module not available
             return self._build_review_prompt(chunk, review_types)
 
-        security_context = get_security_prompt_context()
-
-        prompt = f"""{security_context}
-
-═══════════════════════════════════════════════════════════════════════════════
-CODE UNDER REVIEW
-═══════════════════════════════════════════════════════════════════════════════
-
-FILE: {chunk.file_path}
-LINES: {chunk.start_line}-{chunk.end_line}
-LANGUAGE: {chunk.language}
-
-```{chunk.language}
-{chunk.content}
-```
-"""
-
-        if chunk.context:
-            prompt += f"""
-SURROUNDING CODE CONTEXT:
-```{chunk.language}
-{chunk.context}
-```
-"""
-
-        prompt += """
-═══════════════════════════════════════════════════════════════════════════════
-YOUR ANALYSIS TASK
-═══════════════════════════════════════════════════════════════════════════════
-
-Systematically analyze this code for ALL critical security vulnerabilities.
-For EACH vulnerability found, provide a complete report following the format above.
-
-RESPONSE FORMAT (JSON array):
-[
-  {
-    "type": "security",
-    "severity": "critical|high",
-    "line_start": <line_number>,
-    "line_end": <line_number>,
-    "message": "CWE-XXX: [Vulnerability Name]\\n\\nDETAILS:\\n[Full description]\\n\\nEXPLOITATION:\\n[How to exploit]\\n\\nIMPACT:\\n[Real-world consequences]",
-    "suggestion": "OPTION 1 - Quick Fix:\\n```\\n[code]\\n```\\n✅ PROS: [list]\\n❌ CONS: [list]\\n⏱️ Time: [estimate]\\n\\nOPTION 2 - Secure Fix:\\n```\\n[code]\\n```\\n✅ PROS: [list]\\n❌ CONS: [list]\\n⏱️ Time: [estimate]\\n\\nOPTION 3 - Best Practice:\\n```\\n[code]\\n```\\n✅ PROS: [list]\\n❌ CONS: [list]\\n⏱️ Time: [estimate]\\n\\nRECOMMENDATION: [Which option and why]",
-    "confidence": <0.9-1.0 for critical issues>
-  }
-]
-
-REMEMBER:
-- ONLY report CRITICAL and HIGH severity vulnerabilities
-- MUST provide 2-3 fix options with code examples
-- MUST include exploitation scenario
-- MUST use CWE references
-- Confidence 0.9+ for critical issues
-- Return [] if NO critical/high issues found
-
-BEGIN ANALYSIS NOW:
-"""
-        return prompt
+        return self._fill_prompt(
+            _security_prompt_template(_security_prompt_context()), chunk, _SECURITY_CONTEXT_BLOCK
+        )
 
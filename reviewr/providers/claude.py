@@ -1,113 +1,87 @@
 import json
 import asyncio
-from typing import List, Optional, Dict, Any
-from anthropic import AsyncAnthropic
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import logging
+import weakref
+from functools import lru_cache
+from typing import List, Optional, Dict, Any, Tuple
+import httpx
+from anthropic import AsyncAnthropic, APIConnectionError, APIStatusError, RateLimitError
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # The SDK's HTTP client class, with its default timeouts and redirects
+    from anthropic import DefaultAsyncHttpxClient
+except ImportError:
+    DefaultAsyncHttpxClient = httpx.AsyncClient
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 from .base import LLMProvider, CodeChunk, ReviewType, ReviewFinding
+from ..utils.cache import LLMResponseCache
+from ..utils.rate_limit import AsyncTokenBucket
+from ..utils.json_salvage import salvage_json_array
+from ..utils.tokens import count_prefix_tokens, count_tokens
 
 try:
     from ..security import get_security_prompt_context
     SECURITY_CONTEXT_AVAILABLE = True
+    # The vulnerability database context is constant; build it once per process
+    _security_prompt_context = lru_cache(maxsize=1)(get_security_prompt_context)
 except ImportError:
     SECURITY_CONTEXT_AVAILABLE = False
 
+logger = logging.getLogger(__name__)
 
-class ClaudeProvider(LLMProvider):
-    """Claude/Anthropic LLM provider."""
-    
-    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514",
-                 max_tokens: int = 8192, temperature: float = 0.0, timeout: int = 60):
-        """Initialize Claude provider."""
-        super().__init__(api_key, model, max_tokens, temperature, timeout)
-        # Use x-api-key header as per Anthropic API
-        self.client = AsyncAnthropic(api_key=api_key, timeout=timeout)
 
-        # Model context sizes
-        self._context_sizes = {
-            "claude-sonnet-4-20250514": 200000,
-            "claude-3-5-sonnet-20241022": 200000,
-            "claude-3-opus-20240229": 200000,
-            "claude-3-sonnet-20240229": 200000,
-            "claude-3-haiku-20240307": 200000,
-        }
-    
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
-    async def review_code(
-        self,
-        chunk: CodeChunk,
-        review_types: List[ReviewType],
-        additional_context: Optional[Dict[str, Any]] = None
-    ) -> List[ReviewFinding]:
-        """Review code using Claude."""
-        prompt = self._build_claude_prompt(chunk, review_types)
-        
-        try:
-            response = await self.client.messages.create(
-                model=self.model,
-                max_tokens=self.max_tokens,
-                temperature=self.temperature,
-                messages=[
-                    {
-                        "role": "user",
-                        "content": prompt
-                    }
-                ],
-                system="You are an expert code reviewer. Analyze code carefully and provide specific, actionable feedback. Return your findings as a JSON array."
-            )
-            
-            # Track usage
-            input_tokens = response.usage.input_tokens
-            output_tokens = response.usage.output_tokens
-            self._track_usage(input_tokens, output_tokens)
-            
-            # Parse response
-            content = response.content[0].text
-            findings = self._parse_response(content, chunk)
-            
-            return findings
-            
-        except Exception as e:
-            print(f"Error reviewing code with Claude: {e}")
-            raise
-    
-    def _build_claude_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> str:
-        """Build Claude-specific prompt with XML tags."""
-        # Check if this is an explain-only request
-        if len(review_types) == 1 and review_types[0] == ReviewType.EXPLAIN:
-            return self._build_claude_explain_prompt(chunk)
+# Failures worth retrying: rate limits, server errors and overload, and
+# connection failures and timeouts. Anything else (bad requests, auth
+# errors, parse errors, bugs) fails on the first attempt.
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 529})
+# Longest Retry-After honored before a rate-limited request is retried
+_MAX_RETRY_AFTER = 60.0
+# Jittered, so concurrent reviews don't retry in lockstep
+_backoff = wait_random_exponential(multiplier=1, max=10)
 
-        # Use comprehensive security context if security review is requested
-        if ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE:
-            return self._build_claude_security_prompt(chunk, review_types)
 
-        review_types_str = ', '.join(rt.value for rt in review_types)
+def _is_retryable(exc: BaseException) -> bool:
+    """Whether a failed request is transient and worth retrying."""
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in _RETRYABLE_STATUS_CODES
+    # Includes APITimeoutError
+    return isinstance(exc, APIConnectionError)
 
-        prompt = f"""<task>
-Review the following {chunk.language} code for {review_types_str} issues.
-</task>
 
-<code_context>
-File: {chunk.file_path}
-Lines: {chunk.start_line}-{chunk.end_line}
-Language: {chunk.language}
-</code_context>
+_SYSTEM_PROMPT = (
+    "You are an expert code reviewer. Analyze code carefully and provide specific, "
+    "actionable feedback. Return your findings as a JSON array."
+)
+
+# Anthropic prompt caching: a cache_control marker caches the prompt prefix
+# up to and including its block. Server-side cache hits are billed at a
+# fraction of the input token price and skip reprocessing the prefix, so the
+# constant parts of a prompt are sent first and marked, the chunk's code last.
+_CACHE_CONTROL = {"type": "ephemeral"}
+
+_SYSTEM_BLOCKS = [{"type": "text", "text": _SYSTEM_PROMPT, "cache_control": _CACHE_CONTROL}]
 
-<code>
-{chunk.content}
-</code>
-"""
 
-        if chunk.context:
-            prompt += f"\n<surrounding_context>\n{chunk.context}\n</surrounding_context>\n"
+# Prompt templates, filled with a single str.format() (literal braces are
+# doubled). The static prefix of a review depends only on the review types.
+_REVIEW_STATIC_PREFIX = """<task>
+Review the code in <code> below for {review_types} issues.
+</task>
 
-        prompt += f"""
 <instructions>
-1. Identify CRITICAL and HIGH severity issues in the code related to: {review_types_str}
+1. Identify CRITICAL and HIGH severity issues in the code related to: {review_types}
 2. For SECURITY issues, provide comprehensive analysis:
    - Vulnerability type with CWE/CVE reference if applicable
    - Exploitation scenario showing how an attacker could abuse this
@@ -120,9 +94,9 @@ Language: {chunk.language}
    - Confidence score (0.9-1.0 for critical security issues)
 
 3. For NON-SECURITY issues provide:
-   - Type: one of [{', '.join(rt.value for rt in review_types)}]
+   - Type: one of [{review_types}]
    - Severity: critical, high, medium, low, or info
-   - Line numbers where the issue occurs (relative to lines {chunk.start_line}-{chunk.end_line})
+   - Line numbers where the issue occurs (within the Lines range given in <code_context>)
    - Clear explanation of the problem
    - 2-3 different fix approaches with code snippets and tradeoffs
    - Recommended approach
@@ -130,7 +104,7 @@ Language: {chunk.language}
 
 4. Format response as JSON array of findings
 5. ONLY report critical/high severity issues - ignore minor style or low-impact items
-6. Consider the context and {chunk.language}-specific best practices
+6. Consider the context and language-specific best practices
 7. Be specific and actionable with concrete code examples
 </instructions>
 
@@ -151,29 +125,12 @@ Return ONLY a valid JSON array (no markdown, no explanation):
 If no issues are found, return: []
 </response_format>
 """
-        return prompt
 
-    def _build_claude_explain_prompt(self, chunk: CodeChunk) -> str:
-        """Build Claude-specific explanation prompt."""
-        prompt = f"""<task>
-Provide a comprehensive explanation of the following {chunk.language} code to help a developer understand it quickly.
+# Used as is, not formatted
+_EXPLAIN_STATIC_PREFIX = """<task>
+Provide a comprehensive explanation of the code in <code> below to help a developer understand it quickly.
 </task>
 
-<code_context>
-File: {chunk.file_path}
-Lines: {chunk.start_line}-{chunk.end_line}
-Language: {chunk.language}
-</code_context>
-
-<code>
-{chunk.content}
-</code>
-"""
-
-        if chunk.context:
-            prompt += f"\n<surrounding_context>\n{chunk.context}\n</surrounding_context>\n"
-
-        prompt += f"""
 <instructions>
 Provide a comprehensive explanation as a single finding that covers:
 
@@ -191,106 +148,63 @@ Be thorough but concise. Write in clear, accessible language. Focus on helping s
 <response_format>
 Return ONLY a valid JSON array with a single finding (no markdown, no explanation):
 [
-  {{
+  {
     "type": "explain",
     "severity": "info",
-    "line_start": {chunk.start_line},
-    "line_end": {chunk.end_line},
+    "line_start": <first line of the Lines range in <code_context>>,
+    "line_end": <last line of the Lines range in <code_context>>,
     "message": "Your comprehensive explanation here, covering all the points above in a well-structured narrative",
     "suggestion": "Additional context, recommendations for further reading, or tips for working with this code",
     "confidence": 1.0
-  }}
+  }
 ]
 </response_format>
 """
-        return prompt
-    
-    def _parse_response(self, content: str, chunk: CodeChunk) -> List[ReviewFinding]:
-        """Parse Claude's response into ReviewFinding objects."""
-        # Remove markdown code blocks if present
-        content = content.strip()
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
-        
-        try:
-            findings_data = json.loads(content)
-            
-            if not isinstance(findings_data, list):
-                print(f"Warning: Expected list, got {type(findings_data)}")
-                return []
-            
-            findings = []
-            for item in findings_data:
-                try:
-                    # Map type string to ReviewType enum
-                    review_type = ReviewType(item["type"])
-                    
-                    finding = ReviewFinding(
-                        type=review_type,
-                        severity=item["severity"],
-                        file_path=chunk.file_path,
-                        line_start=item["line_start"],
-                        line_end=item["line_end"],
-                        message=item["message"],
-                        suggestion=item.get("suggestion"),
-                        code_snippet=None,  # Will be filled by orchestrator
-                        confidence=item.get("confidence", 1.0),
-                    )
-                    findings.append(finding)
-                except (KeyError, ValueError) as e:
-                    print(f"Warning: Skipping invalid finding: {e}")
-                    continue
-            
-            return findings
-            
-        except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Response content: {content[:500]}")
-            return []
-    
-    def estimate_tokens(self, text: str) -> int:
-        """Estimate tokens using Claude's approximation (roughly 4 chars per token)."""
-        return len(text) // 4
-    
-    def get_max_context_size(self) -> int:
-        """Get maximum context size for the current model."""
-        return self._context_sizes.get(self.model, 200000)
 
-    def _build_claude_security_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> str:
-        """Build Claude-specific security-focused prompt with comprehensive vulnerability detection."""
-        security_context = get_security_prompt_context()
+_CODE_BLOCK = """<code_context>
+File: {file_path}
+Lines: {start_line}-{end_line}
+Language: {language}
+</code_context>
 
-        prompt = f"""<security_audit_protocol>
-{security_context}
-</security_audit_protocol>
+<code>
+{content}
+</code>
+{context}"""
 
-<code_under_review>
-<file_path>{chunk.file_path}</file_path>
-<line_range>{chunk.start_line}-{chunk.end_line}</line_range>
-<language>{chunk.language}</language>
+_SECURITY_CODE_BLOCK = """<code_under_review>
+<file_path>{file_path}</file_path>
+<line_range>{start_line}-{end_line}</line_range>
+<language>{language}</language>
 
 <code>
-{chunk.content}
+{content}
 </code>
+{context}</code_under_review>
 """
 
-        if chunk.context:
-            prompt += f"""
-<surrounding_context>
-{chunk.context}
-</surrounding_context>
+_SURROUNDING_CONTEXT = "\n<surrounding_context>\n{context}\n</surrounding_context>\n"
+
+
+# Appended to the static prefix of a batched review
+_BATCH_INSTRUCTIONS = """
+<batch_format>
+The code to review follows as several independent chunks instead of a single
+block. Each is wrapped in <chunk id="n"> with its own file and line range.
+Review every chunk on its own, report line numbers within that chunk's line
+range, and add "chunk_id": n to every finding to name the chunk it belongs to.
+Return one JSON array holding the findings for all chunks.
+</batch_format>
 """
 
-        prompt += """
-</code_under_review>
+# Stands in for the code when only a prompt's static prefix is needed
+_PLACEHOLDER_CHUNK = CodeChunk(content="", file_path="", start_line=1, end_line=1, language="")
+
 
+# Task and response format of a security review, after the security context
+_SECURITY_TASK = """
 <task>
-You are a CRITICAL SECURITY AUDITOR analyzing code for exploitable vulnerabilities.
+You are a CRITICAL SECURITY AUDITOR analyzing the code in <code_under_review> below for exploitable vulnerabilities.
 
 SYSTEMATICALLY CHECK FOR:
 1. Injection flaws (SQL, Command, XSS, LDAP, XXE)
@@ -327,5 +241,429 @@ Return ONLY valid JSON array (no markdown wrapping):
 Return [] if no critical/high issues found.
 </response_format>
 """
-        return prompt
 
+
+@lru_cache(maxsize=8)
+def _security_static_prefix(security_context: str) -> str:
+    """The static prefix of a security review, built once per security context."""
+    return f"<security_audit_protocol>\n{security_context}\n</security_audit_protocol>\n{_SECURITY_TASK}"
+
+
+@lru_cache(maxsize=64)
+def _review_static_prefix(review_types: Tuple[ReviewType, ...]) -> str:
+    """The static prefix of a review, built once per combination of review types."""
+    return _REVIEW_STATIC_PREFIX.format(review_types=", ".join(rt.value for rt in review_types))
+
+
+@lru_cache(maxsize=16)
+def _batch_static_prefix(single_prefix: str) -> str:
+    """The static prefix of a batch, built once per single-chunk prefix."""
+    return single_prefix + _BATCH_INSTRUCTIONS
+
+
+def _retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header in delta-seconds."""
+    try:
+        return min(max(float(value), 0.0), _MAX_RETRY_AFTER) if value else None
+    except ValueError:
+        return None
+
+
+def _json_loads(data: str) -> Any:
+    """Parse JSON, with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def _retry_wait(retry_state) -> float:
+    """Back off exponentially with jitter, unless the server's Retry-After was already waited out."""
+    exc = retry_state.outcome.exception()
+    if isinstance(exc, RateLimitError) and _retry_after(exc.response.headers.get("retry-after")) is not None:
+        return 0.0
+    return _backoff(retry_state)
+
+
+def _user_content(static_prefix: str, dynamic_suffix: str) -> List[Dict[str, Any]]:
+    """User message content with the static prefix marked as a cache breakpoint."""
+    return [
+        {"type": "text", "text": static_prefix, "cache_control": _CACHE_CONTROL},
+        {"type": "text", "text": dynamic_suffix},
+    ]
+
+
+class ClaudeProvider(LLMProvider):
+    """Claude/Anthropic LLM provider."""
+    
+    # SDK clients, with their keep-alive pools, per event loop; instances
+    # with the same API key, timeout and pool size share one
+    _shared_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int, int], AsyncAnthropic]]' = (
+        weakref.WeakKeyDictionary()
+    )
+    
+    def __init__(self, api_key: str, model: str = "claude-sonnet-4-20250514",
+                 max_tokens: int = 8192, temperature: float = 0.0, timeout: int = 60,
+                 response_cache: Optional[LLMResponseCache] = None, max_connections: int = 64,
+                 max_concurrency: int = 8, tokens_per_minute: Optional[int] = 400_000,
+                 stream: bool = True):
+        """
+        Initialize Claude provider.
+        
+        Args:
+            response_cache: Opt-in cache of responses, so re-reviewing
+                unchanged code at temperature 0 needs no API call
+            max_connections: Size of the connection pool for concurrent reviews
+            max_concurrency: Maximum requests in flight at once, however many
+                reviews run concurrently
+            tokens_per_minute: Input token budget, kept below the account's
+                rate limit to avoid 429 retries; None for no limit
+            stream: Receive responses as server-sent events
+        """
+        super().__init__(api_key, model, max_tokens, temperature, timeout, response_cache)
+        self.stream = stream
+        self.max_concurrency = max_concurrency
+        self._token_bucket = AsyncTokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self.max_connections = max_connections
+        # Overrides the shared client when set (e.g. a stub in tests)
+        self._client: Optional[AsyncAnthropic] = None
+
+        # Model context sizes
+        self._context_sizes = {
+            "claude-sonnet-4-20250514": 200000,
+            "claude-3-5-sonnet-20241022": 200000,
+            "claude-3-opus-20240229": 200000,
+            "claude-3-sonnet-20240229": 200000,
+            "claude-3-haiku-20240307": 200000,
+        }
+    
+    async def review_code(
+        self,
+        chunk: CodeChunk,
+        review_types: List[ReviewType],
+        additional_context: Optional[Dict[str, Any]] = None
+    ) -> List[ReviewFinding]:
+        """Review code using Claude."""
+        if not self._is_reviewable(chunk, review_types):
+            return []
+        static_prefix, dynamic_suffix = self._build_claude_prompt(chunk, review_types)
+        
+        try:
+            content = await self._create_message(static_prefix, dynamic_suffix)
+            
+            # Parse response
+            findings = self._parse_response(content, chunk)
+            
+            return findings
+            
+        except Exception as e:
+            logger.error("Error reviewing code with Claude: %s", e)
+            raise
+
+    async def review_code_batch(
+        self,
+        chunks: List[CodeChunk],
+        review_types: List[ReviewType],
+        batch_size: int = 8
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review several chunks with one request per batch.
+
+        The instructions are sent once per batch instead of once per chunk.
+        Batches hold at most batch_size chunks and are kept within the
+        model's context window. A batch whose request fails, or whose
+        response can't be attributed to its chunks, is reviewed again chunk
+        by chunk, so one failure doesn't lose the other batches' findings.
+
+        Args:
+            chunks: Code chunks to review
+            review_types: Types of reviews to perform
+            batch_size: Maximum chunks per request
+
+        Returns:
+            Findings for each chunk, in the order of chunks
+        """
+        # Chunks with nothing to review aren't sent
+        skipped = [not self._is_reviewable(chunk, review_types) for chunk in chunks]
+        if any(skipped):
+            reviewed = [chunk for chunk, skip in zip(chunks, skipped) if not skip]
+            findings = iter(await self.review_code_batch(reviewed, review_types, batch_size))
+            return [[] if skip else next(findings) for skip in skipped]
+
+        # Explanations are written per chunk
+        if batch_size <= 1 or review_types == [ReviewType.EXPLAIN]:
+            return [await self.review_code(chunk, review_types) for chunk in chunks]
+
+        batches = self._pack_batches(chunks, review_types, batch_size)
+        return await self._gather_batches(
+            batches, review_types, lambda batch: self._review_batch(batch, review_types)
+        )
+
+    async def _review_batch(self, batch: List[CodeChunk], review_types: List[ReviewType]) -> List[List[ReviewFinding]]:
+        """Review one batch of chunks in a single request."""
+        if len(batch) == 1:
+            return [await self.review_code(batch[0], review_types)]
+
+        static_prefix, dynamic_suffix = self._build_claude_batch_prompt(batch, review_types)
+        results = self._parse_batch_response(await self._create_message(static_prefix, dynamic_suffix), batch)
+        if results is None:
+            logger.warning("Unexpected batch response, reviewing chunks individually")
+            return [await self.review_code(chunk, review_types) for chunk in batch]
+        return results
+
+    def _pack_batches(self, chunks: List[CodeChunk], review_types: List[ReviewType],
+                      batch_size: int) -> List[List[CodeChunk]]:
+        """Group consecutive chunks into batches that fit the context window."""
+        static_prefix, _ = self._build_claude_batch_prompt([], review_types)
+        budget = self.get_max_context_size() - self.max_tokens - count_prefix_tokens(static_prefix)
+
+        batches: List[List[CodeChunk]] = []
+        batch: List[CodeChunk] = []
+        used = 0
+        for chunk in chunks:
+            tokens = self.estimate_tokens(chunk.content) + self.estimate_tokens(chunk.context or "")
+            if batch and (len(batch) >= batch_size or used + tokens > budget):
+                batches.append(batch)
+                batch, used = [], 0
+            batch.append(chunk)
+            used += tokens
+        if batch:
+            batches.append(batch)
+        return batches
+
+    async def _create_message(self, static_prefix: str, dynamic_suffix: str) -> str:
+        """
+        Send a prompt to the Messages API and return the response text.
+
+        Deterministic requests are answered from the response cache when set.
+        """
+        key = None
+        if self.response_cache is not None:
+            key = self._request_key({
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "system": _SYSTEM_PROMPT,
+                "prompt": [static_prefix, dynamic_suffix],
+            })
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached["text"]
+
+        # Built once; only the API call below is retried
+        request = {
+            "model": self.model,
+            "max_tokens": self.max_tokens,
+            "temperature": self.temperature,
+            "messages": [
+                {
+                    "role": "user",
+                    "content": _user_content(static_prefix, dynamic_suffix)
+                }
+            ],
+            "system": _SYSTEM_BLOCKS,
+        }
+        prompt_tokens = count_prefix_tokens(static_prefix) + self.estimate_tokens(dynamic_suffix)
+        response = await self._send_request(request, prompt_tokens)
+        
+        # Track usage; cached prompt tokens are reported apart from input_tokens
+        usage = response.usage
+        self._track_usage(
+            usage.input_tokens,
+            usage.output_tokens,
+            getattr(usage, "cache_read_input_tokens", None) or 0,
+            getattr(usage, "cache_creation_input_tokens", None) or 0,
+        )
+        
+        text = response.content[0].text
+        if response.stop_reason == "max_tokens":
+            # Truncated mid-array; _parse_response() keeps the complete
+            # findings, but the response isn't cached
+            logger.warning("Response truncated at %d tokens", self.max_tokens)
+        elif key:
+            self.response_cache.set(key, {"text": text})
+        return text
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_retry_wait,
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    )
+    async def _send_request(self, request: Dict[str, Any], prompt_tokens: int) -> Any:
+        """Send a Messages API request within the concurrency and rate limits."""
+        async with self._get_request_slots():
+            if self._token_bucket is not None:
+                await self._token_bucket.acquire(prompt_tokens)
+            try:
+                if self.stream:
+                    # The connection stays active while the response is
+                    # generated, so long reviews don't run into read timeouts
+                    async with self.client.messages.stream(**request) as stream:
+                        return await stream.get_final_message()
+                return await self.client.messages.create(**request)
+            except RateLimitError as e:
+                # Wait out the server's Retry-After, holding the slot so other
+                # requests back off too, before the error is retried
+                delay = _retry_after(e.response.headers.get("retry-after"))
+                if delay:
+                    await asyncio.sleep(delay)
+                raise
+
+    def _build_claude_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> Tuple[str, str]:
+        """
+        Build Claude-specific prompt with XML tags.
+        
+        Returns:
+            The static prefix (task, instructions, response format), which
+            depends only on the review types, and the dynamic suffix with
+            the chunk's code
+        """
+        # Check if this is an explain-only request
+        if len(review_types) == 1 and review_types[0] == ReviewType.EXPLAIN:
+            return self._build_claude_explain_prompt(chunk)
+
+        # Use comprehensive security context if security review is requested
+        if ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE:
+            return self._build_claude_security_prompt(chunk, review_types)
+
+        return _review_static_prefix(tuple(review_types)), self._build_code_block(chunk)
+
+    @staticmethod
+    def _build_code_block(chunk: CodeChunk, template: str = _CODE_BLOCK) -> str:
+        """Build the per-chunk part of a prompt from one of the code block templates."""
+        return template.format_map({
+            "file_path": chunk.file_path,
+            "start_line": chunk.start_line,
+            "end_line": chunk.end_line,
+            "language": chunk.language,
+            "content": chunk.content,
+            "context": _SURROUNDING_CONTEXT.format(context=chunk.context) if chunk.context else "",
+        })
+
+    def _build_claude_explain_prompt(self, chunk: CodeChunk) -> Tuple[str, str]:
+        """Build Claude-specific explanation prompt as (static prefix, dynamic suffix)."""
+        return _EXPLAIN_STATIC_PREFIX, self._build_code_block(chunk)
+    
+    def _build_claude_batch_prompt(self, batch: List[CodeChunk],
+                                   review_types: List[ReviewType]) -> Tuple[str, str]:
+        """
+        Build one prompt reviewing several chunks, each tagged with its index.
+
+        The static prefix is the single-chunk prefix followed by the batch
+        instructions, so it is shared by every batch of the same review types.
+        """
+        single_prefix, _ = self._build_claude_prompt(_PLACEHOLDER_CHUNK, review_types)
+        # Chunks take the code block the prefix's task refers to
+        template = _CODE_BLOCK
+        if ReviewType.SECURITY in review_types and SECURITY_CONTEXT_AVAILABLE:
+            template = _SECURITY_CODE_BLOCK
+        dynamic_suffix = "".join(
+            f'<chunk id="{chunk_id}">\n{self._build_code_block(chunk, template)}</chunk>\n'
+            for chunk_id, chunk in enumerate(batch)
+        )
+        return _batch_static_prefix(single_prefix), dynamic_suffix
+
+    def _parse_response(self, content: str, chunk: CodeChunk) -> List[ReviewFinding]:
+        """Parse Claude's response into ReviewFinding objects."""
+        # Remove markdown code blocks if present
+        content = self._strip_code_fence(content)
+        
+        try:
+            findings_data = _json_loads(content)
+            
+            if not isinstance(findings_data, list):
+                logger.warning("Expected list, got %s", type(findings_data))
+                return []
+            
+            return self._findings_from_items(findings_data, chunk)
+            
+        except json.JSONDecodeError as e:
+            # Prose around the array or a truncated response still holds findings
+            items = salvage_json_array(content)
+            if items:
+                return self._findings_from_items(items, chunk)
+            # %.500s truncates only if the record is emitted
+            logger.error("Error parsing JSON response: %s; response content: %.500s", e, content)
+            return []
+    
+    def _parse_batch_response(self, content: str, batch: List[CodeChunk]) -> Optional[List[List[ReviewFinding]]]:
+        """
+        Parse a batched review into findings per chunk.
+
+        Returns None when a finding can't be attributed to a chunk of the batch.
+        """
+        try:
+            findings_data = _json_loads(self._strip_code_fence(content))
+        except json.JSONDecodeError:
+            return None
+        return self._parse_batch_items(findings_data, batch)
+    
+    def estimate_tokens(self, text: str) -> int:
+        """
+        Count tokens with tiktoken when available (roughly 4 chars per token otherwise).
+        
+        Code tokenizes denser than prose, so a character estimate undercounts
+        it and lets chunkers pack prompts that overflow the context window.
+        """
+        return count_tokens(text)
+    
+    def get_max_context_size(self) -> int:
+        """Get maximum context size for the current model."""
+        return self._context_sizes.get(self.model, 200000)
+
+    @property
+    def client(self) -> AsyncAnthropic:
+        """SDK client for the running event loop (shared unless overridden)."""
+        if self._client is not None:
+            return self._client
+
+        clients = self._shared_clients.setdefault(asyncio.get_running_loop(), {})
+        key = (self.api_key, self.timeout, self.max_connections)
+        client = clients.get(key)
+        if client is None or client.is_closed():
+            # Keep-alive pool sized for concurrent reviews; with HTTP/2 (when
+            # h2 is installed) requests are multiplexed over a few TLS connections
+            http_client = DefaultAsyncHttpxClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=max(self.max_connections // 2, 1),
+                    keepalive_expiry=60,
+                ),
+            )
+            # Use x-api-key header as per Anthropic API
+            client = AsyncAnthropic(api_key=self.api_key, timeout=self.timeout, http_client=http_client)
+            clients[key] = client
+        return client
+
+    @client.setter
+    def client(self, client: AsyncAnthropic) -> None:
+        self._client = client
+
+    @classmethod
+    async def close_shared_clients(cls) -> None:
+        """Close the shared connection pools of the running event loop."""
+        for client in cls._shared_clients.pop(asyncio.get_running_loop(), {}).values():
+            await client.close()
+
+    async def aclose(self) -> None:
+        """Close an overriding client; shared ones stay open for other instances."""
+        if self._client is not None:
+            await self._client.close()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - close an overriding client."""
+        await self.aclose()
+
+    def _build_claude_security_prompt(self, chunk: CodeChunk, review_types: List[ReviewType]) -> Tuple[str, str]:
+        """
+        Build Claude-specific security-focused prompt with comprehensive vulnerability detection.
+        
+        Returns (static prefix, dynamic suffix); the prefix holds the
+        vulnerability database context, task and response format.
+        """
+        static_prefix = _security_static_prefix(_security_prompt_context())
+        return static_prefix, self._build_code_block(chunk, _SECURITY_CODE_BLOCK)
@@ -1,30 +1,37 @@
-from typing import Dict, Type
+import importlib
+from typing import Dict, Optional, Type
 from .base import LLMProvider
-from .claude import ClaudeProvider
-from .openai import OpenAIProvider
-from .gemini import GeminiProvider
-from .augmentcode import AugmentCodeProvider
 from ..config.schema import ProviderConfig
+from ..utils.cache import LLMResponseCache
 
 
 class ProviderFactory:
     """Factory for creating LLM provider instances."""
 
-    _providers: Dict[str, Type[LLMProvider]] = {
-        'claude': ClaudeProvider,
-        'openai': OpenAIProvider,
-        'gemini': GeminiProvider,
-        'augmentcode': AugmentCodeProvider,
+    # "module:Class" of each provider. Imported on first use, so a run only
+    # loads the SDK of the provider it uses (each takes 0.2-0.6s to import)
+    _providers: Dict[str, str] = {
+        'claude': 'reviewr.providers.claude:ClaudeProvider',
+        'openai': 'reviewr.providers.openai:OpenAIProvider',
+        'gemini': 'reviewr.providers.gemini:GeminiProvider',
+        'augmentcode': 'reviewr.providers.augmentcode:AugmentCodeProvider',
     }
     
     @classmethod
-    def create_provider(cls, provider_name: str, config: ProviderConfig) -> LLMProvider:
+    def create_provider(
+        cls,
+        provider_name: str,
+        config: ProviderConfig,
+        response_cache: Optional[LLMResponseCache] = None
+    ) -> LLMProvider:
         """
         Create a provider instance.
         
         Args:
             provider_name: Name of the provider (claude, openai, gemini)
             config: Provider configuration
+            response_cache: Cache of raw API responses, so unchanged code
+                is not sent for review again; None for the provider default
             
         Returns:
             Initialized LLM provider
@@ -44,15 +51,33 @@ class ProviderFactory:
                 f"Set it via environment variable or configuration file."
             )
         
-        provider_class = cls._providers[provider_name]
+        provider_class = cls.get_provider_class(provider_name)
+        options = {}
+        if response_cache is not None:
+            options["response_cache"] = response_cache
         return provider_class(
             api_key=config.api_key,
             model=config.model,
             max_tokens=config.max_tokens,
             temperature=config.temperature,
             timeout=config.timeout,
+            **options,
         )
     
+    @classmethod
+    def get_provider_class(cls, provider_name: str) -> Type[LLMProvider]:
+        """
+        Import and return a provider's class.
+        
+        Args:
+            provider_name: Name of a registered provider
+            
+        Returns:
+            The provider class
+        """
+        module_name, class_name = cls._providers[provider_name].split(':')
+        return getattr(importlib.import_module(module_name), class_name)
+    
     @classmethod
     def get_available_providers(cls) -> list[str]:
         """Get list of available provider names."""
@@ -1,18 +1,83 @@
 import json
+import logging
+import asyncio
 from typing import List, Optional, Dict, Any
 import google.generativeai as genai
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+from google.api_core import exceptions as google_exceptions
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception_type
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
 from .base import LLMProvider, CodeChunk, ReviewType, ReviewFinding
+from ..config.schema import SeverityLevel
+from ..utils.cache import LLMResponseCache
+from ..utils.json_salvage import salvage_json_array
+from ..utils.tokens import count_tokens
+
+
+logger = logging.getLogger(__name__)
+
+
+def _json_loads(data: str) -> Any:
+    """Parse JSON, with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# Failures worth retrying: rate limits (including ResourceExhausted), server
+# errors and timeouts. Anything else (invalid requests, auth errors, blocked
+# prompts, parse errors, bugs, cancellation) fails on the first attempt.
+_RETRYABLE_ERRORS = (
+    google_exceptions.TooManyRequests,
+    google_exceptions.InternalServerError,
+    google_exceptions.ServiceUnavailable,
+    google_exceptions.DeadlineExceeded,
+)
+# Jittered, so concurrent reviews don't retry in lockstep
+_backoff = wait_random_exponential(multiplier=1, max=10)
+
+# The original Gemini 1.0 models can't return JSON to a schema; later ones
+# are constrained to this one, so their responses always decode
+_UNSTRUCTURED_MODELS = ("gemini-pro", "gemini-1.0")
+_FINDINGS_SCHEMA = {
+    "type": "array",
+    "items": {
+        "type": "object",
+        "properties": {
+            "type": {"type": "string", "enum": [t.value for t in ReviewType]},
+            "severity": {"type": "string", "enum": [s.value for s in SeverityLevel]},
+            "line_start": {"type": "integer"},
+            "line_end": {"type": "integer"},
+            "message": {"type": "string"},
+            "suggestion": {"type": "string"},
+            "confidence": {"type": "number"},
+            # Only asked for in batches
+            "chunk_id": {"type": "integer"},
+        },
+        "required": ["type", "severity", "line_start", "line_end", "message"],
+    },
+}
 
 
 class GeminiProvider(LLMProvider):
     """Google Gemini LLM provider."""
     
     def __init__(self, api_key: str, model: str = "gemini-pro",
-                 max_tokens: int = 4096, temperature: float = 0.0, timeout: int = 60):
-        """Initialize Gemini provider."""
-        super().__init__(api_key, model, max_tokens, temperature, timeout)
+                 max_tokens: int = 4096, temperature: float = 0.0, timeout: int = 60,
+                 response_cache: Optional[LLMResponseCache] = None, max_concurrency: int = 8):
+        """
+        Initialize Gemini provider.
+        
+        Args:
+            response_cache: Opt-in cache of responses, so re-reviewing
+                unchanged code at temperature 0 needs no API call
+            max_concurrency: Maximum requests in flight at once, however many
+                reviews run concurrently
+        """
+        super().__init__(api_key, model, max_tokens, temperature, timeout, response_cache)
+        self.max_concurrency = max_concurrency
         genai.configure(api_key=api_key)
         
         # Configure safety settings to be less restrictive for code review
@@ -46,12 +111,9 @@ class GeminiProvider(LLMProvider):
             "gemini-1.5-pro": 1000000,
             "gemini-1.5-flash": 1000000,
         }
+        
+        self._structured_output = not model.startswith(_UNSTRUCTURED_MODELS)
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
     async def review_code(
         self,
         chunk: CodeChunk,
@@ -59,84 +121,139 @@ class GeminiProvider(LLMProvider):
         additional_context: Optional[Dict[str, Any]] = None
     ) -> List[ReviewFinding]:
         """Review code using Gemini."""
-        prompt = self._build_review_prompt(chunk, review_types)
+        if not self._is_reviewable(chunk, review_types):
+            return []
+        prompt = self._build_review_prompt(
+            chunk, review_types, (additional_context or {}).get("primary_types")
+        )
         
         try:
-            # Gemini doesn't have native async support, so we'll use sync
-            response = self.model_instance.generate_content(
-                prompt,
-                generation_config=genai.types.GenerationConfig(
-                    temperature=self.temperature,
-                    max_output_tokens=self.max_tokens,
-                ),
-            )
-            
-            # Track usage (Gemini doesn't provide detailed token counts easily)
-            input_tokens = self.estimate_tokens(prompt)
-            output_tokens = self.estimate_tokens(response.text)
-            self._track_usage(input_tokens, output_tokens)
+            content = await self._complete(prompt)
             
             # Parse response
-            content = response.text
             findings = self._parse_response(content, chunk)
             
             return findings
             
         except Exception as e:
-            print(f"Error reviewing code with Gemini: {e}")
+            logger.error("Error reviewing code with Gemini: %s", e)
             raise
     
+    async def review_code_batch(
+        self,
+        chunks: List[CodeChunk],
+        review_types: List[ReviewType],
+        batch_size: int = 8
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review several chunks with one request per batch.
+
+        Args:
+            chunks: Code chunks to review
+            review_types: Types of reviews to perform
+            batch_size: Maximum chunks per request
+
+        Returns:
+            Findings for each chunk, in the order of chunks
+        """
+        return await self._review_in_batches(
+            chunks, review_types, batch_size, self._complete, self._parse_batch_response
+        )
+    
+    async def _complete(self, prompt: str) -> str:
+        """
+        Send a prompt and return the response text, tracking usage.
+
+        Deterministic requests are answered from the response cache when set.
+        """
+        key = None
+        if self.response_cache is not None:
+            key = self._request_key({
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "prompt": prompt,
+            })
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached["text"]
+
+        response = await self._generate_content(prompt)
+        
+        # Track usage (Gemini doesn't provide detailed token counts easily)
+        input_tokens = self.estimate_tokens(prompt)
+        output_tokens = self.estimate_tokens(response.text)
+        self._track_usage(input_tokens, output_tokens)
+        if key:
+            self.response_cache.set(key, {"text": response.text})
+        return response.text
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_backoff,
+        retry=retry_if_exception_type(_RETRYABLE_ERRORS),
+        reraise=True,
+    )
+    async def _generate_content(self, prompt: str) -> Any:
+        """
+        Generate a response, retrying transient failures.
+
+        At most max_concurrency requests (and worker threads) are in flight
+        at once, so a large fan-out of reviews queues here instead of
+        running into rate limits.
+        """
+        generation_config = genai.types.GenerationConfig(
+            temperature=self.temperature,
+            max_output_tokens=self.max_tokens,
+        )
+        if self._structured_output:
+            generation_config.response_mime_type = "application/json"
+            generation_config.response_schema = _FINDINGS_SCHEMA
+        async with self._get_request_slots():
+            # The SDK call blocks; run it on a worker thread so the event loop
+            # keeps serving the other reviews in flight
+            return await asyncio.to_thread(
+                self.model_instance.generate_content,
+                prompt,
+                generation_config=generation_config,
+            )
+    
     def _parse_response(self, content: str, chunk: CodeChunk) -> List[ReviewFinding]:
         """Parse Gemini's response into ReviewFinding objects."""
-        content = content.strip()
-        
         # Remove markdown code blocks if present
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+        content = self._strip_code_fence(content)
         
         try:
-            findings_data = json.loads(content)
-            
-            if not isinstance(findings_data, list):
-                print(f"Warning: Expected list, got {type(findings_data)}")
-                return []
-            
-            findings = []
-            for item in findings_data:
-                try:
-                    review_type = ReviewType(item["type"])
-                    
-                    finding = ReviewFinding(
-                        type=review_type,
-                        severity=item["severity"],
-                        file_path=chunk.file_path,
-                        line_start=item["line_start"],
-                        line_end=item["line_end"],
-                        message=item["message"],
-                        suggestion=item.get("suggestion"),
-                        code_snippet=None,
-                        confidence=item.get("confidence", 1.0),
-                    )
-                    findings.append(finding)
-                except (KeyError, ValueError) as e:
-                    print(f"Warning: Skipping invalid finding: {e}")
-                    continue
-            
-            return findings
-            
+            findings_data = _json_loads(content)
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Response content: {content[:500]}")
+            # Prose around the array or a truncated response still holds findings
+            findings_data = salvage_json_array(content)
+            if not findings_data:
+                logger.error("Error parsing JSON response: %s; response content: %.500s", e, content)
+                return []
+        
+        if not isinstance(findings_data, list):
+            logger.warning("Expected list, got %s", type(findings_data))
             return []
+        
+        return self._findings_from_items(findings_data, chunk)
+    
+    def _parse_batch_response(self, content: str, batch: List[CodeChunk]) -> Optional[List[List[ReviewFinding]]]:
+        """
+        Parse a batched review into findings per chunk.
+
+        Returns None when a finding can't be attributed to a chunk of the batch.
+        """
+        try:
+            data = _json_loads(self._strip_code_fence(content))
+        except json.JSONDecodeError:
+            return None
+        return self._parse_batch_items(data, batch)
     
     def estimate_tokens(self, text: str) -> int:
-        """Estimate tokens using rough approximation (4 chars per token)."""
-        return len(text) // 4
+        """Count tokens with tiktoken when available (roughly 4 chars per token otherwise)."""
+        return count_tokens(text)
     
     def get_max_context_size(self) -> int:
         """Get maximum context size for the current model."""
@@ -1,19 +1,135 @@
 import json
-from typing import List, Optional, Dict, Any
-from openai import AsyncOpenAI
-from tenacity import retry, stop_after_attempt, wait_exponential, retry_if_exception_type
+import asyncio
+import logging
+import weakref
+from types import SimpleNamespace
+from typing import List, Optional, Dict, Any, Tuple
+import httpx
+from openai import AsyncOpenAI, APIConnectionError, APIStatusError
+from tenacity import retry, stop_after_attempt, wait_random_exponential, retry_if_exception
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # The SDK's HTTP client class, with its default timeouts and redirects
+    from openai import DefaultAsyncHttpxClient
+except ImportError:
+    DefaultAsyncHttpxClient = httpx.AsyncClient
+
+try:
+    import h2  # noqa: F401 - enables HTTP/2 in httpx
+    HTTP2_AVAILABLE = True
+except ImportError:
+    HTTP2_AVAILABLE = False
 
 from .base import LLMProvider, CodeChunk, ReviewType, ReviewFinding
+from ..config.schema import SeverityLevel
+from ..utils.cache import LLMResponseCache
+from ..utils.json_salvage import salvage_json_array
+from ..utils.tokens import count_tokens
+
+
+logger = logging.getLogger(__name__)
+
+
+def _json_loads(data: str) -> Any:
+    """Parse JSON, with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# Failures worth retrying: rate limits, server errors, and connection
+# failures and timeouts. Anything else (bad requests, auth errors, parse
+# errors, bugs, cancellation) fails on the first attempt.
+_RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+# Jittered, so concurrent reviews don't retry in lockstep
+_backoff = wait_random_exponential(multiplier=1, max=10)
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    """Whether a failed request is transient and worth retrying."""
+    if isinstance(exc, APIStatusError):
+        return exc.status_code in _RETRYABLE_STATUS_CODES
+    # Includes APITimeoutError
+    return isinstance(exc, APIConnectionError)
+
+
+_SYSTEM_PROMPT = (
+    "You are an expert code reviewer. Analyze code carefully and provide specific, "
+    "actionable feedback. Return your findings as a JSON array."
+)
+
+# Models that support structured outputs. Their responses are constrained
+# to this schema, so they always decode; other models get JSON mode where
+# available and rely on _parse_response() recovering malformed output.
+_STRUCTURED_OUTPUT_MODELS = ("gpt-4o", "gpt-4.1", "gpt-5")
+# Strict mode requires every property; chunk_id is null outside batches
+_FINDINGS_SCHEMA = {
+    "name": "findings",
+    "strict": True,
+    "schema": {
+        "type": "object",
+        "properties": {
+            "findings": {
+                "type": "array",
+                "items": {
+                    "type": "object",
+                    "properties": {
+                        "type": {"type": "string", "enum": [t.value for t in ReviewType]},
+                        "severity": {"type": "string", "enum": [s.value for s in SeverityLevel]},
+                        "line_start": {"type": "integer"},
+                        "line_end": {"type": "integer"},
+                        "message": {"type": "string"},
+                        "suggestion": {"type": "string"},
+                        "confidence": {"type": "number"},
+                        "chunk_id": {"type": ["integer", "null"]},
+                    },
+                    "required": [
+                        "type", "severity", "line_start", "line_end",
+                        "message", "suggestion", "confidence", "chunk_id",
+                    ],
+                    "additionalProperties": False,
+                },
+            },
+        },
+        "required": ["findings"],
+        "additionalProperties": False,
+    },
+}
 
 
 class OpenAIProvider(LLMProvider):
     """OpenAI LLM provider."""
     
+    # SDK clients, with their keep-alive pools, per event loop; instances
+    # with the same API key, timeout and pool size share one
+    _shared_clients: 'weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple[str, int, int], AsyncOpenAI]]' = (
+        weakref.WeakKeyDictionary()
+    )
+    
     def __init__(self, api_key: str, model: str = "gpt-4-turbo-preview",
-                 max_tokens: int = 4096, temperature: float = 0.0, timeout: int = 60):
-        """Initialize OpenAI provider."""
-        super().__init__(api_key, model, max_tokens, temperature, timeout)
-        self.client = AsyncOpenAI(api_key=api_key, timeout=timeout)
+                 max_tokens: int = 4096, temperature: float = 0.0, timeout: int = 60,
+                 response_cache: Optional[LLMResponseCache] = None, stream: bool = True,
+                 max_connections: int = 64, max_concurrency: int = 8):
+        """
+        Initialize OpenAI provider.
+        
+        Args:
+            response_cache: Opt-in cache of responses, so re-reviewing
+                unchanged code at temperature 0 needs no API call
+            stream: Receive completions as server-sent events
+            max_connections: Size of the connection pool for concurrent reviews
+            max_concurrency: Maximum requests in flight at once, however many
+                reviews run concurrently
+        """
+        super().__init__(api_key, model, max_tokens, temperature, timeout, response_cache)
+        self.stream = stream
+        self.max_concurrency = max_concurrency
+        self.max_connections = max_connections
+        # Overrides the shared client when set (e.g. a stub in tests)
+        self._client: Optional[AsyncOpenAI] = None
         
         # Model context sizes
         self._context_sizes = {
@@ -23,12 +139,14 @@ class OpenAIProvider(LLMProvider):
             "gpt-3.5-turbo": 16385,
             "gpt-3.5-turbo-16k": 16385,
         }
+        
+        if model.startswith(_STRUCTURED_OUTPUT_MODELS):
+            self._response_format = {"type": "json_schema", "json_schema": _FINDINGS_SCHEMA}
+        elif "turbo" in model:
+            self._response_format = {"type": "json_object"}
+        else:
+            self._response_format = None
     
-    @retry(
-        stop=stop_after_attempt(3),
-        wait=wait_exponential(multiplier=1, min=1, max=10),
-        retry=retry_if_exception_type((Exception,)),
-    )
     async def review_code(
         self,
         chunk: CodeChunk,
@@ -36,15 +154,106 @@ class OpenAIProvider(LLMProvider):
         additional_context: Optional[Dict[str, Any]] = None
     ) -> List[ReviewFinding]:
         """Review code using OpenAI."""
-        prompt = self._build_review_prompt(chunk, review_types)
+        if not self._is_reviewable(chunk, review_types):
+            return []
+        prompt = self._build_review_prompt(
+            chunk, review_types, (additional_context or {}).get("primary_types")
+        )
         
         try:
+            content = await self._complete(prompt)
+            
+            # Parse response
+            findings = self._parse_response(content, chunk)
+            
+            return findings
+            
+        except Exception as e:
+            logger.error("Error reviewing code with OpenAI: %s", e)
+            raise
+    
+    async def review_code_batch(
+        self,
+        chunks: List[CodeChunk],
+        review_types: List[ReviewType],
+        batch_size: int = 8
+    ) -> List[List[ReviewFinding]]:
+        """
+        Review several chunks with one request per batch.
+
+        Args:
+            chunks: Code chunks to review
+            review_types: Types of reviews to perform
+            batch_size: Maximum chunks per request
+
+        Returns:
+            Findings for each chunk, in the order of chunks
+        """
+        return await self._review_in_batches(
+            chunks, review_types, batch_size, self._complete, self._parse_batch_response
+        )
+    
+    async def _complete(self, prompt: str) -> str:
+        """
+        Send a prompt and return the response text, tracking usage.
+
+        Deterministic requests are answered from the response cache when set.
+        """
+        key = None
+        if self.response_cache is not None:
+            key = self._request_key({
+                "model": self.model,
+                "max_tokens": self.max_tokens,
+                "temperature": self.temperature,
+                "system": _SYSTEM_PROMPT,
+                "prompt": prompt,
+            })
+        if key:
+            cached = self.response_cache.get(key)
+            if cached is not None:
+                return cached["text"]
+
+        response = await self._create_completion(prompt)
+        choice = response.choices[0]
+        text = choice.message.content or ""
+        
+        # Track usage, estimated if the server didn't report it
+        if response.usage is not None:
+            self._track_usage(response.usage.prompt_tokens, response.usage.completion_tokens)
+        else:
+            self._track_usage(self.estimate_tokens(prompt), self.estimate_tokens(text))
+        
+        if choice.finish_reason == "length":
+            # Truncated mid-array; _parse_response() keeps the complete
+            # findings, but the response isn't cached
+            logger.warning("Response truncated at %d tokens", self.max_tokens)
+        elif key:
+            self.response_cache.set(key, {"text": text})
+        return text
+    
+    @retry(
+        stop=stop_after_attempt(3),
+        wait=_backoff,
+        retry=retry_if_exception(_is_retryable),
+        reraise=True,
+    )
+    async def _create_completion(self, prompt: str) -> Any:
+        """
+        Send a chat completion request, retrying transient failures.
+
+        At most max_concurrency requests are in flight at once, so a large
+        fan-out of reviews queues here instead of running into rate limits.
+        """
+        options: Dict[str, Any] = {}
+        if self.stream:
+            options = {"stream": True, "stream_options": {"include_usage": True}}
+        async with self._get_request_slots():
             response = await self.client.chat.completions.create(
                 model=self.model,
                 messages=[
                     {
                         "role": "system",
-                        "content": "You are an expert code reviewer. Analyze code carefully and provide specific, actionable feedback. Return your findings as a JSON array."
+                        "content": _SYSTEM_PROMPT
                     },
                     {
                         "role": "user",
@@ -53,81 +262,131 @@ class OpenAIProvider(LLMProvider):
                 ],
                 max_tokens=self.max_tokens,
                 temperature=self.temperature,
-                response_format={"type": "json_object"} if "turbo" in self.model else None,
+                response_format=self._response_format,
+                **options,
             )
-            
-            # Track usage
-            input_tokens = response.usage.prompt_tokens
-            output_tokens = response.usage.completion_tokens
-            self._track_usage(input_tokens, output_tokens)
-            
-            # Parse response
-            content = response.choices[0].message.content
-            findings = self._parse_response(content, chunk)
-            
-            return findings
-            
-        except Exception as e:
-            print(f"Error reviewing code with OpenAI: {e}")
-            raise
+            if self.stream:
+                return await self._read_stream(response)
+            return response
+    
+    @staticmethod
+    async def _read_stream(stream: Any) -> Any:
+        """
+        Assemble a streamed completion into the shape of a non-streamed one.
+
+        Text is collected as it is generated rather than after the whole
+        body has arrived.
+        """
+        parts = []
+        finish_reason = None
+        usage = None
+        async for chunk in stream:
+            for choice in chunk.choices:
+                if choice.delta.content:
+                    parts.append(choice.delta.content)
+                if choice.finish_reason:
+                    finish_reason = choice.finish_reason
+            # Sent in a final chunk with no choices
+            if chunk.usage is not None:
+                usage = chunk.usage
+
+        message = SimpleNamespace(content="".join(parts))
+        return SimpleNamespace(
+            choices=[SimpleNamespace(message=message, finish_reason=finish_reason)],
+            usage=usage,
+        )
+    
+    @property
+    def client(self) -> AsyncOpenAI:
+        """SDK client for the running event loop (shared unless overridden)."""
+        if self._client is not None:
+            return self._client
+
+        clients = self._shared_clients.setdefault(asyncio.get_running_loop(), {})
+        key = (self.api_key, self.timeout, self.max_connections)
+        client = clients.get(key)
+        if client is None or client.is_closed():
+            # Keep-alive pool sized for concurrent reviews; with HTTP/2 (when
+            # h2 is installed) requests are multiplexed over a few TLS connections
+            http_client = DefaultAsyncHttpxClient(
+                http2=HTTP2_AVAILABLE,
+                limits=httpx.Limits(
+                    max_connections=self.max_connections,
+                    max_keepalive_connections=max(self.max_connections // 2, 1),
+                    keepalive_expiry=60,
+                ),
+            )
+            client = AsyncOpenAI(api_key=self.api_key, timeout=self.timeout, http_client=http_client)
+            clients[key] = client
+        return client
+
+    @client.setter
+    def client(self, client: AsyncOpenAI) -> None:
+        self._client = client
+
+    @classmethod
+    async def close_shared_clients(cls) -> None:
+        """Close the shared connection pools of the running event loop."""
+        for client in cls._shared_clients.pop(asyncio.get_running_loop(), {}).values():
+            await client.close()
+
+    async def aclose(self) -> None:
+        """Close an overriding client; shared ones stay open for other instances."""
+        if self._client is not None:
+            await self._client.close()
+
+    async def __aenter__(self):
+        """Async context manager entry."""
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        """Async context manager exit - close an overriding client."""
+        await self.aclose()
     
     def _parse_response(self, content: str, chunk: CodeChunk) -> List[ReviewFinding]:
         """Parse OpenAI's response into ReviewFinding objects."""
-        content = content.strip()
-        
         # Remove markdown code blocks if present
-        if content.startswith("```json"):
-            content = content[7:]
-        if content.startswith("```"):
-            content = content[3:]
-        if content.endswith("```"):
-            content = content[:-3]
-        content = content.strip()
+        content = self._strip_code_fence(content)
         
         try:
-            data = json.loads(content)
-            
-            # Handle both direct array and object with findings key
-            if isinstance(data, dict):
-                findings_data = data.get("findings", data.get("results", []))
-            else:
-                findings_data = data
-            
-            if not isinstance(findings_data, list):
-                print(f"Warning: Expected list, got {type(findings_data)}")
-                return []
-            
-            findings = []
-            for item in findings_data:
-                try:
-                    review_type = ReviewType(item["type"])
-                    
-                    finding = ReviewFinding(
-                        type=review_type,
-                        severity=item["severity"],
-                        file_path=chunk.file_path,
-                        line_start=item["line_start"],
-                        line_end=item["line_end"],
-                        message=item["message"],
-                        suggestion=item.get("suggestion"),
-                        code_snippet=None,
-                        confidence=item.get("confidence", 1.0),
-                    )
-                    findings.append(finding)
-                except (KeyError, ValueError) as e:
-                    print(f"Warning: Skipping invalid finding: {e}")
-                    continue
-            
-            return findings
-            
+            data = _json_loads(content)
         except json.JSONDecodeError as e:
-            print(f"Error parsing JSON response: {e}")
-            print(f"Response content: {content[:500]}")
+            # Prose around the array or a truncated response still holds findings
+            data = salvage_json_array(content)
+            if not data:
+                logger.error("Error parsing JSON response: %s; response content: %.500s", e, content)
+                return []
+        
+        # Handle both direct array and object with findings key
+        if isinstance(data, dict):
+            findings_data = data.get("findings", data.get("results", []))
+        else:
+            findings_data = data
+        
+        if not isinstance(findings_data, list):
+            logger.warning("Expected list, got %s", type(findings_data))
             return []
+        
+        return self._findings_from_items(findings_data, chunk)
+    
+    def _parse_batch_response(self, content: str, batch: List[CodeChunk]) -> Optional[List[List[ReviewFinding]]]:
+        """
+        Parse a batched review into findings per chunk.
+
+        Returns None when a finding can't be attributed to a chunk of the batch.
+        """
+        try:
+            data = _json_loads(self._strip_code_fence(content))
+        except json.JSONDecodeError:
+            return None
+        # JSON mode wraps the findings in an object
+        if isinstance(data, dict):
+            data = data.get("findings", data.get("results"))
+        return self._parse_batch_items(data, batch)
     
     def estimate_tokens(self, text: str) -> int:
-        """Estimate tokens using rough approximation (4 chars per token)."""
-        return len(text) // 4
+        """Count tokens with tiktoken when available (roughly 4 chars per token otherwise)."""
+        return count_tokens(text)
     
     def get_max_context_size(self) -> int:
         """Get maximum context size for the current model."""
@@ -5,6 +5,18 @@ from pathlib import Path
 from ..providers.base import CodeChunk
 
 
+def _line_starts(content: str) -> List[int]:
+    """Offsets at which each line of content starts."""
+    starts = [0]
+    append = starts.append
+    find = content.find
+    newline = find('\n')
+    while newline != -1:
+        append(newline + 1)
+        newline = find('\n', newline + 1)
+    return starts
+
+
 class ChunkStrategy(ABC):
     """Abstract base class for chunking strategies."""
     
@@ -41,8 +53,9 @@ class SimpleChunker(ChunkStrategy):
     def chunk_file(self, file_path: str, content: str, language: str, 
                    max_tokens: int) -> List[CodeChunk]:
         """Chunk file by lines with overlap."""
-        lines = content.split('\n')
-        total_lines = len(lines)
+        # Chunks are offsets into content rather than re-joined copies of its lines
+        line_starts = _line_starts(content)
+        total_lines = len(line_starts)
         
         # Estimate lines per chunk (roughly 4 chars per token, 50 chars per line avg)
         chars_per_chunk = max_tokens * 4
@@ -59,24 +72,26 @@ class SimpleChunker(ChunkStrategy):
                 context=None
             )]
         
+        def line_end(line: int) -> int:
+            """Offset of the newline ending the 0-based line before ``line``."""
+            return line_starts[line] - 1 if line < total_lines else len(content)
+        
         chunks = []
         start = 0
         
         while start < total_lines:
             end = min(start + lines_per_chunk, total_lines)
             
-            chunk_lines = lines[start:end]
-            chunk_content = '\n'.join(chunk_lines)
-            
             # Add context from previous chunk if not first chunk
             context = None
             if start > 0 and self.overlap_lines > 0:
                 context_start = max(0, start - self.overlap_lines)
-                context_lines = lines[context_start:start]
-                context = '\n'.join(context_lines)
+                context = content[line_starts[context_start]:line_end(start)]
             
-            chunk = CodeChunk(
-                content=chunk_content,
+            chunk = CodeChunk.from_source(
+                content,
+                line_starts[start],
+                line_end(end),
                 file_path=file_path,
                 start_line=start + 1,
                 end_line=end,
@@ -97,13 +112,11 @@ class FileBasedChunker(ChunkStrategy):
     def chunk_file(self, file_path: str, content: str, language: str, 
                    max_tokens: int) -> List[CodeChunk]:
         """Return entire file as a single chunk."""
-        lines = content.split('\n')
-        
         return [CodeChunk(
             content=content,
             file_path=file_path,
             start_line=1,
-            end_line=len(lines),
+            end_line=content.count('\n') + 1,
             language=language,
             context=None
         )]
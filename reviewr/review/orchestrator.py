@@ -416,23 +416,32 @@ class ReviewOrchestrator:
         all_findings = []
 
         if self.provider:
-            for chunk in chunks:
+            results = []
+            if len(chunks) > 1 and hasattr(type(self.provider), "review_code_batch"):
+                # Providers that support it review several chunks per API call
                 try:
-                    # OPTIMIZATION: Pass all review types in a single API call
-                    # This reduces API calls by 66% (for 3 review types: 3 calls -> 1 call)
-                    result = await self.provider.review_code(chunk, review_types)
-
-                    # Filter by confidence threshold
-                    filtered_findings = [
-                        f for f in result
-                        if f.confidence >= self.config.review.confidence_threshold
-                    ]
-
-                    all_findings.extend(filtered_findings)
-
+                    results = await self.provider.review_code_batch(chunks, review_types)
                 except Exception as e:
                     if self.verbose:
-                        print(f"Error reviewing chunk in {file_path}: {e}")
+                        print(f"Error reviewing chunks in {file_path}: {e}")
+            else:
+                for chunk in chunks:
+                    try:
+                        # OPTIMIZATION: Pass all review types in a single API call
+                        # This reduces API calls by 66% (for 3 review types: 3 calls -> 1 call)
+                        results.append(await self.provider.review_code(chunk, review_types))
+                    except Exception as e:
+                        if self.verbose:
+                            print(f"Error reviewing chunk in {file_path}: {e}")
+
+            for result in results:
+                # Filter by confidence threshold
+                filtered_findings = [
+                    f for f in result
+                    if f.confidence >= self.config.review.confidence_threshold
+                ]
+
+                all_findings.extend(filtered_findings)
 
         # Add secret findings, local analysis findings, and custom rules findings to the results
         all_findings.extend(secret_findings)
@@ -1,6 +1,7 @@
 import hashlib
 import json
 import time
+from collections import OrderedDict
 from pathlib import Path
 from typing import Optional, Dict, Any, List
 from dataclasses import dataclass, asdict
@@ -269,3 +270,128 @@ class IntelligentCache:
         except Exception:
             pass
 
+
+
+class LLMResponseCache:
+    """
+    Content-addressed cache of raw LLM API responses.
+    
+    Keys are SHA-256 hashes of the full request payload (model, messages,
+    temperature, max_tokens), so identical prompts are answered without an
+    API call. Raw response JSON is stored rather than parsed findings, so
+    entries survive changes to ReviewFinding. A small in-memory LRU sits in
+    front of the on-disk store.
+    """
+    
+    def __init__(
+        self,
+        cache_dir: Optional[Path] = None,
+        ttl: int = 86400 * 7,
+        memory_size: int = 256
+    ):
+        """
+        Initialize the cache.
+        
+        Args:
+            cache_dir: Directory for cache storage (default: ~/.cache/reviewr/llm)
+            ttl: Time-to-live in seconds (default: 7 days)
+            memory_size: Number of responses kept in memory
+        """
+        if cache_dir is None:
+            cache_dir = Path.home() / '.cache' / 'reviewr' / 'llm'
+        
+        self.cache_dir = Path(cache_dir)
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        
+        self.cache = Cache(str(self.cache_dir))
+        self.ttl = ttl
+        self.memory_size = memory_size
+        self._memory: 'OrderedDict[str, Dict[str, Any]]' = OrderedDict()
+        self.stats = {
+            'hits': 0,
+            'misses': 0
+        }
+    
+    @staticmethod
+    def make_key(payload: Dict[str, Any]) -> str:
+        """
+        Compute the cache key for a request payload.
+        
+        Args:
+            payload: JSON-serializable request body
+            
+        Returns:
+            Hex digest identifying the request
+        """
+        return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Get a cached response.
+        
+        Args:
+            key: Key from make_key()
+            
+        Returns:
+            Cached response JSON or None if not found
+        """
+        response = self._memory.get(key)
+        if response is not None:
+            self._memory.move_to_end(key)
+            self.stats['hits'] += 1
+            return response
+        
+        try:
+            response = self.cache.get(key)
+        except Exception:
+            response = None
+        
+        if response is None:
+            self.stats['misses'] += 1
+            return None
+        
+        self._remember(key, response)
+        self.stats['hits'] += 1
+        return response
+    
+    def set(self, key: str, response: Dict[str, Any]) -> None:
+        """
+        Store a response.
+        
+        Args:
+            key: Key from make_key()
+            response: Raw response JSON
+        """
+        self._remember(key, response)
+        try:
+            self.cache.set(key, response, expire=self.ttl)
+        except Exception:
+            # Silently fail if cache write fails
+            pass
+    
+    def _remember(self, key: str, response: Dict[str, Any]) -> None:
+        """Add a response to the in-memory LRU."""
+        self._memory[key] = response
+        self._memory.move_to_end(key)
+        if len(self._memory) > self.memory_size:
+            self._memory.popitem(last=False)
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+        
+        Returns:
+            Dictionary with cache stats
+        """
+        return {
+            'hits': self.stats['hits'],
+            'misses': self.stats['misses'],
+            'cache_dir': str(self.cache_dir)
+        }
+    
+    def close(self) -> None:
+        """Close the cache."""
+        try:
+            self.cache.close()
+        except Exception:
+            pass
@@ -0,0 +1,108 @@
+"""
+Recovery of JSON arrays from malformed LLM responses.
+"""
+
+import json
+from typing import Any, List
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from json_repair import repair_json
+except ImportError:
+    repair_json = None
+
+
+def _loads(data: str) -> Any:
+    """Parse JSON, with orjson when available."""
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+# Decodes the JSON value at an offset, ignoring any text after it
+_JSON_DECODER = json.JSONDecoder()
+
+
+def _complete_array_items(content: str) -> List[Any]:
+    """
+    Decode the complete objects at the top level of a (possibly truncated) JSON array.
+
+    Scans the text once, tracking nesting and strings, and decodes each object
+    that closes at the top level of the array; an incomplete tail is ignored.
+    """
+    start = content.find("[")
+    if start == -1:
+        return []
+
+    items = []
+    depth = 0
+    in_string = False
+    escaped = False
+    item_start = -1
+    for index in range(start + 1, len(content)):
+        char = content[index]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == '"':
+                in_string = False
+        elif char == '"':
+            in_string = True
+        elif char in "{[":
+            if depth == 0:
+                item_start = index
+            depth += 1
+        elif char in "}]":
+            if depth == 0:
+                break  # End of the array
+            depth -= 1
+            if depth == 0 and char == "}":
+                try:
+                    items.append(_loads(content[item_start:index + 1]))
+                except json.JSONDecodeError:
+                    pass
+    return items
+
+
+def salvage_json_array(content: str) -> List[Any]:
+    """
+    Recover the items of an LLM response that isn't a bare JSON array.
+
+    Tries, in order: the first array of objects in the text (an array
+    wrapped in prose, which may hold brackets of its own), the complete
+    objects of a truncated array, and json-repair (trailing commas, single
+    quotes) when it is installed. Meant for the error path only, after a
+    strict parse has failed.
+
+    Args:
+        content: Response text
+
+    Returns:
+        The recovered items, or an empty list
+    """
+    start = content.find("[")
+    # Bounded, as each failed attempt may scan to the end of the text
+    for _ in range(8):
+        if start == -1:
+            break
+        try:
+            data = _JSON_DECODER.raw_decode(content, start)[0]
+            if isinstance(data, list) and data and all(isinstance(item, dict) for item in data):
+                return data
+        except json.JSONDecodeError:
+            pass
+        start = content.find("[", start + 1)
+
+    items = _complete_array_items(content)
+    if items or repair_json is None:
+        return items
+
+    try:
+        data = repair_json(content, return_objects=True)
+    except Exception:
+        return []
+    return data if isinstance(data, list) else []
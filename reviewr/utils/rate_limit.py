@@ -0,0 +1,45 @@
+"""
+Client-side rate limiting for provider API requests.
+"""
+
+import asyncio
+import time
+
+
+class AsyncTokenBucket:
+    """
+    Token bucket limiting how many tokens are spent per minute.
+
+    Callers reserve tokens before a request; once the bucket is empty they
+    wait for it to refill, in the order they arrived, instead of sending
+    requests that the API would reject with HTTP 429. The bucket holds no
+    lock or loop-bound state, so it can be shared by any number of tasks.
+    """
+
+    def __init__(self, tokens_per_minute: int):
+        """
+        Initialize a full bucket.
+
+        Args:
+            tokens_per_minute: Sustained token budget, also the burst size
+        """
+        self.capacity = float(tokens_per_minute)
+        self.rate = tokens_per_minute / 60.0
+        self._level = self.capacity
+        self._updated = time.monotonic()
+
+    async def acquire(self, tokens: int) -> None:
+        """
+        Spend tokens, waiting until the budget allows it.
+
+        Args:
+            tokens: Tokens the request will use (capped at the bucket's capacity)
+        """
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+        self._updated = now
+        # Reserve now, wait for the refill afterwards: later callers queue
+        # behind this reservation
+        self._level -= min(tokens, self.capacity)
+        if self._level < 0:
+            await asyncio.sleep(-self._level / self.rate)
@@ -1,7 +1,228 @@
+import mmap
 import re
-from typing import List, Dict, Tuple
+from functools import lru_cache
+from typing import Any, Callable, List, Dict, NamedTuple, Optional, Tuple, Pattern, Sequence, Union
 from dataclasses import dataclass
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None  # type: ignore
+
+
+_NEWLINE = re.compile(b'\n')
+
+# Below this many hits, counting newlines between consecutive hits is cheaper
+# than loading numpy/numba and vectorizing the offset-to-line mapping
+_VECTORIZE_MIN_HITS = 64
+
+
+# Regex patterns for common secrets
+_SECRET_PATTERNS = {
+    'aws_access_key': re.compile(r'AKIA[0-9A-Z]{16}'),
+    'aws_secret_key': re.compile(r'(?i)aws(.{0,20})?[\'"][0-9a-zA-Z/+]{40}[\'"]'),
+    'github_token': re.compile(r'ghp_[0-9a-zA-Z]{36}'),
+    'github_oauth': re.compile(r'gho_[0-9a-zA-Z]{36}'),
+    'github_app': re.compile(r'(ghu|ghs)_[0-9a-zA-Z]{36}'),
+    'slack_token': re.compile(r'xox[baprs]-([0-9a-zA-Z]{10,48})'),
+    'slack_webhook': re.compile(r'https://hooks\.slack\.com/services/T[a-zA-Z0-9_]{8}/B[a-zA-Z0-9_]{8}/[a-zA-Z0-9_]{24}'),
+    'google_api_key': re.compile(r'AIza[0-9A-Za-z\-_]{35}'),
+    'google_oauth': re.compile(r'[0-9]+-[0-9A-Za-z_]{32}\.apps\.googleusercontent\.com'),
+    'heroku_api_key': re.compile(r'[h|H][e|E][r|R][o|O][k|K][u|U].*[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}'),
+    'mailchimp_api_key': re.compile(r'[0-9a-f]{32}-us[0-9]{1,2}'),
+    'mailgun_api_key': re.compile(r'key-[0-9a-zA-Z]{32}'),
+    'stripe_api_key': re.compile(r'(?:r|s)k_live_[0-9a-zA-Z]{24}'),
+    'stripe_restricted_key': re.compile(r'rk_live_[0-9a-zA-Z]{24}'),
+    'square_access_token': re.compile(r'sq0atp-[0-9A-Za-z\-_]{22}'),
+    'square_oauth_secret': re.compile(r'sq0csp-[0-9A-Za-z\-_]{43}'),
+    'paypal_braintree': re.compile(r'access_token\$production\$[0-9a-z]{16}\$[0-9a-f]{32}'),
+    'picatic_api_key': re.compile(r'sk_live_[0-9a-z]{32}'),
+    'twilio_api_key': re.compile(r'SK[0-9a-fA-F]{32}'),
+    'twilio_account_sid': re.compile(r'AC[a-zA-Z0-9_\-]{32}'),
+    'twilio_app_sid': re.compile(r'AP[a-zA-Z0-9_\-]{32}'),
+    'dynatrace_token': re.compile(r'dt0[a-zA-Z]{1}[0-9]{2}\.[A-Z0-9]{24}\.[A-Z0-9]{64}'),
+    'shopify_shared_secret': re.compile(r'shpss_[a-fA-F0-9]{32}'),
+    'shopify_access_token': re.compile(r'shpat_[a-fA-F0-9]{32}'),
+    'shopify_custom_app': re.compile(r'shpca_[a-fA-F0-9]{32}'),
+    'shopify_private_app': re.compile(r'shppa_[a-fA-F0-9]{32}'),
+    'pypi_upload_token': re.compile(r'pypi-AgEIcHlwaS5vcmc[A-Za-z0-9-_]{50,1000}'),
+    'generic_api_key': re.compile(r'(?i)(api[_-]?key|apikey|api[_-]?token|access[_-]?token|auth[_-]?token)[\'"\s]*[:=][\'"\s]*[a-zA-Z0-9_\-]{20,}'),
+    'generic_secret': re.compile(r'(?i)(secret|password|passwd|pwd)[\'"\s]*[:=][\'"\s]*[^\s\'";]{8,}'),
+    'private_key': re.compile(r'-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----'),
+    'jwt_token': re.compile(r'eyJ[A-Za-z0-9-_=]+\.eyJ[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*'),
+    'basic_auth': re.compile(r'(?i)basic\s+[a-zA-Z0-9+/]{20,}={0,2}'),
+    'bearer_token': re.compile(r'(?i)bearer\s+[a-zA-Z0-9_\-\.=]{20,}'),
+    'connection_string': re.compile(r'(?i)(mongodb|mysql|postgresql|postgres|redis|amqp)://[^\s\'";]+:[^\s\'";]+@'),
+    'database_url': re.compile(r'(?i)database[_-]?url[\'"\s]*[:=][\'"\s]*[^\s\'";]+'),
+    'ssh_key': re.compile(r'ssh-(rsa|dss|ed25519)\s+AAAA[0-9A-Za-z+/]+[=]{0,3}'),
+    'azure_storage_key': re.compile(r'(?i)DefaultEndpointsProtocol=https;AccountName=[^;]+;AccountKey=[A-Za-z0-9+/=]{88}'),
+    'facebook_access_token': re.compile(r'EAACEdEose0cBA[0-9A-Za-z]+'),
+    'twitter_oauth': re.compile(r'[t|T][w|W][i|I][t|T][t|T][e|E][r|R].*[1-9][0-9]+-[0-9a-zA-Z]{40}'),
+    'npm_token': re.compile(r'npm_[a-zA-Z0-9]{36}'),
+    'docker_config': re.compile(r'(?i)"auth"\s*:\s*"[A-Za-z0-9+/=]{20,}"'),
+}
+
+
+# Literal substrings that every match of a pattern must contain (any one of
+# them). Content containing none of a pattern's markers can't match it, so
+# the regex is skipped. Case-insensitive patterns without a fixed literal
+# have no markers and always run.
+_PATTERN_MARKERS = {
+    'aws_access_key': ('AKIA',),
+    'github_token': ('ghp_',),
+    'github_oauth': ('gho_',),
+    'github_app': ('ghu_', 'ghs_'),
+    'slack_token': ('xox',),
+    'slack_webhook': ('hooks.slack.com/services/',),
+    'google_api_key': ('AIza',),
+    'google_oauth': ('.apps.googleusercontent.com',),
+    'mailchimp_api_key': ('-us',),
+    'mailgun_api_key': ('key-',),
+    'stripe_api_key': ('k_live_',),
+    'stripe_restricted_key': ('rk_live_',),
+    'square_access_token': ('sq0atp-',),
+    'square_oauth_secret': ('sq0csp-',),
+    'paypal_braintree': ('access_token$production$',),
+    'picatic_api_key': ('sk_live_',),
+    'twilio_api_key': ('SK',),
+    'twilio_account_sid': ('AC',),
+    'twilio_app_sid': ('AP',),
+    'dynatrace_token': ('dt0',),
+    'shopify_shared_secret': ('shpss_',),
+    'shopify_access_token': ('shpat_',),
+    'shopify_custom_app': ('shpca_',),
+    'shopify_private_app': ('shppa_',),
+    'pypi_upload_token': ('pypi-AgEIcHlwaS5vcmc',),
+    'private_key': ('PRIVATE KEY-----',),
+    'jwt_token': ('eyJ',),
+    'connection_string': ('://',),
+    'ssh_key': ('ssh-',),
+    'facebook_access_token': ('EAACEdEose0cBA',),
+    'npm_token': ('npm_',),
+}
+
+
+class _CompiledPattern(NamedTuple):
+    """A secret pattern with its bytes version and prefilter markers."""
+    name: str
+    pattern: Pattern
+    byte_pattern: Pattern
+    markers: Tuple[str, ...]
+    byte_markers: Tuple[bytes, ...]
+
+
+def _compile_patterns(
+    patterns: Dict[str, Pattern],
+    markers: Optional[Dict[str, Tuple[str, ...]]] = None
+) -> Tuple[_CompiledPattern, ...]:
+    """Pair each secret pattern with a bytes version for scanning raw file contents."""
+    markers = markers or {}
+    return tuple(
+        _CompiledPattern(
+            name,
+            pattern,
+            re.compile(pattern.pattern.encode(), pattern.flags & ~re.UNICODE),
+            markers.get(name, ()),
+            tuple(m.encode() for m in markers.get(name, ())),
+        )
+        for name, pattern in patterns.items()
+    )
+
+
+# Compiled once per process and shared by every scanner instance
+_COMPILED_PATTERNS = _compile_patterns(_SECRET_PATTERNS, _PATTERN_MARKERS)
+
+
+@lru_cache(maxsize=8)
+def _build_hyperscan_database(patterns: Tuple[_CompiledPattern, ...]) -> Optional[Any]:
+    """
+    Compile all bytes patterns into one Hyperscan database for single-pass scanning.
+    
+    Returns None when Hyperscan is not installed or can't compile the patterns,
+    in which case the scanner falls back to running each regex separately.
+    """
+    if hyperscan is None:
+        return None
+    
+    expressions = [compiled.byte_pattern.pattern for compiled in patterns]
+    database = hyperscan.Database()
+    try:
+        database.compile(
+            expressions=expressions,
+            ids=list(range(len(expressions))),
+            elements=len(expressions),
+            flags=[0] * len(expressions),
+        )
+    except hyperscan.error:
+        return None
+    return database
+
+
+def _count_lines_kernel(data: Any, offsets: Any, lines: Any) -> None:
+    """Fill lines[i] with the 1-based line number of sorted byte offsets[i]."""
+    line = 1
+    pos = 0
+    for i in range(offsets.shape[0]):
+        end = offsets[i]
+        while pos < end:
+            if data[pos] == 10:
+                line += 1
+            pos += 1
+        lines[i] = line
+
+
+@lru_cache(maxsize=1)
+def _vector_backend() -> Tuple[Optional[Any], Optional[Callable[..., None]]]:
+    """
+    Load numpy and, if available, the Numba-compiled line-counting kernel.
+    
+    Imported lazily so the pre-commit hook doesn't pay for them on small
+    files. The kernel uses Numba's on-disk cache, so JIT compilation happens
+    once per installation rather than once per process.
+    
+    Returns:
+        Tuple of (numpy module or None, compiled kernel or None)
+    """
+    try:
+        import numpy as np
+    except ImportError:
+        return None, None
+    try:
+        import numba
+    except ImportError:
+        return np, None
+    return np, numba.njit(cache=True, nogil=True)(_count_lines_kernel)
+
+
+def _line_numbers(data: Union[bytes, mmap.mmap], offsets: Sequence[int]) -> List[int]:
+    """
+    Map sorted byte offsets to 1-based line numbers.
+    
+    Many hits are mapped in one vectorized pass over the buffer (a Numba
+    kernel, else numpy's searchsorted over the newline positions); few hits
+    just count newlines forward from the previous hit.
+    """
+    if len(offsets) >= _VECTORIZE_MIN_HITS:
+        np, kernel = _vector_backend()
+        if np is not None:
+            buffer = np.frombuffer(data, dtype=np.uint8)
+            positions = np.asarray(offsets, dtype=np.int64)
+            if kernel is not None:
+                lines = np.empty(len(positions), dtype=np.int64)
+                kernel(buffer, positions, lines)
+            else:
+                lines = np.searchsorted(np.flatnonzero(buffer == 10), positions) + 1
+            return lines.tolist()
+    
+    lines = []
+    pos = 0
+    line_num = 1
+    for offset in offsets:
+        line_num += len(_NEWLINE.findall(data, pos, offset))
+        pos = offset
+        lines.append(line_num)
+    return lines
+
 
 @dataclass
 class SecretMatch:
@@ -18,49 +239,7 @@ class SecretsScanner:
     """Scanner for detecting secrets, API keys, and credentials in code."""
     
     # Regex patterns for common secrets
-    PATTERNS = {
-        'aws_access_key': re.compile(r'AKIA[0-9A-Z]{16}'),
-        'aws_secret_key': re.compile(r'(?i)aws(.{0,20})?[\'"][0-9a-zA-Z/+]{40}[\'"]'),
-        'github_token': re.compile(r'ghp_[0-9a-zA-Z]{36}'),
-        'github_oauth': re.compile(r'gho_[0-9a-zA-Z]{36}'),
-        'github_app': re.compile(r'(ghu|ghs)_[0-9a-zA-Z]{36}'),
-        'slack_token': re.compile(r'xox[baprs]-([0-9a-zA-Z]{10,48})'),
-        'slack_webhook': re.compile(r'https://hooks\.slack\.com/services/T[a-zA-Z0-9_]{8}/B[a-zA-Z0-9_]{8}/[a-zA-Z0-9_]{24}'),
-        'google_api_key': re.compile(r'AIza[0-9A-Za-z\-_]{35}'),
-        'google_oauth': re.compile(r'[0-9]+-[0-9A-Za-z_]{32}\.apps\.googleusercontent\.com'),
-        'heroku_api_key': re.compile(r'[h|H][e|E][r|R][o|O][k|K][u|U].*[0-9A-F]{8}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{4}-[0-9A-F]{12}'),
-        'mailchimp_api_key': re.compile(r'[0-9a-f]{32}-us[0-9]{1,2}'),
-        'mailgun_api_key': re.compile(r'key-[0-9a-zA-Z]{32}'),
-        'stripe_api_key': re.compile(r'(?:r|s)k_live_[0-9a-zA-Z]{24}'),
-        'stripe_restricted_key': re.compile(r'rk_live_[0-9a-zA-Z]{24}'),
-        'square_access_token': re.compile(r'sq0atp-[0-9A-Za-z\-_]{22}'),
-        'square_oauth_secret': re.compile(r'sq0csp-[0-9A-Za-z\-_]{43}'),
-        'paypal_braintree': re.compile(r'access_token\$production\$[0-9a-z]{16}\$[0-9a-f]{32}'),
-        'picatic_api_key': re.compile(r'sk_live_[0-9a-z]{32}'),
-        'twilio_api_key': re.compile(r'SK[0-9a-fA-F]{32}'),
-        'twilio_account_sid': re.compile(r'AC[a-zA-Z0-9_\-]{32}'),
-        'twilio_app_sid': re.compile(r'AP[a-zA-Z0-9_\-]{32}'),
-        'dynatrace_token': re.compile(r'dt0[a-zA-Z]{1}[0-9]{2}\.[A-Z0-9]{24}\.[A-Z0-9]{64}'),
-        'shopify_shared_secret': re.compile(r'shpss_[a-fA-F0-9]{32}'),
-        'shopify_access_token': re.compile(r'shpat_[a-fA-F0-9]{32}'),
-        'shopify_custom_app': re.compile(r'shpca_[a-fA-F0-9]{32}'),
-        'shopify_private_app': re.compile(r'shppa_[a-fA-F0-9]{32}'),
-        'pypi_upload_token': re.compile(r'pypi-AgEIcHlwaS5vcmc[A-Za-z0-9-_]{50,1000}'),
-        'generic_api_key': re.compile(r'(?i)(api[_-]?key|apikey|api[_-]?token|access[_-]?token|auth[_-]?token)[\'"\s]*[:=][\'"\s]*[a-zA-Z0-9_\-]{20,}'),
-        'generic_secret': re.compile(r'(?i)(secret|password|passwd|pwd)[\'"\s]*[:=][\'"\s]*[^\s\'";]{8,}'),
-        'private_key': re.compile(r'-----BEGIN (RSA |EC |DSA |OPENSSH )?PRIVATE KEY-----'),
-        'jwt_token': re.compile(r'eyJ[A-Za-z0-9-_=]+\.eyJ[A-Za-z0-9-_=]+\.?[A-Za-z0-9-_.+/=]*'),
-        'basic_auth': re.compile(r'(?i)basic\s+[a-zA-Z0-9+/]{20,}={0,2}'),
-        'bearer_token': re.compile(r'(?i)bearer\s+[a-zA-Z0-9_\-\.=]{20,}'),
-        'connection_string': re.compile(r'(?i)(mongodb|mysql|postgresql|postgres|redis|amqp)://[^\s\'";]+:[^\s\'";]+@'),
-        'database_url': re.compile(r'(?i)database[_-]?url[\'"\s]*[:=][\'"\s]*[^\s\'";]+'),
-        'ssh_key': re.compile(r'ssh-(rsa|dss|ed25519)\s+AAAA[0-9A-Za-z+/]+[=]{0,3}'),
-        'azure_storage_key': re.compile(r'(?i)DefaultEndpointsProtocol=https;AccountName=[^;]+;AccountKey=[A-Za-z0-9+/=]{88}'),
-        'facebook_access_token': re.compile(r'EAACEdEose0cBA[0-9A-Za-z]+'),
-        'twitter_oauth': re.compile(r'[t|T][w|W][i|I][t|T][t|T][e|E][r|R].*[1-9][0-9]+-[0-9a-zA-Z]{40}'),
-        'npm_token': re.compile(r'npm_[a-zA-Z0-9]{36}'),
-        'docker_config': re.compile(r'(?i)"auth"\s*:\s*"[A-Za-z0-9+/=]{20,}"'),
-    }
+    PATTERNS = _SECRET_PATTERNS
     
     # Patterns to exclude (common false positives)
     EXCLUDE_PATTERNS = [
@@ -80,6 +259,28 @@ class SecretsScanner:
         re.compile(r'\{\{.*\}\}'),  # Template variables
     ]
     
+    def __init__(self):
+        """Initialize the scanner with the shared precompiled patterns."""
+        # Shared across instances; never mutate, use with_extra_patterns()
+        self._patterns = _COMPILED_PATTERNS
+    
+    @classmethod
+    def with_extra_patterns(cls, patterns: Dict[str, str]) -> 'SecretsScanner':
+        """
+        Create a scanner that also detects additional secret types.
+        
+        Args:
+            patterns: Mapping of secret type to regex source
+            
+        Returns:
+            Scanner using the built-in patterns plus the extra ones
+        """
+        scanner = cls()
+        scanner._patterns = _COMPILED_PATTERNS + _compile_patterns(
+            {name: re.compile(pattern) for name, pattern in patterns.items()}
+        )
+        return scanner
+    
     def scan_content(self, content: str, file_path: str = "") -> List[SecretMatch]:
         """
         Scan content for secrets and credentials.
@@ -94,32 +295,163 @@ class SecretsScanner:
         matches = []
         lines = content.split('\n')
         
+        # Only run patterns whose required literals appear somewhere in the content
+        patterns = [
+            compiled for compiled in self._patterns
+            if not compiled.markers or any(m in content for m in compiled.markers)
+        ]
+        if not patterns:
+            return matches
+        
         for line_num, line in enumerate(lines, start=1):
-            # Skip comments (basic detection)
-            stripped = line.strip()
-            if stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*'):
-                continue
+            self._scan_line(line, line_num, patterns, matches)
+        
+        return matches
+    
+    def scan_bytes(self, data: Union[bytes, mmap.mmap], file_path: str = "") -> List[SecretMatch]:
+        """
+        Scan raw file bytes (e.g. an mmap of the file) for secrets.
+        
+        Each pattern first runs over the undecoded buffer. Only the lines its
+        hits touch are decoded and scanned as in scan_content, so files
+        without secrets are never decoded at all.
+        
+        Args:
+            data: The bytes to scan
+            file_path: Optional file path for context
             
-            # Check each pattern
-            for secret_type, pattern in self.PATTERNS.items():
-                for match in pattern.finditer(line):
-                    matched_text = match.group(0)
-                    
-                    # Check if it's a false positive
-                    if self._is_false_positive(matched_text, line):
-                        continue
-                    
-                    matches.append(SecretMatch(
-                        type=secret_type,
-                        line_number=line_num,
-                        column_start=match.start(),
-                        column_end=match.end(),
-                        matched_text=self._redact_secret(matched_text),
-                        context=line.strip()
-                    ))
+        Returns:
+            List of detected secrets
+        """
+        database = _build_hyperscan_database(self._patterns)
+        if database is not None:
+            line_spans, patterns = self._find_candidates_hyperscan(database, data)
+        else:
+            line_spans, patterns = self._find_candidates_regex(data)
+        
+        matches = []
+        for line_num in sorted(line_spans):
+            start, end = line_spans[line_num]
+            line = data[start:end].rstrip(b'\r').decode('utf-8', errors='replace')
+            self._scan_line(line, line_num, patterns, matches)
         
         return matches
     
+    def _find_candidates_regex(
+        self,
+        data: Union[bytes, mmap.mmap]
+    ) -> Tuple[Dict[int, Tuple[int, int]], List[_CompiledPattern]]:
+        """
+        Find lines that may contain secrets by running each bytes pattern in turn.
+        
+        Returns:
+            Tuple of (line number to byte span map, patterns with any hit)
+        """
+        line_spans: Dict[int, Tuple[int, int]] = {}
+        patterns = []
+        size = len(data)
+        
+        for compiled in self._patterns:
+            # Skip the regex entirely when none of its required literals occur
+            if compiled.byte_markers and all(data.find(m) == -1 for m in compiled.byte_markers):
+                continue
+            
+            spans = [match.span() for match in compiled.byte_pattern.finditer(data)]
+            if not spans:
+                continue
+            
+            # Line numbers are only computed for hits
+            line_nums = _line_numbers(data, [start for start, _ in spans])
+            for (start, end), line_num in zip(spans, line_nums):
+                # Record every line the hit touches (it may span lines)
+                span_start = data.rfind(b'\n', 0, start) + 1
+                span_line = line_num
+                while True:
+                    span_end = data.find(b'\n', span_start)
+                    if span_end == -1:
+                        span_end = size
+                    line_spans[span_line] = (span_start, span_end)
+                    if span_end >= end or span_end == size:
+                        break
+                    span_start = span_end + 1
+                    span_line += 1
+            
+            patterns.append(compiled)
+        
+        return line_spans, patterns
+    
+    def _find_candidates_hyperscan(
+        self,
+        database: Any,
+        data: Union[bytes, mmap.mmap]
+    ) -> Tuple[Dict[int, Tuple[int, int]], List[_CompiledPattern]]:
+        """
+        Find lines that may contain secrets in a single Hyperscan pass.
+        
+        Hyperscan reports the end offset of every match of every pattern, so
+        the line each per-line match ends on is always among the candidates.
+        
+        Returns:
+            Tuple of (line number to byte span map, patterns with any hit)
+        """
+        hits: List[Tuple[int, int]] = []
+        
+        def on_match(pattern_id: int, start: int, end: int, flags: int, context: Any) -> None:
+            hits.append((end, pattern_id))
+        
+        database.scan(data, match_event_handler=on_match)
+        hits.sort()
+        
+        line_spans: Dict[int, Tuple[int, int]] = {}
+        pattern_ids = set()
+        size = len(data)
+        
+        lasts = [end - 1 for end, _ in hits]
+        for (_, pattern_id), last, line_num in zip(hits, lasts, _line_numbers(data, lasts)):
+            pattern_ids.add(pattern_id)
+            if line_num in line_spans:
+                continue  # Same line as the previous hit
+            
+            span_start = data.rfind(b'\n', 0, last) + 1
+            span_end = data.find(b'\n', last)
+            if span_end == -1:
+                span_end = size
+            line_spans[line_num] = (span_start, span_end)
+        
+        return line_spans, [self._patterns[i] for i in sorted(pattern_ids)]
+    
+    def _scan_line(
+        self,
+        line: str,
+        line_num: int,
+        patterns: Sequence[_CompiledPattern],
+        matches: List[SecretMatch]
+    ) -> None:
+        """Scan a single line with the given patterns, appending to matches."""
+        # Skip comments (basic detection)
+        stripped = line.strip()
+        if stripped.startswith('#') or stripped.startswith('//') or stripped.startswith('/*'):
+            return
+        
+        # Check each pattern
+        for compiled in patterns:
+            secret_type = compiled.name
+            for match in compiled.pattern.finditer(line):
+                matched_text = match.group(0)
+                
+                # Check if it's a false positive
+                if self._is_false_positive(matched_text, line):
+                    continue
+                
+                matches.append(SecretMatch(
+                    type=secret_type,
+                    line_number=line_num,
+                    column_start=match.start(),
+                    column_end=match.end(),
+                    matched_text=self._redact_secret(matched_text),
+                    context=stripped
+                ))
+    
     def _is_false_positive(self, matched_text: str, context: str) -> bool:
         """Check if a match is likely a false positive."""
         # Check against exclude patterns
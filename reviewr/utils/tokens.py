@@ -0,0 +1,60 @@
+"""
+Token counting for prompt budgeting.
+"""
+
+from functools import lru_cache
+
+try:
+    import tiktoken
+except ImportError:
+    tiktoken = None
+
+
+@lru_cache(maxsize=1)
+def _token_encoder():
+    """Load the tiktoken encoder once per process, or None when it is unavailable."""
+    if tiktoken is None:
+        return None
+    try:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception:
+        # The encoding file is downloaded on first use and may be unreachable offline
+        return None
+
+
+def count_tokens(text: str) -> int:
+    """
+    Count the tokens in text.
+
+    Counted exactly with tiktoken when available, else estimated at ~4
+    characters per token. Not memoized: per-chunk text is almost never
+    repeated, so caching it would only keep whole prompts alive.
+
+    Args:
+        text: Text to count
+
+    Returns:
+        Token count
+    """
+    encoder = _token_encoder()
+    if encoder is None:
+        return len(text) // 4
+    return len(encoder.encode(text, disallowed_special=()))
+
+
+@lru_cache(maxsize=32)
+def count_prefix_tokens(prefix: str) -> int:
+    """
+    Count the tokens in a constant prompt prefix.
+
+    Memoized, so a prefix repeated in every request of a run is tokenized
+    once per process. Only pass text built from static templates, never
+    per-chunk code.
+
+    Args:
+        prefix: Prompt prefix to count
+
+    Returns:
+        Token count
+    """
+    return count_tokens(prefix)
@@ -30,14 +30,15 @@ setup(
         "tenacity>=8.0",
         "diskcache>=5.0",
         "anthropic>=0.18",
-        "openai>=1.0",
-        "google-generativeai>=0.3",
+        "openai>=1.40",
+        "google-generativeai>=0.7",
         "tomli>=2.0.0;python_version<'3.11'",
     ],
     extras_require={
         "github": ["requests>=2.28"],
         "gitlab": ["requests>=2.28"],
         "dashboard": ["fastapi>=0.100", "uvicorn>=0.23", "sqlalchemy>=2.0"],
+        "performance": ["orjson>=3.8", "hyperscan>=0.4", "numpy>=1.22", "numba>=0.56", "msgspec>=0.18", "h2>=4", "tiktoken>=0.5", "json-repair>=0.25", "uvloop>=0.18; sys_platform != 'win32'"],
         "all": ["requests>=2.28", "fastapi>=0.100", "uvicorn>=0.23", "sqlalchemy>=2.0"],
         "dev": [
             "pytest>=7.0",
@@ -0,0 +1,466 @@
+"""
+Tests for the Augment Code provider.
+"""
+
+import asyncio
+import gzip
+import json
+import os
+
+import httpx
+import pytest
+
+from reviewr.providers.augmentcode import AugmentCodeProvider
+from reviewr.providers.base import CodeChunk, ReviewType
+from reviewr.utils.cache import LLMResponseCache
+
+
+FINDINGS = [
+    {
+        "type": "security",
+        "severity": "high",
+        "line_start": 1,
+        "line_end": 1,
+        "message": "SQL injection",
+        "suggestion": "Use parameters",
+        "confidence": 0.95,
+    }
+]
+
+
+def completion(content):
+    """Build a chat completion response body."""
+    return {
+        "choices": [{"message": {"content": content}}],
+        "usage": {"prompt_tokens": 100, "completion_tokens": 20},
+    }
+
+
+def request_json(request):
+    """Decode a request body, gzip-compressed or not."""
+    body = request.content
+    if request.headers.get("content-encoding") == "gzip":
+        body = gzip.decompress(body)
+    return json.loads(body)
+
+
+@pytest.fixture
+def chunk():
+    return CodeChunk(
+        content='cursor.execute("SELECT * FROM t WHERE id=" + user_id)',
+        file_path="app.py",
+        start_line=1,
+        end_line=1,
+        language="python",
+    )
+
+
+@pytest.fixture
+def make_provider(tmp_path):
+    """Create providers whose HTTP requests are served by a handler."""
+    def make(handler, **kwargs):
+        kwargs.setdefault("response_cache", LLMResponseCache(cache_dir=tmp_path / "llm"))
+        provider = AugmentCodeProvider(api_key="test-key", **kwargs)
+        provider.client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+        return provider
+    return make
+
+
+class TestAugmentCodeProvider:
+    """Test AugmentCodeProvider request handling."""
+    
+    async def test_review_code_parses_findings(self, make_provider, chunk):
+        """Test findings are parsed from the completion."""
+        provider = make_provider(lambda request: httpx.Response(200, json=completion(json.dumps(FINDINGS))))
+        
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        
+        assert len(findings) == 1
+        assert findings[0].type == ReviewType.SECURITY
+        assert findings[0].file_path == "app.py"
+        assert provider.get_stats()["total_input_tokens"] == 100
+    
+    async def test_identical_requests_use_response_cache(self, make_provider, chunk, tmp_path):
+        """Test a repeated deterministic request is served from the cache."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=completion(json.dumps(FINDINGS)))
+        
+        provider = make_provider(handler)
+        first = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        second = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        
+        assert first == second
+        assert len(calls) == 1
+        assert provider.get_stats()["request_count"] == 1
+        assert provider.get_stats()["response_cache"]["hits"] == 1
+        
+        # The on-disk entry outlives the provider
+        fresh = make_provider(handler, response_cache=LLMResponseCache(cache_dir=tmp_path / "llm"))
+        assert await fresh.review_code(chunk, [ReviewType.CORRECTNESS]) == first
+        assert len(calls) == 1
+    
+    async def test_nonzero_temperature_is_not_cached(self, make_provider, chunk):
+        """Test sampled responses are always requested from the API."""
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            return httpx.Response(200, json=completion("[]"))
+        
+        provider = make_provider(handler, temperature=0.7)
+        await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        
+        assert len(calls) == 2
+    
+    async def test_concurrent_identical_requests_are_coalesced(self, make_provider, chunk):
+        """Test identical in-flight requests share one API call."""
+        calls = []
+        
+        async def handler(request):
+            calls.append(request)
+            await asyncio.sleep(0.01)
+            return httpx.Response(200, json=completion(json.dumps(FINDINGS)))
+        
+        provider = make_provider(handler)
+        results = await asyncio.gather(*(
+            provider.review_code(chunk, [ReviewType.CORRECTNESS]) for _ in range(5)
+        ))
+        
+        assert len(calls) == 1
+        assert all(r == results[0] for r in results)
+        assert len({id(r) for r in results}) == 5
+        assert provider._inflight == {}
+    
+    async def test_providers_share_connection_pool(self):
+        """Test provider instances share one client per event loop."""
+        first = AugmentCodeProvider(api_key="key-1")
+        second = AugmentCodeProvider(api_key="key-2")
+        
+        # Response caching is opt-in, even for deterministic requests
+        assert first.temperature == 0 and first.response_cache is None
+        assert first.client is second.client
+        
+        await AugmentCodeProvider.close_shared_client()
+        assert first.client is not None and not first.client.is_closed
+        await AugmentCodeProvider.close_shared_client()
+    
+    async def test_authorization_sent_per_request(self, make_provider, chunk):
+        """Test each provider authenticates its own requests."""
+        seen = []
+        
+        def handler(request):
+            seen.append(request.headers["authorization"])
+            return httpx.Response(200, json=completion("[]"))
+        
+        provider = make_provider(handler)
+        await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        
+        assert seen == ["Bearer test-key"]
+    
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    async def test_json_with_and_without_orjson(self, make_provider, chunk, monkeypatch, use_orjson):
+        """Test requests and responses round-trip with either JSON backend."""
+        from reviewr.providers import augmentcode
+        
+        if not use_orjson:
+            monkeypatch.setattr(augmentcode, "orjson", None)
+        bodies = []
+        
+        def handler(request):
+            bodies.append(request_json(request))
+            assert request.headers["content-type"] == "application/json"
+            return httpx.Response(200, json=completion("```json\n" + json.dumps(FINDINGS) + "\n```"))
+        
+        provider = make_provider(handler)
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        
+        assert bodies[0]["model"] == "augment-code-1"
+        assert [f.message for f in findings] == ["SQL injection"]
+    
+    async def test_streamed_completion(self, make_provider, chunk):
+        """Test server-sent event deltas are assembled before parsing."""
+        text = json.dumps(FINDINGS)
+        events = [
+            {"choices": [{"delta": {"content": text[:20]}}]},
+            {"choices": [{"delta": {"content": text[20:]}}]},
+            {"choices": [], "usage": {"prompt_tokens": 50, "completion_tokens": 10}},
+        ]
+        body = "".join(f"data: {json.dumps(e)}\n\n" for e in events) + "data: [DONE]\n\n"
+        requests = []
+        
+        def handler(request):
+            requests.append(request_json(request))
+            return httpx.Response(200, text=body, headers={"content-type": "text/event-stream"})
+        
+        provider = make_provider(handler)
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        
+        assert requests[0]["stream"] is True
+        assert [f.message for f in findings] == ["SQL injection"]
+        assert provider.get_stats()["total_input_tokens"] == 50
+    
+    def test_prompt_keeps_braces_in_code(self, make_provider):
+        """Test code and context braces pass through the prompt skeletons verbatim."""
+        provider = make_provider(lambda request: httpx.Response(500))
+        braced = CodeChunk(
+            content="data = {'id': user_id}  # {placeholder}",
+            file_path="app.py",
+            start_line=3,
+            end_line=4,
+            language="python",
+            context="def f(): return {}",
+        )
+        
+        for review_types in ([ReviewType.CORRECTNESS], [ReviewType.EXPLAIN], [ReviewType.SECURITY]):
+            prompt = provider._build_augmentcode_prompt(braced, review_types)
+            assert braced.content in prompt
+            assert braced.context in prompt
+        
+        explain = provider._build_augmentcode_prompt(braced, [ReviewType.EXPLAIN])
+        assert "Lines: 3-4" in explain
+    
+    @pytest.mark.parametrize("review_types", [[ReviewType.CORRECTNESS], [ReviewType.EXPLAIN], [ReviewType.SECURITY]])
+    def test_prompts_lead_with_stable_text(self, make_provider, chunk, review_types):
+        """Test per-chunk fields come after the shared instructions."""
+        provider = make_provider(lambda request: httpx.Response(500))
+        other = CodeChunk(content="eval(data)", file_path="other.py", start_line=7, end_line=9, language="python")
+        
+        first = provider._build_augmentcode_prompt(chunk, review_types)
+        second = provider._build_augmentcode_prompt(other, review_types)
+        shared = len(os.path.commonprefix([first, second]))
+        
+        assert "RESPONSE FORMAT" in first[:shared]
+        assert first.index(chunk.file_path) >= shared
+    
+    @pytest.mark.parametrize("encoder", [None, "fake"])
+    def test_estimate_tokens(self, make_provider, monkeypatch, encoder):
+        """Test token counts use the encoder when available and ~4 chars per token otherwise."""
+        from reviewr.utils import tokens
+        
+        class FakeEncoder:
+            def encode(self, text, disallowed_special=()):
+                return text.split()
+        
+        monkeypatch.setattr(tokens, "_token_encoder", lambda: FakeEncoder() if encoder else None)
+        provider = make_provider(lambda request: httpx.Response(500))
+        
+        assert provider.estimate_tokens("one two three four") == 4
+        assert provider.estimate_tokens("x" * 40) == (1 if encoder else 10)
+    
+    def test_security_prompt_template_is_specialized_once(self, make_provider, chunk):
+        """Test the security context is built once and baked into a reusable skeleton."""
+        from reviewr.providers import augmentcode
+        
+        provider = make_provider(lambda request: httpx.Response(500))
+        context = "Check {untrusted} input"
+        first = provider._build_augmentcode_security_prompt(chunk, [ReviewType.SECURITY], context)
+        
+        assert first.startswith(context)
+        assert chunk.content in first
+        assert augmentcode._security_prompt_template(context) is augmentcode._security_prompt_template(context)
+        if augmentcode.SECURITY_CONTEXT_AVAILABLE:
+            assert augmentcode._security_prompt_context() is augmentcode._security_prompt_context()
+    
+    async def test_retries_only_transient_errors(self, make_provider, chunk):
+        """Test 429s are retried after Retry-After while client errors fail at once."""
+        statuses = [429, 200]
+        calls = []
+        
+        def handler(request):
+            calls.append(request)
+            status = statuses[len(calls) - 1]
+            if status == 429:
+                return httpx.Response(429, headers={"retry-after": "0"})
+            return httpx.Response(200, json=completion(json.dumps(FINDINGS)))
+        
+        provider = make_provider(handler, response_cache=None, temperature=0.5)
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        assert len(calls) == 2
+        assert [f.message for f in findings] == ["SQL injection"]
+        
+        calls.clear()
+        provider = make_provider(lambda request: calls.append(request) or httpx.Response(400))
+        with pytest.raises(httpx.HTTPStatusError):
+            await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        assert len(calls) == 1
+    
+    def test_retry_after_header(self):
+        """Test Retry-After is read as seconds or an HTTP date, and capped."""
+        from reviewr.providers.augmentcode import _retry_after
+        
+        assert _retry_after(httpx.Response(429, headers={"retry-after": "2.5"})) == 2.5
+        assert _retry_after(httpx.Response(429, headers={"retry-after": "9999"})) == 60.0
+        assert _retry_after(httpx.Response(429, headers={"retry-after": "Wed, 21 Oct 2015 07:28:00 GMT"})) == 0.0
+        assert _retry_after(httpx.Response(429, headers={"retry-after": "soon"})) is None
+        assert _retry_after(httpx.Response(429)) is None
+    
+    @pytest.mark.parametrize("wrap", [
+        "{}",
+        "```json\n{}\n```",
+        "  ```\n{}\n```\n",
+        "{}\n```",
+    ])
+    def test_parse_response_strips_fences(self, make_provider, chunk, wrap):
+        """Test findings are parsed with or without a markdown code fence."""
+        provider = make_provider(lambda request: httpx.Response(500))
+        
+        findings = provider._parse_response(wrap.format(json.dumps(FINDINGS)), chunk)
+        
+        assert [f.message for f in findings] == ["SQL injection"]
+    
+    def test_parse_response_skips_invalid_findings(self, make_provider, chunk, caplog):
+        """Test findings with unknown types or missing fields are skipped and logged."""
+        provider = make_provider(lambda request: httpx.Response(500))
+        items = FINDINGS + [
+            {**FINDINGS[0], "type": "unknown"},
+            {k: v for k, v in FINDINGS[0].items() if k != "message"},
+            "not a finding",
+        ]
+        
+        findings = provider._parse_response(json.dumps(items), chunk)
+        
+        assert [(f.type, f.file_path) for f in findings] == [(ReviewType.SECURITY, "app.py")]
+        assert [r.levelname for r in caplog.records].count("WARNING") == 3
+        
+        caplog.clear()
+        assert provider._parse_response("not json" * 100, chunk) == []
+        assert caplog.records[0].levelname == "ERROR"
+        assert len(caplog.records[0].getMessage()) < 600
+    
+    def test_typed_decode_matches_lenient_parse(self, make_provider, chunk, monkeypatch):
+        """Test the msgspec typed decode builds the same findings as the dict parse."""
+        from reviewr.providers import augmentcode
+        
+        provider = make_provider(lambda request: httpx.Response(500))
+        content = json.dumps(FINDINGS + [{**FINDINGS[0], "confidence": 1, "extra": "ignored"}])
+        
+        typed = provider._parse_response(content, chunk)
+        monkeypatch.setattr(augmentcode, "_decode_findings", None)
+        lenient = provider._parse_response(content, chunk)
+        
+        assert typed == lenient
+        assert len(typed) == 2
+    
+    @pytest.mark.parametrize("typed", [True, False])
+    async def test_review_code_batch(self, make_provider, chunk, monkeypatch, typed):
+        """Test chunks are reviewed in one request and findings routed by chunk id."""
+        from reviewr.providers import augmentcode
+        
+        if not typed:
+            monkeypatch.setattr(augmentcode, "_decode_batch", None)
+        chunks = [
+            chunk,
+            CodeChunk(content="os.system(cmd)", file_path="run.py", start_line=10, end_line=10, language="python"),
+            CodeChunk(content="pass", file_path="ok.py", start_line=1, end_line=1, language="python"),
+        ]
+        prompts = []
+        
+        def handler(request):
+            prompts.append(request_json(request)["messages"][1]["content"])
+            results = [
+                {"chunk_id": 1, "findings": [{**FINDINGS[0], "message": "Command injection", "line_start": 10, "line_end": 10}]},
+                {"chunk_id": 0, "findings": FINDINGS},
+            ]
+            return httpx.Response(200, json=completion(json.dumps({"results": results})))
+        
+        provider = make_provider(handler)
+        results = await provider.review_code_batch(chunks, [ReviewType.CORRECTNESS])
+        
+        assert len(prompts) == 1
+        assert all(f"<<<CHUNK_ID={i}>>>" in prompts[0] for i in range(3))
+        assert [[f.message for f in findings] for findings in results] == [["SQL injection"], ["Command injection"], []]
+        assert results[1][0].file_path == "run.py"
+    
+    async def test_review_code_batch_falls_back_per_chunk(self, make_provider, chunk):
+        """Test a response that ignores the batch format is retried chunk by chunk."""
+        chunks = [chunk, chunk]
+        requests = []
+        
+        def handler(request):
+            requests.append(request)
+            return httpx.Response(200, json=completion(json.dumps(FINDINGS)))
+        
+        provider = make_provider(handler, response_cache=None, temperature=0.5)
+        results = await provider.review_code_batch(chunks, [ReviewType.CORRECTNESS])
+        
+        assert len(requests) == 3
+        assert [[f.message for f in findings] for findings in results] == [["SQL injection"]] * 2
+    
+    def test_request_key_skips_constant_prompt_text(self, make_provider, chunk):
+        """Test request keys hash skeleton digests plus chunk fields, not whole prompts."""
+        provider = make_provider(lambda request: httpx.Response(500))
+        other = CodeChunk(content="eval(data)", file_path="app.py", start_line=1, end_line=1, language="python")
+        
+        def key(code_chunk, review_types):
+            template, fields = provider._prompt_parts(code_chunk, review_types)
+            material = provider._key_material(template, fields)
+            assert len(json.dumps(material)) < len(template) // 4
+            return provider._request_key(material)
+        
+        assert key(chunk, [ReviewType.SECURITY]) == key(chunk, [ReviewType.SECURITY])
+        assert key(chunk, [ReviewType.SECURITY]) != key(other, [ReviewType.SECURITY])
+        assert key(chunk, [ReviewType.SECURITY]) != key(chunk, [ReviewType.CORRECTNESS])
+    
+    async def test_review_many_bounds_concurrency(self, make_provider):
+        """Test chunks are reviewed concurrently up to the limit, results in order."""
+        active = 0
+        peak = 0
+        
+        async def handler(request):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            active -= 1
+            path = request_json(request)["messages"][1]["content"].split("File: ")[1].split("\n")[0]
+            return httpx.Response(200, json=completion(json.dumps([{**FINDINGS[0], "message": path}])))
+        
+        chunks = [
+            CodeChunk(content=f"x = {i}", file_path=f"f{i}.py", start_line=1, end_line=1, language="python")
+            for i in range(6)
+        ]
+        provider = make_provider(handler)
+        results = await provider.review_many(chunks, [ReviewType.CORRECTNESS], concurrency=2)
+        
+        assert [[f.message for f in findings] for findings in results] == [[f"f{i}.py"] for i in range(6)]
+        assert peak == 2
+
+    
+    async def test_compressed_requests(self, make_provider, chunk):
+        """Test large bodies are gzipped, and sent plain once the server rejects gzip."""
+        encodings = []
+        
+        def handler(request):
+            encodings.append(request.headers.get("content-encoding"))
+            if request.headers.get("content-encoding") == "gzip" and len(encodings) == 1:
+                assert request_json(request)["model"] == "augment-code-1"
+                return httpx.Response(200, json=completion("[]"))
+            if request.headers.get("content-encoding") == "gzip":
+                return httpx.Response(415)
+            return httpx.Response(200, json=completion("[]"))
+        
+        provider = make_provider(handler, response_cache=None, temperature=0.5)
+        for _ in range(3):
+            assert await provider.review_code(chunk, [ReviewType.CORRECTNESS]) == []
+        
+        assert encodings == ["gzip", "gzip", None, None]
+        assert provider.compress_requests is False
+    
+    @pytest.mark.parametrize("content", ["", "  \n", "[]", "```json\n[]\n```", "```\n\n```"])
+    def test_parse_empty_response(self, make_provider, chunk, monkeypatch, content, caplog):
+        """Test empty responses return no findings without decoding or logging."""
+        from reviewr.providers import augmentcode
+        
+        def fail(data):
+            raise AssertionError("decoded an empty response")
+        
+        monkeypatch.setattr(augmentcode, "_json_loads", fail)
+        monkeypatch.setattr(augmentcode, "_decode_findings", fail)
+        provider = make_provider(lambda request: httpx.Response(500))
+        
+        assert provider._parse_response(content, chunk) == []
+        assert not caplog.records
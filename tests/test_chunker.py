@@ -0,0 +1,36 @@
+"""
+Tests for code chunking.
+"""
+
+import pytest
+
+from reviewr.providers.base import CodeChunk
+from reviewr.review.chunker import SimpleChunker
+
+
+CONTENT = "\n".join(f"line {i}" for i in range(1, 201)) + "\n"
+
+
+def test_chunks_are_views_of_the_source():
+    """Test chunks slice the file text, matching line-joined content and context."""
+    lines = CONTENT.split("\n")
+    chunks = SimpleChunker(overlap_lines=5).chunk_file("app.py", CONTENT, "python", max_tokens=500)
+
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert chunk._source is CONTENT
+        assert chunk.content == "\n".join(lines[chunk.start_line - 1:chunk.end_line])
+    assert chunks[1].context == "\n".join(lines[chunks[1].start_line - 6:chunks[1].start_line - 1])
+    assert chunks[-1].end_line == len(lines)
+
+
+def test_code_chunk_is_immutable_value():
+    """Test offset-backed and plain chunks compare equal and can't be mutated."""
+    chunk = CodeChunk.from_source("a\nb\nc", 2, 5, "app.py", 2, 3, "python")
+
+    assert chunk == CodeChunk("b\nc", "app.py", 2, 3, "python")
+    assert hash(chunk) == hash(CodeChunk("b\nc", "app.py", 2, 3, "python"))
+    with pytest.raises(AttributeError):
+        chunk.content = "x"
+    with pytest.raises(AttributeError):
+        chunk.start_line = 1
@@ -0,0 +1,495 @@
+"""
+Tests for the Claude provider.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import pytest
+from anthropic import BadRequestError, RateLimitError
+
+from reviewr.providers import claude
+from reviewr.providers.claude import ClaudeProvider
+from reviewr.providers.base import CodeChunk, ReviewType
+from reviewr.utils import json_salvage
+from reviewr.utils.cache import LLMResponseCache
+
+
+FINDINGS = [
+    {
+        "type": "security",
+        "severity": "high",
+        "line_start": 1,
+        "line_end": 1,
+        "message": "SQL injection",
+        "suggestion": "Use parameters",
+        "confidence": 0.95,
+    }
+]
+
+
+def message(text, stop_reason="end_turn", **usage):
+    """Build a Messages API response."""
+    usage = {"input_tokens": 100, "output_tokens": 20, "cache_read_input_tokens": 0, **usage}
+    return SimpleNamespace(
+        content=[SimpleNamespace(type="text", text=text)],
+        stop_reason=stop_reason,
+        usage=SimpleNamespace(**usage),
+    )
+
+
+class FakeStream:
+    """Stand-in for the SDK's message stream."""
+
+    def __init__(self, response):
+        self.response = response
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        return False
+
+    async def get_final_message(self):
+        return await self.response
+
+
+class FakeMessages:
+    """Stand-in for the SDK's messages resource, recording each request."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+        self.streamed = 0
+
+    async def respond(self, request):
+        return self.handler(request)
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        return await self.respond(kwargs)
+
+    def stream(self, **kwargs):
+        self.requests.append(kwargs)
+        self.streamed += 1
+        return FakeStream(self.respond(kwargs))
+
+
+@pytest.fixture
+def chunk():
+    return CodeChunk(
+        content='cursor.execute("SELECT * FROM t WHERE id=" + user_id)',
+        file_path="app.py",
+        start_line=1,
+        end_line=1,
+        language="python",
+    )
+
+
+@pytest.fixture
+def make_provider():
+    """Create providers whose API requests are answered by a handler."""
+    def make(handler, **kwargs):
+        provider = ClaudeProvider(api_key="test-key", **kwargs)
+        provider.client = SimpleNamespace(messages=FakeMessages(handler))
+        return provider
+    return make
+
+
+class TestClaudeProvider:
+    """Test ClaudeProvider request handling."""
+
+    async def test_review_code_parses_findings(self, make_provider, chunk):
+        """Test findings are parsed from the message."""
+        provider = make_provider(lambda request: message(json.dumps(FINDINGS)))
+
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+
+        assert len(findings) == 1
+        assert findings[0].type == ReviewType.SECURITY
+        assert findings[0].file_path == "app.py"
+        assert provider.get_stats()["total_input_tokens"] == 100
+
+    @pytest.mark.parametrize("review_types", [
+        [ReviewType.CORRECTNESS],
+        [ReviewType.EXPLAIN],
+        [ReviewType.SECURITY, ReviewType.PERFORMANCE],
+    ])
+    async def test_static_prefix_marked_for_prompt_caching(self, make_provider, chunk, review_types):
+        """Test the constant prompt prefix is a cache breakpoint and the code follows it."""
+        provider = make_provider(lambda request: message("[]"))
+        other = CodeChunk("x = 1", "other.py", 10, 10, "python", context="y = 2")
+
+        await provider.review_code(chunk, review_types)
+        await provider.review_code(other, review_types)
+
+        first, second = provider.client.messages.requests
+        assert first["system"][0]["cache_control"] == {"type": "ephemeral"}
+        static, dynamic = first["messages"][0]["content"]
+        assert static["cache_control"] == {"type": "ephemeral"}
+        assert "cache_control" not in dynamic
+        assert chunk.content in dynamic["text"] and chunk.content not in static["text"]
+        # The prefix is the same for every chunk
+        assert second["messages"][0]["content"][0] == static
+        assert "y = 2" in second["messages"][0]["content"][1]["text"]
+
+    async def test_tracks_prompt_cache_tokens(self, make_provider, chunk):
+        """Test prompt cache writes and reads are counted and give a hit rate."""
+        responses = iter([
+            message("[]", cache_creation_input_tokens=1500),
+            message("[]", cache_read_input_tokens=1500),
+        ])
+        provider = make_provider(lambda request: next(responses))
+        assert provider.get_stats()["cache_hit_rate"] == 0.0
+
+        await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+        await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        stats = provider.get_stats()
+        assert stats["total_cache_creation_tokens"] == 1500
+        assert stats["total_cache_read_tokens"] == 1500
+        assert stats["cache_hit_rate"] == pytest.approx(1500 / 1700)
+
+    def test_usage_tracking_is_thread_safe(self, make_provider):
+        """Test usage updates from many threads are all counted."""
+        from concurrent.futures import ThreadPoolExecutor
+
+        provider = make_provider(lambda request: message("[]"))
+
+        def track(_):
+            for _ in range(1000):
+                provider._track_usage(2, 1, cache_read_tokens=1)
+
+        with ThreadPoolExecutor(max_workers=8) as pool:
+            list(pool.map(track, range(8)))
+
+        stats = provider.get_stats()
+        assert stats["request_count"] == 8000
+        assert stats["total_input_tokens"] == 16000
+        assert stats["total_cache_read_tokens"] == 8000
+
+    async def test_review_code_batch_attributes_findings(self, make_provider, chunk):
+        """Test a batch is one request whose findings are split by chunk_id."""
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+        provider = make_provider(lambda request: message(json.dumps([{**FINDINGS[0], "chunk_id": 1}])))
+
+        results = await provider.review_code_batch([chunk, other], [ReviewType.SECURITY])
+
+        assert len(provider.client.messages.requests) == 1
+        request = provider.client.messages.requests[0]
+        dynamic = request["messages"][0]["content"][1]["text"]
+        assert '<chunk id="0">' in dynamic and '<chunk id="1">' in dynamic
+        assert results[0] == []
+        assert [finding.file_path for finding in results[1]] == ["other.py"]
+
+    @pytest.mark.parametrize("review_types", [[ReviewType.CORRECTNESS], [ReviewType.SECURITY]])
+    def test_batch_prefix_built_once(self, make_provider, chunk, review_types):
+        """Test every batch of the same review types reuses one static prefix."""
+        provider = make_provider(lambda request: message("[]"))
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+
+        first, dynamic = provider._build_claude_batch_prompt([chunk, other], review_types)
+        second, _ = provider._build_claude_batch_prompt([other], review_types)
+
+        assert first is second
+        assert first.endswith(claude._BATCH_INSTRUCTIONS)
+        # Chunks use the code block the prefix's task refers to
+        block = "<code_under_review>" if ReviewType.SECURITY in review_types else "<code_context>"
+        assert dynamic.count(block) == 2
+
+    async def test_review_code_batch_falls_back_per_chunk(self, make_provider, chunk):
+        """Test findings without a chunk_id are re-reviewed chunk by chunk."""
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+        provider = make_provider(lambda request: message(json.dumps(FINDINGS)))
+
+        results = await provider.review_code_batch([chunk, other], [ReviewType.CORRECTNESS])
+
+        assert len(provider.client.messages.requests) == 3
+        assert [[finding.file_path for finding in findings] for findings in results] == [["app.py"], ["other.py"]]
+
+    async def test_failed_batch_keeps_other_batches(self, make_provider):
+        """Test a batch whose request fails is reviewed chunk by chunk, without losing other batches."""
+        def handler(request):
+            if "broken.py" in json.dumps(request):
+                response = SimpleNamespace(status_code=400, headers={}, request=None)
+                raise BadRequestError("invalid request", response=response, body=None)
+            return message(json.dumps([{**FINDINGS[0], "chunk_id": 0}]))
+
+        provider = make_provider(handler)
+        chunks = [CodeChunk(f"x = {i}", name, i, i, "python")
+                  for i, name in enumerate(["a.py", "b.py", "c.py", "broken.py"])]
+
+        results = await provider.review_code_batch(chunks, [ReviewType.CORRECTNESS], batch_size=2)
+
+        assert [[finding.file_path for finding in findings] for findings in results] == [["a.py"], [], ["c.py"], []]
+        assert len(provider.client.messages.requests) == 4
+
+    async def test_unreviewable_chunks_are_not_sent(self, make_provider, chunk):
+        """Test blank chunks, empty review types and chunks below the token floor skip the API."""
+        provider = make_provider(lambda request: message(json.dumps(FINDINGS)))
+        blank = CodeChunk("  \n\t\n", "blank.py", 1, 2, "python")
+
+        assert await provider.review_code(blank, [ReviewType.SECURITY]) == []
+        assert await provider.review_code(chunk, []) == []
+        results = await provider.review_code_batch([blank, chunk, blank], [ReviewType.SECURITY])
+        assert [len(findings) for findings in results] == [0, 1, 0]
+        assert len(provider.client.messages.requests) == 1
+
+        provider.min_reviewable_tokens = 10_000
+        assert await provider.review_code(chunk, [ReviewType.SECURITY]) == []
+        assert len(provider.client.messages.requests) == 1
+
+    def test_batches_fit_context_window(self, make_provider):
+        """Test batches are limited by batch_size and by the context window."""
+        provider = make_provider(lambda request: message("[]"))
+        small = [CodeChunk("x = 1\n", "a.py", i, i, "python") for i in range(5)]
+        large = [CodeChunk("x" * 400000, "b.py", 1, 1, "python") for _ in range(2)]
+
+        assert [len(batch) for batch in provider._pack_batches(small, [ReviewType.CORRECTNESS], 2)] == [2, 2, 1]
+        assert [len(batch) for batch in provider._pack_batches(large, [ReviewType.CORRECTNESS], 8)] == [1, 1]
+
+    async def test_response_cache_skips_api_call(self, make_provider, chunk, tmp_path):
+        """Test an identical deterministic review is answered from the cache."""
+        cache = LLMResponseCache(cache_dir=tmp_path / "llm")
+        provider = make_provider(lambda request: message(json.dumps(FINDINGS)), response_cache=cache)
+
+        first = await provider.review_code(chunk, [ReviewType.SECURITY])
+        second = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert first == second
+        assert len(provider.client.messages.requests) == 1
+        assert provider.get_stats()["response_cache"]["hits"] == 1
+
+    async def test_response_cache_unused_above_temperature_zero(self, make_provider, chunk, tmp_path):
+        """Test sampled responses are not cached."""
+        cache = LLMResponseCache(cache_dir=tmp_path / "llm")
+        provider = make_provider(lambda request: message("[]"), response_cache=cache, temperature=0.7)
+
+        await provider.review_code(chunk, [ReviewType.SECURITY])
+        await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert len(provider.client.messages.requests) == 2
+
+    async def test_pooled_client(self):
+        """Test instances with the same settings share one sized keep-alive pool per event loop."""
+        provider = ClaudeProvider(api_key="test-key", max_connections=16)
+        same = ClaudeProvider(api_key="test-key", model="claude-3-haiku-20240307", max_connections=16)
+        other = ClaudeProvider(api_key="other-key", max_connections=16)
+
+        client = provider.client
+        assert client._client._transport._pool._max_connections == 16
+        assert same.client is client and other.client is not client
+
+        await ClaudeProvider.close_shared_clients()
+        assert client.is_closed() and provider.client is not client
+        await ClaudeProvider.close_shared_clients()
+
+    async def test_bounded_concurrency(self, make_provider):
+        """Test no more than max_concurrency requests are in flight at once."""
+        in_flight = []
+        peak = []
+
+        class SlowMessages(FakeMessages):
+            async def respond(self, request):
+                in_flight.append(request)
+                peak.append(len(in_flight))
+                await asyncio.sleep(0.01)
+                in_flight.pop()
+                return message("[]")
+
+        provider = make_provider(None, max_concurrency=2)
+        provider.client = SimpleNamespace(messages=SlowMessages(None))
+        chunks = [CodeChunk(f"x = {i}", "a.py", i, i, "python") for i in range(6)]
+
+        await asyncio.gather(*(provider.review_code(chunk, [ReviewType.CORRECTNESS]) for chunk in chunks))
+
+        assert max(peak) == 2
+
+    async def test_rate_limit_waits_for_retry_after(self, make_provider, monkeypatch):
+        """Test each 429 waits out the Retry-After header, without extra backoff, before retrying."""
+        def handler(request):
+            response = SimpleNamespace(status_code=429, headers={"retry-after": "3"}, request=None)
+            raise RateLimitError("rate limited", response=response, body=None)
+
+        waits = []
+
+        async def fake_sleep(seconds):
+            waits.append(seconds)
+
+        provider = make_provider(handler)
+        monkeypatch.setattr(claude.asyncio, "sleep", fake_sleep)
+
+        with pytest.raises(RateLimitError):
+            await provider._create_message("static", "dynamic")
+
+        assert len(provider.client.messages.requests) == 3
+        assert waits == [3.0, 0.0, 3.0, 0.0, 3.0]
+
+    def test_estimate_tokens_uses_encoder(self, make_provider, monkeypatch):
+        """Test token estimates come from the shared encoder, memoized only for prompt prefixes."""
+        from reviewr.utils import tokens
+
+        encoded = []
+
+        class FakeEncoder:
+            def encode(self, text, disallowed_special=()):
+                encoded.append(text)
+                return list(text)
+
+        monkeypatch.setattr(tokens, "_token_encoder", lambda: FakeEncoder())
+        tokens.count_prefix_tokens.cache_clear()
+        provider = make_provider(lambda request: message("[]"))
+
+        try:
+            assert provider.estimate_tokens("a(b);") == 5
+            assert provider.estimate_tokens("a(b);") == 5
+            assert tokens.count_prefix_tokens("prefix") == 6
+            assert tokens.count_prefix_tokens("prefix") == 6
+            assert encoded == ["a(b);", "a(b);", "prefix"]
+        finally:
+            tokens.count_prefix_tokens.cache_clear()
+
+    def test_tokenizer_loaded_once_per_process(self, make_provider, monkeypatch):
+        """Test providers share one tokenizer instead of loading it per chunk."""
+        from reviewr.utils import tokens
+
+        loads = []
+
+        class FakeTiktoken:
+            @staticmethod
+            def get_encoding(name):
+                loads.append(name)
+                return SimpleNamespace(encode=lambda text, disallowed_special=(): text.split())
+
+        monkeypatch.setattr(tokens, "tiktoken", FakeTiktoken)
+        tokens._token_encoder.cache_clear()
+        providers = [make_provider(lambda request: message("[]")) for _ in range(2)]
+
+        try:
+            for i, provider in enumerate(providers * 3):
+                assert provider.estimate_tokens(f"chunk {i}") == 2
+            assert loads == ["cl100k_base"]
+        finally:
+            tokens._token_encoder.cache_clear()
+
+    def test_security_prefix_built_once(self, make_provider, chunk):
+        """Test the security context prefix is reused rather than rebuilt per chunk."""
+        provider = make_provider(lambda request: message("[]"))
+        other = CodeChunk("os.system(cmd)", "other.py", 3, 3, "python")
+
+        first, _ = provider._build_claude_prompt(chunk, [ReviewType.SECURITY])
+        second, _ = provider._build_claude_prompt(other, [ReviewType.SECURITY])
+
+        assert first is second
+        assert first.startswith("<security_audit_protocol>")
+
+    def test_review_prompt_filled_from_templates(self, make_provider, chunk):
+        """Test the review prefix is built once per review types and the code block is filled per chunk."""
+        provider = make_provider(lambda request: message("[]"))
+        other = CodeChunk("y = {1}", "other.py", 7, 7, "python", context="def f():")
+        review_types = [ReviewType.PERFORMANCE, ReviewType.CORRECTNESS]
+
+        first, _ = provider._build_claude_prompt(chunk, review_types)
+        second, code = provider._build_claude_prompt(other, review_types)
+
+        assert first is second
+        assert "for performance, correctness issues" in first
+        assert code == (
+            "<code_context>\nFile: other.py\nLines: 7-7\nLanguage: python\n</code_context>\n\n"
+            "<code>\ny = {1}\n</code>\n"
+            "\n<surrounding_context>\ndef f():\n</surrounding_context>\n"
+        )
+
+    @pytest.mark.parametrize("stream", [True, False])
+    async def test_streaming_is_configurable(self, make_provider, chunk, stream):
+        """Test responses are streamed by default and requested whole otherwise."""
+        provider = make_provider(lambda request: message(json.dumps(FINDINGS)), stream=stream)
+
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+
+        assert len(findings) == 1
+        assert provider.client.messages.streamed == (1 if stream else 0)
+
+    async def test_truncated_response_keeps_complete_findings(self, make_provider, chunk, tmp_path):
+        """Test findings completed before max_tokens cut a response off are kept, but not cached."""
+        second = {**FINDINGS[0], "message": 'Unsafe "eval" of {input}', "line_start": 2}
+        truncated = json.dumps([FINDINGS[0], second])[:-1] + ', {"type": "security", "sev'
+        cache = LLMResponseCache(cache_dir=tmp_path / "llm")
+        provider = make_provider(lambda request: message(truncated, stop_reason="max_tokens"), response_cache=cache)
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+        await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert [finding.message for finding in findings] == ["SQL injection", 'Unsafe "eval" of {input}']
+        assert len(provider.client.messages.requests) == 2
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    @pytest.mark.parametrize("fence", ["{}", "```json\n{}\n```", "```\n{}```", "  {}  "])
+    def test_parse_response_strips_fence(self, make_provider, chunk, monkeypatch, use_orjson, fence):
+        """Test fenced and bare responses parse the same, with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(claude, "orjson", None)
+        provider = make_provider(lambda request: message("[]"))
+
+        findings = provider._parse_response(fence.format(json.dumps(FINDINGS)), chunk)
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+
+    def test_parse_response_salvages_wrapped_array(self, make_provider, chunk, monkeypatch):
+        """Test an array wrapped in prose is recovered, and json-repair is used when installed."""
+        provider = make_provider(lambda request: message("[]"))
+        wrapped = f"Found [1] issue:\n{json.dumps(FINDINGS)}\nLet me know if you need more."
+
+        assert [finding.message for finding in provider._parse_response(wrapped, chunk)] == ["SQL injection"]
+
+        repaired = []
+        monkeypatch.setattr(json_salvage, "repair_json", lambda text, return_objects: repaired.append(text) or FINDINGS)
+        findings = provider._parse_response("[{'type': 'security', 'message': 'SQL injection',}]", chunk)
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        assert len(repaired) == 1
+
+    def test_parse_errors_are_logged(self, make_provider, chunk, caplog, capsys):
+        """Test unparseable responses are reported through logging, not stdout."""
+        provider = make_provider(lambda request: message("[]"))
+
+        with caplog.at_level("ERROR", logger="reviewr.providers.claude"):
+            assert provider._parse_response("no findings here", chunk) == []
+
+        assert "Error parsing JSON response" in caplog.text
+        assert capsys.readouterr().out == ""
+
+    async def test_permanent_errors_are_not_retried(self, make_provider, chunk):
+        """Test a bad request fails on the first attempt."""
+        def handler(request):
+            response = SimpleNamespace(status_code=400, headers={}, request=None)
+            raise BadRequestError("invalid request", response=response, body=None)
+
+        provider = make_provider(handler)
+
+        with pytest.raises(BadRequestError):
+            await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+
+        assert len(provider.client.messages.requests) == 1
+
+    async def test_rate_limited_request_is_retried(self, make_provider, chunk):
+        """Test a 429 is retried once its Retry-After has passed."""
+        def handler(request):
+            if len(provider.client.messages.requests) == 1:
+                response = SimpleNamespace(status_code=429, headers={"retry-after": "0"}, request=None)
+                raise RateLimitError("rate limited", response=response, body=None)
+            return message(json.dumps(FINDINGS))
+
+        provider = make_provider(handler)
+
+        build_prompt = provider._build_claude_prompt
+        builds = []
+        provider._build_claude_prompt = lambda *args: builds.append(args) or build_prompt(*args)
+
+        findings = await provider.review_code(chunk, [ReviewType.CORRECTNESS])
+
+        assert len(findings) == 1
+        assert len(provider.client.messages.requests) == 2
+        # Only the API call is retried, not the prompt construction
+        assert len(builds) == 1
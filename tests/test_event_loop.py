@@ -0,0 +1,21 @@
+"""
+Tests for event loop selection.
+"""
+
+from reviewr.utils import event_loop
+
+
+async def answer():
+    return 42
+
+
+def test_run_async():
+    """Test coroutines run to completion on the preferred loop."""
+    assert event_loop.run_async(answer()) == 42
+
+
+def test_run_async_without_uvloop(monkeypatch):
+    """Test coroutines run on the default loop when uvloop is unavailable."""
+    monkeypatch.setattr(event_loop, "uvloop", None)
+
+    assert event_loop.run_async(answer()) == 42
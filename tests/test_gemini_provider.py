@@ -0,0 +1,218 @@
+"""
+Tests for the Gemini provider.
+"""
+
+import asyncio
+import json
+import threading
+import time
+from types import SimpleNamespace
+
+import pytest
+from google.api_core import exceptions as google_exceptions
+
+from reviewr.providers import gemini
+from reviewr.providers.gemini import GeminiProvider
+from reviewr.providers.base import CodeChunk, ReviewType
+from reviewr.utils.cache import LLMResponseCache
+
+
+FINDINGS = [
+    {
+        "type": "security",
+        "severity": "high",
+        "line_start": 1,
+        "line_end": 1,
+        "message": "SQL injection",
+        "suggestion": "Use parameters",
+        "confidence": 0.95,
+    }
+]
+
+
+class FakeModel:
+    """Stand-in for the SDK's generative model, recording each prompt and config."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.prompts = []
+        self.configs = []
+
+    def generate_content(self, prompt, generation_config=None):
+        self.prompts.append(prompt)
+        self.configs.append(generation_config)
+        return SimpleNamespace(text=self.handler(prompt))
+
+
+@pytest.fixture
+def chunk():
+    return CodeChunk(
+        content='cursor.execute("SELECT * FROM t WHERE id=" + user_id)',
+        file_path="app.py",
+        start_line=1,
+        end_line=1,
+        language="python",
+    )
+
+
+@pytest.fixture
+def make_provider(monkeypatch):
+    """Create providers whose requests are answered by a handler, without retry delays."""
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+
+    def make(handler, **kwargs):
+        provider = GeminiProvider(api_key="test-key", **kwargs)
+        provider.model_instance = FakeModel(handler)
+        return provider
+    return make
+
+
+class TestGeminiProvider:
+    """Test GeminiProvider request handling."""
+
+    async def test_review_code_parses_findings(self, make_provider, chunk):
+        """Test a response is parsed into findings."""
+        provider = make_provider(lambda prompt: json.dumps(FINDINGS))
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        assert provider.get_stats()["request_count"] == 1
+
+    @pytest.mark.parametrize("model,structured", [("gemini-1.5-flash", True), ("gemini-pro", False)])
+    async def test_structured_output(self, make_provider, chunk, model, structured):
+        """Test models that support it are asked for JSON matching the findings schema."""
+        provider = make_provider(lambda prompt: json.dumps(FINDINGS), model=model)
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        config = provider.model_instance.configs[0]
+        assert (config.response_mime_type == "application/json") is structured
+        assert (config.response_schema is gemini._FINDINGS_SCHEMA) is structured
+        assert len(findings) == 1
+
+    async def test_response_cache(self, make_provider, chunk, tmp_path):
+        """Test deterministic responses are reused, and others are always requested."""
+        cache = LLMResponseCache(cache_dir=tmp_path)
+        provider = make_provider(lambda prompt: json.dumps(FINDINGS), response_cache=cache)
+        creative = make_provider(lambda prompt: "[]", temperature=0.7, response_cache=cache)
+
+        for reviewer in (provider, provider, creative):
+            await reviewer.review_code(chunk, [ReviewType.SECURITY])
+
+        assert len(provider.model_instance.prompts) == 1
+        assert len(creative.model_instance.prompts) == 1
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_parse_response(self, make_provider, chunk, monkeypatch, use_orjson):
+        """Test responses parse the same with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(gemini, "orjson", None)
+        provider = make_provider(lambda prompt: "[]")
+
+        findings = provider._parse_response(json.dumps(FINDINGS), chunk)
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        assert provider._parse_response("not json", chunk) == []
+
+    def test_parse_errors_are_logged(self, make_provider, chunk, caplog, capsys):
+        """Test unusable responses are reported through the module logger, not stdout."""
+        provider = make_provider(lambda prompt: "[]")
+
+        with caplog.at_level("WARNING", logger="reviewr.providers.gemini"):
+            assert provider._parse_response("not json", chunk) == []
+            assert provider._parse_response('{"findings": 1}', chunk) == []
+
+        assert [record.levelname for record in caplog.records] == ["ERROR", "WARNING"]
+        assert capsys.readouterr().out == ""
+
+    def test_parse_response_salvages_wrapped_array(self, make_provider, chunk):
+        """Test an array wrapped in prose or cut off is recovered instead of discarded."""
+        provider = make_provider(lambda prompt: "[]")
+        wrapped = f"Here is the review:\n{json.dumps(FINDINGS)}\nThanks."
+        truncated = json.dumps(FINDINGS)[:-1] + ', {"type": "secu'
+
+        for content in (wrapped, truncated):
+            assert [finding.message for finding in provider._parse_response(content, chunk)] == ["SQL injection"]
+
+    async def test_review_code_batch_attributes_findings(self, make_provider, chunk):
+        """Test a batch is one request whose findings are split by chunk_id."""
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+        provider = make_provider(lambda prompt: json.dumps([{**FINDINGS[0], "chunk_id": 0}]))
+
+        results = await provider.review_code_batch([chunk, other], [ReviewType.PERFORMANCE])
+
+        assert len(provider.model_instance.prompts) == 1
+        assert [finding.file_path for finding in results[0]] == ["app.py"]
+        assert results[1] == []
+
+    async def test_transient_errors_are_retried(self, make_provider, chunk):
+        """Test rate limits are retried."""
+        def handler(prompt):
+            if len(provider.model_instance.prompts) == 1:
+                raise google_exceptions.ResourceExhausted("quota exceeded")
+            return json.dumps(FINDINGS)
+
+        provider = make_provider(handler)
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert len(findings) == 1
+        assert len(provider.model_instance.prompts) == 2
+
+    @pytest.mark.parametrize("error", [google_exceptions.InvalidArgument, KeyError])
+    async def test_other_errors_are_not_retried(self, make_provider, chunk, error):
+        """Test invalid requests and bugs fail on the first attempt."""
+        def handler(prompt):
+            raise error("failed")
+
+        provider = make_provider(handler)
+
+        with pytest.raises(error):
+            await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert len(provider.model_instance.prompts) == 1
+
+    async def test_bounded_concurrency(self, make_provider):
+        """Test no more than max_concurrency requests are in flight at once."""
+        lock = threading.Lock()
+        in_flight = []
+        peak = []
+
+        def handler(prompt):
+            with lock:
+                in_flight.append(prompt)
+                peak.append(len(in_flight))
+            time.sleep(0.01)
+            with lock:
+                in_flight.pop()
+            return "[]"
+
+        provider = make_provider(handler, max_concurrency=2)
+        chunks = [CodeChunk(f"x = {i}", "a.py", i, i, "python") for i in range(6)]
+
+        await asyncio.gather(*(provider.review_code(chunk, [ReviewType.CORRECTNESS]) for chunk in chunks))
+
+        assert max(peak) == 2
+
+    async def test_requests_do_not_block_event_loop(self, make_provider, chunk):
+        """Test the blocking SDK call runs off the event loop, so reviews overlap."""
+        barrier = threading.Barrier(2, timeout=5)
+
+        def handler(prompt):
+            # Raises BrokenBarrierError unless both requests are in flight at once
+            barrier.wait()
+            return "[]"
+
+        provider = make_provider(handler)
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+
+        results = await asyncio.gather(
+            provider.review_code(chunk, [ReviewType.SECURITY]),
+            provider.review_code(other, [ReviewType.SECURITY]),
+        )
+
+        assert results == [[], []]
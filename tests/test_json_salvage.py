@@ -0,0 +1,45 @@
+"""
+Tests for recovering JSON arrays from malformed LLM responses.
+"""
+
+import json
+
+import pytest
+
+from reviewr.utils import json_salvage
+from reviewr.utils.json_salvage import salvage_json_array
+
+
+ITEMS = [{"type": "security", "message": 'Unsafe "eval" of {input} [x]'}, {"type": "performance"}]
+
+
+class TestSalvageJsonArray:
+    """Test salvage_json_array."""
+
+    @pytest.mark.parametrize("content", [
+        f"Found [2] issues:\n{json.dumps(ITEMS)}\nLet me know if you need more.",
+        json.dumps(ITEMS) + "\n\nNote: see [1].",
+        json.dumps(ITEMS)[:-1] + ', {"type": "correctness", "mess',
+    ])
+    def test_recovers_items(self, content):
+        """Test arrays wrapped in prose (with brackets of its own) or truncated are recovered."""
+        assert salvage_json_array(content) == ITEMS
+
+    @pytest.mark.parametrize("content", ["no findings here", "[1, 2]", ""])
+    def test_nothing_to_recover(self, content, monkeypatch):
+        """Test text without an array of objects gives an empty list."""
+        monkeypatch.setattr(json_salvage, "repair_json", None)
+
+        assert salvage_json_array(content) == []
+
+    def test_json_repair_is_last_resort(self, monkeypatch):
+        """Test json-repair only runs when nothing else recovers items."""
+        repaired = []
+        monkeypatch.setattr(
+            json_salvage, "repair_json", lambda text, return_objects: repaired.append(text) or ITEMS
+        )
+
+        assert salvage_json_array(json.dumps(ITEMS) + " trailing") == ITEMS
+        assert repaired == []
+        assert salvage_json_array("[{'type': 'security',}]") == ITEMS
+        assert len(repaired) == 1
@@ -0,0 +1,359 @@
+"""
+Tests for the OpenAI provider.
+"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+import httpx
+import pytest
+from openai import APIConnectionError, BadRequestError, InternalServerError
+
+from reviewr.providers import openai
+from reviewr.providers.openai import OpenAIProvider
+from reviewr.providers.base import CodeChunk, ReviewType
+from reviewr.utils.cache import LLMResponseCache
+from reviewr.utils.event_loop import run_async
+
+
+FINDINGS = [
+    {
+        "type": "security",
+        "severity": "high",
+        "line_start": 1,
+        "line_end": 1,
+        "message": "SQL injection",
+        "suggestion": "Use parameters",
+        "confidence": 0.95,
+    }
+]
+
+
+def completion(text, prompt_tokens=100, completion_tokens=20, finish_reason="stop"):
+    """Build a chat completion response."""
+    return SimpleNamespace(
+        choices=[SimpleNamespace(message=SimpleNamespace(content=text), finish_reason=finish_reason)],
+        usage=SimpleNamespace(prompt_tokens=prompt_tokens, completion_tokens=completion_tokens),
+    )
+
+
+async def completion_stream(response, size=7):
+    """Stream a chat completion as the SDK does, in small deltas then a usage chunk."""
+    choice = response.choices[0]
+    text = choice.message.content
+    for start in range(0, len(text), size):
+        end = start + size
+        yield SimpleNamespace(
+            choices=[SimpleNamespace(
+                delta=SimpleNamespace(content=text[start:end]),
+                finish_reason=choice.finish_reason if end >= len(text) else None,
+            )],
+            usage=None,
+        )
+    yield SimpleNamespace(choices=[], usage=response.usage)
+
+
+def status_error(error_class, status_code):
+    """Build an API status error as raised by the SDK."""
+    response = httpx.Response(status_code, request=httpx.Request("POST", "https://api.openai.com"))
+    return error_class("request failed", response=response, body=None)
+
+
+class FakeCompletions:
+    """Stand-in for the SDK's chat completions resource, recording each request."""
+
+    def __init__(self, handler):
+        self.handler = handler
+        self.requests = []
+
+    async def create(self, **kwargs):
+        self.requests.append(kwargs)
+        response = self.handler(kwargs)
+        return completion_stream(response) if kwargs.get("stream") else response
+
+
+class SlowCompletions(FakeCompletions):
+    """Completions that take a moment to answer, recording the peak number in flight."""
+
+    def __init__(self):
+        super().__init__(lambda request: completion("[]"))
+        self.in_flight = 0
+        self.peak = 0
+
+    async def create(self, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        # asyncio.sleep is patched out; wait on the loop's timer instead
+        loop = asyncio.get_running_loop()
+        delay = loop.create_future()
+        loop.call_later(0.01, delay.set_result, None)
+        await delay
+        self.in_flight -= 1
+        return await super().create(**kwargs)
+
+
+@pytest.fixture
+def chunk():
+    return CodeChunk(
+        content='cursor.execute("SELECT * FROM t WHERE id=" + user_id)',
+        file_path="app.py",
+        start_line=1,
+        end_line=1,
+        language="python",
+    )
+
+
+@pytest.fixture
+def make_provider(monkeypatch):
+    """Create providers whose API requests are answered by a handler, without retry delays."""
+    async def no_sleep(seconds):
+        pass
+
+    monkeypatch.setattr(asyncio, "sleep", no_sleep)
+
+    def make(handler, **kwargs):
+        provider = OpenAIProvider(api_key="test-key", **kwargs)
+        provider.client = SimpleNamespace(chat=SimpleNamespace(completions=FakeCompletions(handler)))
+        return provider
+    return make
+
+
+class TestOpenAIProvider:
+    """Test OpenAIProvider request handling."""
+
+    async def test_review_code_parses_findings(self, make_provider, chunk):
+        """Test a response is parsed into findings and its usage tracked."""
+        provider = make_provider(lambda request: completion(json.dumps({"findings": FINDINGS})))
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        assert provider.get_stats()["total_input_tokens"] == 100
+
+    @pytest.mark.parametrize("stream", [True, False])
+    async def test_streamed_and_whole_responses_match(self, make_provider, chunk, stream):
+        """Test a streamed completion is assembled into the same text and usage."""
+        provider = make_provider(lambda request: completion(json.dumps(FINDINGS), 80, 30), stream=stream)
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        request = provider.client.chat.completions.requests[0]
+        assert request.get("stream", False) is stream
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        stats = provider.get_stats()
+        assert (stats["total_input_tokens"], stats["total_output_tokens"]) == (80, 30)
+
+    async def test_truncated_response_is_not_cached(self, make_provider, chunk, tmp_path):
+        """Test a response cut off at max_tokens keeps its findings but isn't reused."""
+        truncated = json.dumps(FINDINGS)[:-1] + ', {"type": "secu'
+        provider = make_provider(
+            lambda request: completion(truncated, finish_reason="length"),
+            response_cache=LLMResponseCache(cache_dir=tmp_path),
+        )
+
+        for _ in range(2):
+            findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        assert len(provider.client.chat.completions.requests) == 2
+
+    async def test_prompts_share_a_prefix_across_chunks(self, make_provider, chunk):
+        """Test the instructions come before the code, so chunks share a cacheable prefix."""
+        provider = make_provider(lambda request: completion("[]"))
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "javascript", context="const data = input;")
+
+        for reviewed in (chunk, other):
+            await provider.review_code(reviewed, [ReviewType.CORRECTNESS, ReviewType.PERFORMANCE])
+
+        first, second = (request["messages"][1]["content"] for request in provider.client.chat.completions.requests)
+        shared = first.index("FILE: ")
+        assert first[:shared] == second[:shared]
+        assert first.index("RESPONSE FORMAT") < shared
+        assert chunk.content in first[shared:] and "const data = input;" in second[shared:]
+
+    async def test_response_cache_skips_repeat_requests(self, make_provider, chunk, tmp_path):
+        """Test an unchanged prompt is answered from the response cache, across providers."""
+        cache = LLMResponseCache(cache_dir=tmp_path)
+        first = make_provider(lambda request: completion(json.dumps(FINDINGS)), response_cache=cache)
+        second = make_provider(lambda request: completion("[]"), response_cache=cache)
+
+        await first.review_code(chunk, [ReviewType.SECURITY])
+        findings = await second.review_code(chunk, [ReviewType.SECURITY])
+
+        assert [finding.message for finding in findings] == ["SQL injection"]
+        assert second.client.chat.completions.requests == []
+        assert second.get_stats()["response_cache"]["hits"] == 1
+
+    async def test_review_code_batch_attributes_findings(self, make_provider, chunk):
+        """Test a batch is one request whose findings are split by chunk_id."""
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+        provider = make_provider(
+            lambda request: completion(json.dumps({"findings": [{**FINDINGS[0], "chunk_id": 1}]}))
+        )
+
+        results = await provider.review_code_batch([chunk, other], [ReviewType.CORRECTNESS])
+
+        assert len(provider.client.chat.completions.requests) == 1
+        prompt = provider.client.chat.completions.requests[0]["messages"][1]["content"]
+        assert prompt.count("REVIEW CRITERIA:") == 1
+        assert '<chunk id="0">' in prompt and '<chunk id="1">' in prompt
+        assert results[0] == []
+        assert [finding.file_path for finding in results[1]] == ["other.py"]
+
+    async def test_review_code_batch_falls_back_per_chunk(self, make_provider, chunk):
+        """Test findings without a chunk_id are re-reviewed chunk by chunk."""
+        other = CodeChunk("eval(data)", "other.py", 5, 5, "python")
+        provider = make_provider(lambda request: completion(json.dumps(FINDINGS)))
+
+        results = await provider.review_code_batch([chunk, other], [ReviewType.CORRECTNESS])
+
+        assert len(provider.client.chat.completions.requests) == 3
+        assert [[finding.file_path for finding in findings] for findings in results] == [["app.py"], ["other.py"]]
+
+    async def test_failed_batch_keeps_other_batches(self, make_provider):
+        """Test a batch whose request fails is reviewed chunk by chunk, without losing other batches."""
+        def handler(request):
+            if "broken.py" in json.dumps(request):
+                raise status_error(BadRequestError, 400)
+            return completion(json.dumps({"findings": [{**FINDINGS[0], "chunk_id": 0}]}))
+
+        provider = make_provider(handler)
+        chunks = [CodeChunk(f"x = {i}", name, i, i, "python")
+                  for i, name in enumerate(["a.py", "b.py", "c.py", "broken.py"])]
+
+        results = await provider.review_code_batch(chunks, [ReviewType.CORRECTNESS], batch_size=2)
+
+        assert [[finding.file_path for finding in findings] for findings in results] == [["a.py"], [], ["c.py"], []]
+        assert len(provider.client.chat.completions.requests) == 4
+
+    @pytest.mark.parametrize("model,format_type", [
+        ("gpt-4o-mini", "json_schema"),
+        ("gpt-4-turbo", "json_object"),
+        ("gpt-4", None),
+    ])
+    async def test_response_format(self, make_provider, chunk, model, format_type):
+        """Test models that support it are constrained to the findings schema."""
+        structured = {**FINDINGS[0], "chunk_id": None}
+        provider = make_provider(
+            lambda request: completion(json.dumps({"findings": [structured]})), model=model
+        )
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        response_format = provider.client.chat.completions.requests[0]["response_format"]
+        assert (response_format or {}).get("type") == format_type
+        if format_type == "json_schema":
+            schema = response_format["json_schema"]["schema"]["properties"]["findings"]["items"]
+            assert response_format["json_schema"]["strict"] is True
+            assert sorted(schema["required"]) == sorted(schema["properties"])
+        assert [finding.message for finding in findings] == ["SQL injection"]
+
+    def test_batches_use_half_the_context_window(self, make_provider):
+        """Test batches hold at most batch_size chunks and half the context window."""
+        provider = make_provider(lambda request: completion("[]"), model="gpt-4")
+        small = [CodeChunk("x = 1\n", "a.py", i, i, "python") for i in range(5)]
+        large = [CodeChunk("x" * 12000, "b.py", 1, 1, "python") for _ in range(2)]
+
+        batches = provider._pack_batches(small + large, [ReviewType.CORRECTNESS], batch_size=3)
+
+        assert [len(batch) for batch in batches] == [3, 3, 1]
+
+    async def test_bounded_concurrency(self, make_provider):
+        """Test no more than max_concurrency requests are in flight at once."""
+        provider = make_provider(None, max_concurrency=2, stream=False)
+        provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+        chunks = [CodeChunk(f"x = {i}", "a.py", i, i, "python") for i in range(6)]
+
+        await asyncio.gather(*(provider.review_code(chunk, [ReviewType.CORRECTNESS]) for chunk in chunks))
+
+        assert provider.client.chat.completions.peak == 2
+
+    def test_bounded_concurrency_across_event_loops(self, make_provider):
+        """Test a provider reused by several run_async() calls bounds requests in each loop."""
+        provider = make_provider(None, max_concurrency=1, stream=False)
+        provider.client = SimpleNamespace(chat=SimpleNamespace(completions=SlowCompletions()))
+        chunks = [CodeChunk(f"x = {i}", "a.py", i, i, "python") for i in range(3)]
+
+        async def review_all():
+            return await asyncio.gather(*(provider.review_code(chunk, [ReviewType.CORRECTNESS]) for chunk in chunks))
+
+        for _ in range(2):
+            assert run_async(review_all()) == [[], [], []]
+        assert provider.client.chat.completions.peak == 1
+
+    async def test_pooled_client(self):
+        """Test instances with the same settings share one sized keep-alive pool per event loop."""
+        provider = OpenAIProvider(api_key="test-key", max_connections=16)
+        same = OpenAIProvider(api_key="test-key", model="gpt-4o", max_connections=16)
+        other = OpenAIProvider(api_key="test-key", timeout=5, max_connections=16)
+
+        client = provider.client
+        assert client._client._transport._pool._max_connections == 16
+        assert same.client is client and other.client is not client
+
+        await OpenAIProvider.close_shared_clients()
+        assert client.is_closed() and provider.client is not client
+        await OpenAIProvider.close_shared_clients()
+
+    @pytest.mark.parametrize("use_orjson", [True, False])
+    def test_parse_response(self, make_provider, chunk, monkeypatch, use_orjson):
+        """Test wrapped, bare and fenced finding arrays parse the same, with and without orjson."""
+        if not use_orjson:
+            monkeypatch.setattr(openai, "orjson", None)
+        provider = make_provider(lambda request: completion("[]"))
+        bare = json.dumps(FINDINGS)
+
+        for content in (json.dumps({"findings": FINDINGS}), bare, f"```json\n{bare}\n```", f"```{bare}```"):
+            assert [finding.message for finding in provider._parse_response(content, chunk)] == ["SQL injection"]
+        assert provider._parse_response("not json", chunk) == []
+
+    @pytest.mark.parametrize("error", [
+        lambda: status_error(InternalServerError, 503),
+        lambda: APIConnectionError(request=httpx.Request("POST", "https://api.openai.com")),
+    ])
+    async def test_transient_errors_are_retried(self, make_provider, chunk, error):
+        """Test server errors and connection failures are retried."""
+        def handler(request):
+            if len(provider.client.chat.completions.requests) == 1:
+                raise error()
+            return completion(json.dumps(FINDINGS))
+
+        provider = make_provider(handler)
+
+        findings = await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert len(findings) == 1
+        assert len(provider.client.chat.completions.requests) == 2
+
+    @pytest.mark.parametrize("error", [
+        lambda: status_error(BadRequestError, 400),
+        lambda: asyncio.CancelledError(),
+        lambda: KeyError("bug"),
+    ])
+    async def test_other_errors_are_not_retried(self, make_provider, chunk, error):
+        """Test bad requests, cancellation and bugs fail on the first attempt."""
+        def handler(request):
+            raise error()
+
+        provider = make_provider(handler)
+
+        with pytest.raises((BadRequestError, asyncio.CancelledError, KeyError)):
+            await provider.review_code(chunk, [ReviewType.SECURITY])
+
+        assert len(provider.client.chat.completions.requests) == 1
+
+    @pytest.mark.parametrize("encoder", [None, "fake"])
+    def test_estimate_tokens(self, make_provider, monkeypatch, encoder):
+        """Test token counts use the shared encoder when available and ~4 chars per token otherwise."""
+        from reviewr.utils import tokens
+
+        class FakeEncoder:
+            def encode(self, text, disallowed_special=()):
+                return text.split()
+
+        monkeypatch.setattr(tokens, "_token_encoder", lambda: FakeEncoder() if encoder else None)
+        provider = make_provider(lambda request: completion("[]"))
+
+        assert provider.estimate_tokens("one two three four") == 4
+        assert provider.estimate_tokens("x" * 40) == (1 if encoder else 10)
@@ -2,7 +2,9 @@
 Comprehensive tests for Enterprise Policy Enforcement Engine.
 """
 
+import sys
 import pytest
+from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass
 
@@ -20,6 +22,9 @@ from reviewr.policy import (
     FilePatternRule,
     ComplexityRule,
     SecurityRule,
+    CoverageRule,
+    CustomRule,
+    FindingIndex,
     RuleViolation
 )
 
@@ -128,6 +133,105 @@ class TestPolicyEngine:
         assert result.passed is False
         assert len(result.violations) > 0
         assert result.should_block is True
+        assert result.critical_violations == result.violations
+        assert result.high_violations == []
+        assert result.to_dict()['should_block'] is True
+    
+    def test_evaluate_fail_fast(self):
+        """Test fail_fast stops after the first blocking policy."""
+        engine = PolicyEngine()
+        engine.register_rule(SeverityRule(rule_id="severity-rule", max_critical=0))
+        
+        for policy_id, priority in (("first", 200), ("second", 100)):
+            config = PolicyConfig(
+                name=policy_id,
+                description="Test",
+                scope=[PolicyScope.PRE_COMMIT],
+                action=PolicyAction.BLOCK,
+                priority=priority
+            )
+            engine.register_policy(Policy(id=policy_id, config=config, rules=["severity-rule"]))
+        
+        context = {'findings': [MockFinding("test.py", 10, "critical", "security", "Issue")]}
+        
+        result = engine.evaluate(context, PolicyScope.PRE_COMMIT)
+        assert len(result.violations) == 2
+        
+        result = engine.evaluate(context, PolicyScope.PRE_COMMIT, fail_fast=True)
+        assert result.passed is False
+        assert [v.policy_id for v in result.violations] == ["first"]
+    
+    def test_fail_fast_skips_remaining_rules(self):
+        """Test fail_fast skips expensive rules once a policy must block."""
+        engine = PolicyEngine()
+        calls = []
+        engine.register_rule(CustomRule(
+            rule_id="custom-rule",
+            name="Custom",
+            description="Records calls",
+            evaluator=lambda context, rule: calls.append(rule.rule_id) or []
+        ))
+        engine.register_rule(SeverityRule(rule_id="severity-rule", max_critical=0))
+        
+        config = PolicyConfig(
+            name="Test Policy",
+            description="Test",
+            scope=[PolicyScope.PRE_COMMIT],
+            action=PolicyAction.BLOCK
+        )
+        engine.register_policy(
+            Policy(id="test-policy", config=config, rules=["custom-rule", "severity-rule"])
+        )
+        
+        context = {'findings': [MockFinding("test.py", 10, "critical", "security", "Issue")]}
+        
+        engine.evaluate(context, PolicyScope.PRE_COMMIT)
+        assert calls == ["custom-rule"]
+        
+        result = engine.evaluate(context, PolicyScope.PRE_COMMIT, fail_fast=True)
+        assert calls == ["custom-rule"]
+        assert result.should_block is True
+    
+    def test_evaluate_all_preserves_rule_order(self):
+        """Test rule evaluation returns violations in rule order."""
+        engine = PolicyEngine()
+        rules = [
+            SeverityRule(rule_id="severity-rule", max_critical=0),
+            SecurityRule(rule_id="security-rule", max_issues=0),
+            ComplexityRule(rule_id="complexity-rule", max_complexity=10),
+        ]
+        context = {'findings': [
+            MockFinding("test.py", 10, "critical", "security", "Issue"),
+            MockFinding("test.py", 20, "low", "complexity", "Complex", metric_value=25),
+        ]}
+        
+        violations = engine.evaluate_all(rules, context)
+        
+        assert [v.rule_id for v in violations] == [
+            "severity-rule", "security-rule", "complexity-rule"
+        ]
+    
+    def test_approval_requirements_deduplicated(self):
+        """Test approval teams/roles from overlapping policies are merged."""
+        engine = PolicyEngine()
+        engine.register_rule(SeverityRule(rule_id="severity-rule", max_critical=0))
+        
+        for policy_id, teams in (("a", {"security", "platform"}), ("b", {"security"})):
+            config = PolicyConfig(
+                name=policy_id,
+                description="Test",
+                scope=[PolicyScope.PULL_REQUEST],
+                action=PolicyAction.REQUIRE_APPROVAL,
+                approval=ApprovalRequirement(required_teams=teams, required_roles={"tech-lead"})
+            )
+            engine.register_policy(Policy(id=policy_id, config=config, rules=["severity-rule"]))
+        
+        context = {'findings': [MockFinding("test.py", 10, "critical", "security", "Issue")]}
+        result = engine.evaluate(context, PolicyScope.PULL_REQUEST)
+        
+        assert result.requires_approval is True
+        assert result.approval_teams == ["platform", "security"]
+        assert result.approval_roles == ["tech-lead"]
     
     def test_scope_filtering(self):
         """Test policies are filtered by scope."""
@@ -194,6 +298,71 @@ class TestPolicyEngine:
         
         assert len(result.violations) == 0  # Policy doesn't apply to feature branch
 
+    
+    def test_file_filtering(self):
+        """Test policies are filtered by include/exclude file patterns."""
+        engine = PolicyEngine()
+        
+        for policy_id, include, exclude in (
+            ("auth", ["**/auth/**"], []),
+            ("python", ["*.py"], ["tests/*"]),
+            ("no-docs", [], ["docs/*"]),
+        ):
+            config = PolicyConfig(
+                name=policy_id,
+                description="Test",
+                scope=[PolicyScope.PULL_REQUEST],
+                file_patterns=include,
+                exclude_patterns=exclude
+            )
+            engine.register_policy(Policy(id=policy_id, config=config))
+        
+        def applicable(files):
+            return {p.id for p in engine._get_applicable_policies(PolicyScope.PULL_REQUEST, None, files)}
+        
+        assert applicable(["src/auth/login.py"]) == {"auth", "python", "no-docs"}
+        assert applicable(["tests/test_a.py"]) == {"no-docs"}
+        assert applicable(["docs/index.md"]) == set()
+        assert applicable(["docs/index.md", "app/auth/x.js"]) == {"auth", "no-docs"}
+    
+    @pytest.mark.parametrize("named_groups", [False, True])
+    def test_file_filtering_shared_multi_star_patterns(self, monkeypatch, named_groups):
+        """Test policies sharing multi-'*' patterns, including when globs translate to named groups."""
+        import fnmatch
+        from reviewr.policy import engine as policy_engine
+        from reviewr.policy.schema import ENTERPRISE_POLICIES
+        
+        if named_groups:
+            # fnmatch.translate() before Python 3.11 names groups in multi-'*' patterns
+            translate = fnmatch.translate
+            monkeypatch.setattr(fnmatch, "translate", lambda pat: f"(?P<g0>{translate(pat)})")
+        policy_engine._glob_alternation.cache_clear()
+        
+        try:
+            engine = PolicyEngine()
+            engine.register_policy(Policy(
+                id="security-review-required",
+                config=ENTERPRISE_POLICIES["security-review-required"]
+            ))
+            for policy_id, exclude in (("auth-a", []), ("auth-b", ["**/auth/legacy/**"])):
+                config = PolicyConfig(
+                    name=policy_id,
+                    description="Test",
+                    scope=[PolicyScope.PULL_REQUEST],
+                    file_patterns=["**/auth/**", "**/security/**"],
+                    exclude_patterns=exclude
+                )
+                engine.register_policy(Policy(id=policy_id, config=config))
+            
+            def applicable(files):
+                return {p.id for p in engine._get_applicable_policies(PolicyScope.PULL_REQUEST, None, files)}
+            
+            assert {"security-review-required", "auth-a", "auth-b"} <= applicable(["src/auth/x.py"])
+            matched = applicable(["src/auth/legacy/x.py"])
+            assert "auth-a" in matched and "auth-b" not in matched
+            assert not {"security-review-required", "auth-a", "auth-b"} & applicable(["src/app.py"])
+        finally:
+            policy_engine._glob_alternation.cache_clear()
 
 class TestPolicyRules:
     """Test individual policy rules."""
@@ -212,7 +381,7 @@ class TestPolicyRules:
     
     def test_severity_rule_fail(self):
         """Test severity rule fails with high counts."""
-        rule = SeverityRule(max_critical=0, max_high=0)
+        rule = SeverityRule(max_critical=0, max_high=0, aggregate=False)
         
         findings = [
             MockFinding("test.py", 10, "critical", "security", "SQL injection"),
@@ -223,6 +392,24 @@ class TestPolicyRules:
         violations = rule.evaluate(context)
         assert len(violations) == 2  # One for critical, one for high
     
+    def test_severity_rule_aggregated(self):
+        """Test severity rule reports all exceeded thresholds in one violation."""
+        rule = SeverityRule(max_critical=0, max_high=0)
+        
+        findings = [
+            MockFinding("test.py", 10, "critical", "security", "SQL injection"),
+            MockFinding("test.py", 20, "high", "security", "XSS"),
+            MockFinding("test.py", 30, "high", "security", "CSRF"),
+            MockFinding("test.py", 40, "low", "quality", "Style"),
+        ]
+        
+        violations = rule.evaluate({'findings': findings})
+        
+        assert len(violations) == 1
+        assert violations[0].severity == "critical"
+        assert violations[0].metadata['breakdown'] == {'critical': 1, 'high': 2, 'medium': 0, 'low': 1}
+        assert violations[0].metadata['overages'] == {'critical': 1, 'high': 2}
+    
     def test_file_pattern_rule(self):
         """Test file pattern rule."""
         rule = FilePatternRule(
@@ -241,6 +428,56 @@ class TestPolicyRules:
         violations = rule.evaluate(context)
         assert len(violations) == 1  # Only auth file matches pattern
     
+    def test_file_pattern_rule_matching(self):
+        """Test each kind of glob pattern FilePatternRule supports."""
+        rule = FilePatternRule(
+            rule_id="mixed",
+            name="Mixed Patterns",
+            patterns=["**/auth/**", "*.pem", "Dockerfile", "config/*.y?ml"]
+        )
+        
+        assert rule._matches_pattern("src/auth/login.py")
+        assert rule._matches_pattern("auth/login.py")
+        assert rule._matches_pattern("certs/server.pem")
+        assert rule._matches_pattern("deploy/Dockerfile")
+        assert rule._matches_pattern("config/app.yaml")
+        assert not rule._matches_pattern("src/authentication.py")
+        assert not rule._matches_pattern("src/auth")
+        assert not rule._matches_pattern("certs/server.pem.bak")
+        assert not rule._matches_pattern("config/app.json")
+        
+        # Rules built from the same patterns share the compiled form
+        other = FilePatternRule(
+            rule_id="other",
+            name="Other",
+            patterns=["**/auth/**", "*.pem", "Dockerfile", "config/*.y?ml"]
+        )
+        assert other._combined is rule._combined
+    
+    def test_file_pattern_rule_extensions_only(self):
+        """Test rules made only of extension globs match by suffix."""
+        rule = FilePatternRule(
+            rule_id="ext",
+            name="Extensions",
+            patterns=["*.py", "*.tar.gz"],
+            max_issues=1
+        )
+        
+        assert rule._ext_only
+        assert rule._matches_pattern("src/app.py")
+        assert rule._matches_pattern("dist/pkg.tar.gz")
+        assert not rule._matches_pattern("src/app.pyc")
+        assert not rule._matches_pattern("dist/pkg.gz")
+        
+        findings = [
+            MockFinding("a.py", 1, "low", "quality", "Issue"),
+            MockFinding("b.py", 1, "low", "quality", "Issue"),
+            MockFinding("c.js", 1, "low", "quality", "Issue"),
+        ]
+        violations = rule.evaluate({'findings': findings})
+        assert len(violations) == 1
+        assert violations[0].metadata['count'] == 2
+    
     def test_complexity_rule(self):
         """Test complexity rule."""
         rule = ComplexityRule(max_complexity=10)
@@ -270,6 +507,119 @@ class TestPolicyRules:
         violations = rule.evaluate(context)
         assert len(violations) == 1  # Only security finding counts
 
+    
+    def test_coverage_rule_cached(self):
+        """Test coverage results are memoized per coverage value."""
+        class SmallCacheCoverageRule(CoverageRule):
+            cache_size = 2
+        
+        rule = SmallCacheCoverageRule(min_coverage=0.8)
+        
+        first = rule.evaluate({'test_coverage': 0.5})
+        second = rule.evaluate({'test_coverage': 0.5})
+        
+        assert len(first) == 1
+        assert second == first and second is not first
+        assert second[0] is not first[0]
+        
+        # Callers may modify returned violations without affecting the cache
+        first[0].metadata['coverage'] = 0.0
+        assert rule.evaluate({'test_coverage': 0.5})[0].metadata['coverage'] == 0.5
+        assert rule.evaluate({'test_coverage': 0.9}) == []
+        
+        # Changing the rule's settings does not serve stale results
+        rule.min_coverage = 0.6
+        rule.severity = 'high'
+        third = rule.evaluate({'test_coverage': 0.5})
+        assert third[0].severity == 'high'
+        assert third[0].metadata['threshold'] == 0.6
+        
+        rule.evaluate({'test_coverage': 0.55})
+        assert [key[0] for key in rule._cache] == [0.5, 0.55]
+    
+    def test_approval_requirement_is_hashable(self):
+        """Test approval requirements normalize to frozensets and hash by value."""
+        first = ApprovalRequirement(required_teams={"security"}, required_roles=["lead", "lead"])
+        second = ApprovalRequirement(required_teams=("security",), required_roles={"lead"})
+        
+        assert first.required_teams == frozenset({"security"})
+        assert first.required_roles == frozenset({"lead"})
+        assert first == second and hash(first) == hash(second)
+        assert len({first, second}) == 1
+    
+    def test_rules_use_slots(self):
+        """Test built-in rules and violations carry no per-instance __dict__."""
+        rules = [
+            SeverityRule(),
+            FilePatternRule(rule_id="fp", name="FP", patterns=["*.py"]),
+            ComplexityRule(),
+            SecurityRule(),
+            CoverageRule(),
+            CustomRule("c", "Custom", "Test", lambda context, rule: []),
+        ]
+        for rule in rules:
+            assert not hasattr(rule, '__dict__'), type(rule).__name__
+        
+        if sys.version_info >= (3, 10):
+            assert not hasattr(RuleViolation("r", "R", "low", "msg"), '__dict__')
+    
+    def test_finding_index_shared_across_rules(self, monkeypatch):
+        """Test one finding index is built per evaluation and passed to every rule."""
+        findings = [
+            MockFinding("auth.py", 1, "HIGH", "Security", "Injection"),
+            MockFinding("util.py", 2, "medium", "complexity", "Complex", metric_value=30),
+            MockFinding("util.py", 3, "low", "quality", "Style"),
+        ]
+        context = {'findings': findings}
+        
+        index = FindingIndex.from_context(context)
+        assert index.count_severity('high') == 1
+        assert index.in_category('security') == [findings[0]]
+        assert index.complexity_metrics == [(findings[1], 30)]
+        
+        assert len(SecurityRule(max_issues=0).evaluate(context, index)) == 1
+        assert len(ComplexityRule(max_complexity=15).evaluate(context, index)) == 1
+        assert list(context) == ['findings']
+        
+        built = []
+        from_context = FindingIndex.from_context.__func__
+        monkeypatch.setattr(
+            FindingIndex, 'from_context',
+            classmethod(lambda cls, ctx: built.append(ctx) or from_context(cls, ctx))
+        )
+        
+        engine = PolicyEngine()
+        engine.register_rule(SecurityRule(rule_id="security-rule", max_issues=0))
+        engine.register_rule(ComplexityRule(rule_id="complexity-rule", max_complexity=15))
+        config = PolicyConfig(name="Test", description="Test", scope=[PolicyScope.PRE_COMMIT])
+        for policy_id in ("first", "second"):
+            engine.register_policy(
+                Policy(id=policy_id, config=config, rules=["security-rule", "complexity-rule"])
+            )
+        
+        result = engine.evaluate(context, PolicyScope.PRE_COMMIT)
+        assert len(result.violations) == 2
+        assert len(built) == 1
+    
+    def test_findings_mutated_in_place_between_evaluations(self):
+        """Test rules see in-place changes to the findings list."""
+        findings = [MockFinding("util.py", 1, "low", "quality", "Style")]
+        context = {'findings': findings}
+        rule = SeverityRule(max_critical=0, max_high=0)
+        
+        engine = PolicyEngine()
+        engine.register_rule(SeverityRule(rule_id="severity-rule", max_critical=0, max_high=0))
+        config = PolicyConfig(name="Test", description="Test", scope=[PolicyScope.PRE_COMMIT])
+        engine.register_policy(Policy(id="gate", config=config, rules=["severity-rule"]))
+        
+        assert rule.evaluate(context) == []
+        assert engine.evaluate(context, PolicyScope.PRE_COMMIT).should_block is False
+        
+        # Same list, same length, now holding a critical finding
+        findings[0] = MockFinding("auth.py", 1, "critical", "security", "Injection")
+        
+        assert len(rule.evaluate(context)) == 1
+        assert engine.evaluate(context, PolicyScope.PRE_COMMIT).should_block is True
 
 class TestPolicyManager:
     """Test PolicyManager functionality."""
@@ -318,6 +668,64 @@ class TestPolicyManager:
         
         assert policy.config.max_high_issues == 10
     
+    def test_overrides_do_not_mutate_template(self):
+        """Test overrides leave the shared template config untouched."""
+        manager = PolicyManager()
+        
+        manager.create_policy_from_template(
+            "quality-gate",
+            "custom-gate",
+            overrides={'max_high_issues': 10}
+        )
+        other = manager.create_policy_from_template("quality-gate", "plain-gate")
+        
+        assert other.config.max_high_issues != 10
+    
+    def test_to_dict_coerces_enums(self):
+        """Test to_dict produces plain values and survives a round-trip."""
+        manager = PolicyManager()
+        policy = manager.create_policy_from_template("quality-gate", "gate")
+        
+        data = policy.to_dict()
+        assert all(isinstance(s, str) for s in data['config']['scope'])
+        assert data['config']['action'] == policy.config.action.value
+        assert Policy.from_dict(data) == policy
+        
+        # Modifying a returned dict leaves the cached form untouched
+        data['id'] = 'changed'
+        data['config']['tags'].append('changed')
+        fresh = policy.to_dict()
+        assert fresh is not data
+        assert fresh['id'] == 'gate' and 'changed' not in fresh['config']['tags']
+        assert Policy.from_dict(fresh) == policy
+    
+    def test_from_dict_with_and_without_msgspec(self, monkeypatch):
+        """Test the msgspec fast path and the manual path build equal policies."""
+        from reviewr.policy import schema
+        
+        manager = PolicyManager()
+        data = manager.create_policy_from_template("security-review-required", "sec").to_dict()
+        
+        fast = Policy.from_dict(data)
+        monkeypatch.setattr(schema, 'msgspec', None)
+        slow = Policy.from_dict(data)
+        
+        assert fast == slow
+        assert slow.to_dict() == data
+    
+    def test_from_dict_lenient_cases(self):
+        """Test inputs msgspec would treat differently still load as before."""
+        data = {
+            'id': 'lenient',
+            'config': {'name': 'Lenient', 'description': 'Test', 'approval': {}},
+            'created_at': datetime(2024, 1, 1),
+        }
+        
+        policy = Policy.from_dict(data)
+        
+        assert policy.config.approval is None
+        assert policy.created_at == datetime(2024, 1, 1)
+    
     def test_list_templates(self):
         """Test listing templates."""
         manager = PolicyManager()
@@ -327,6 +735,34 @@ class TestPolicyManager:
         assert "security-critical" in templates
         assert "production-ready" in templates
 
+    def test_save_and_load_policy_file(self, tmp_path):
+        """Test policies round-trip through YAML and JSON files."""
+        manager = PolicyManager(policy_dir=tmp_path)
+        policy = manager.create_policy_from_template(
+            "security-review-required",
+            "sensitive-files"
+        )
+
+        for suffix in ('.yaml', '.json'):
+            file_path = manager.save_policy(policy, tmp_path / f"policy{suffix}")
+            loaded = PolicyManager(policy_dir=tmp_path).load_policy_file(file_path)
+
+            assert loaded.id == "sensitive-files"
+            assert loaded.config.file_patterns == policy.config.file_patterns
+            assert loaded.config.approval.required_teams == {"security"}
+
+    
+    def test_export_policies(self, tmp_path):
+        """Test exporting all registered policies."""
+        manager = PolicyManager(policy_dir=tmp_path)
+        manager.load_enterprise_policies()
+        
+        count = manager.export_policies(tmp_path / "export")
+        
+        assert count == len(manager.list_templates())
+        for policy in manager.get_engine().list_policies():
+            exported = tmp_path / "export" / f"{policy.id}.yaml"
+            assert PolicyManager().load_policy_file(exported).id == policy.id
 
 class TestPolicyEnforcer:
     """Test PolicyEnforcer functionality."""
@@ -0,0 +1,45 @@
+"""
+Tests for the provider factory.
+"""
+
+import subprocess
+import sys
+
+import pytest
+
+from reviewr.config.schema import ProviderConfig
+from reviewr.providers import ProviderFactory
+from reviewr.utils.cache import LLMResponseCache
+
+
+class TestProviderFactory:
+    """Test ProviderFactory provider creation."""
+
+    def test_import_loads_no_provider_sdk(self):
+        """Test importing the factory leaves every provider and its SDK unloaded."""
+        code = (
+            "import sys, reviewr.providers\n"
+            "loaded = [m for m in ('anthropic', 'openai', 'google.generativeai',"
+            " 'reviewr.providers.claude', 'reviewr.providers.gemini') if m in sys.modules]\n"
+            "print(loaded)"
+        )
+        result = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+
+        assert result.stdout.strip() == "[]"
+
+    def test_create_provider(self, tmp_path):
+        """Test a provider is imported on demand and built from its configuration."""
+        cache = LLMResponseCache(cache_dir=tmp_path)
+        config = ProviderConfig(api_key="test-key", model="gpt-4o", max_tokens=1024)
+
+        provider = ProviderFactory.create_provider("openai", config, cache)
+
+        assert type(provider).__name__ == "OpenAIProvider"
+        assert (provider.model, provider.max_tokens, provider.response_cache) == ("gpt-4o", 1024, cache)
+
+    def test_unknown_provider_and_missing_key(self):
+        """Test unknown providers and missing API keys are rejected."""
+        with pytest.raises(ValueError, match="Available providers: claude, openai"):
+            ProviderFactory.create_provider("unknown", ProviderConfig(api_key="key", model="m"))
+        with pytest.raises(ValueError, match="API key not configured"):
+            ProviderFactory.create_provider("gemini", ProviderConfig(model="gemini-pro"))
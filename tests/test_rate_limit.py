@@ -0,0 +1,37 @@
+"""
+Tests for client-side rate limiting.
+"""
+
+import asyncio
+
+from reviewr.utils import rate_limit
+from reviewr.utils.rate_limit import AsyncTokenBucket
+
+
+async def test_token_bucket_waits_for_refill(monkeypatch):
+    """Test a full bucket allows a burst, then callers wait for the refill in turn."""
+    waits = []
+
+    async def fake_sleep(seconds):
+        waits.append(round(seconds, 3))
+
+    monkeypatch.setattr(rate_limit.asyncio, "sleep", fake_sleep)
+    now = [100.0]
+    monkeypatch.setattr(rate_limit.time, "monotonic", lambda: now[0])
+    bucket = AsyncTokenBucket(tokens_per_minute=600)  # 10 tokens per second
+
+    await bucket.acquire(600)
+    await bucket.acquire(50)
+    await bucket.acquire(50)
+    now[0] += 5.0
+    await bucket.acquire(10)
+
+    # The second caller waits behind the first one's reservation
+    assert waits == [5.0, 10.0, 6.0]
+
+
+async def test_token_bucket_caps_oversized_requests():
+    """Test a request larger than the bucket doesn't wait forever."""
+    bucket = AsyncTokenBucket(tokens_per_minute=60000)
+
+    await asyncio.wait_for(bucket.acquire(10 ** 9), timeout=1)
@@ -314,6 +314,98 @@ class TestReviewResultEnhancements:
         assert deduplicated_result.total_chunks == 5  # Preserved
 
 
+
+class TestReviewFinding:
+    """Test the ReviewFinding data layout."""
+    
+    def test_findings_are_frozen_and_hashable(self, sample_findings):
+        """Test findings can't be mutated and equal findings dedupe in a set."""
+        finding = sample_findings[0]
+        
+        with pytest.raises(AttributeError):
+            finding.severity = 'low'
+        assert len(set(sample_findings + sample_findings)) == len(sample_findings)
+
+    
+    def test_to_dict_includes_only_set_extended_fields(self):
+        """Test to_dict omits unset extended fields and keeps set ones, including a 0 metric."""
+        plain = ReviewFinding(
+            type=ReviewType.CORRECTNESS, severity='high', file_path='a.py',
+            line_start=1, line_end=2, message='Off by one'
+        )
+        metric = ReviewFinding(
+            type=ReviewType.MAINTAINABILITY, severity='low', file_path='a.py',
+            line_start=1, line_end=2, message='Complex', category='complexity',
+            metric_name='cyclomatic_complexity', metric_value=0.0
+        )
+        
+        assert set(plain.to_dict()) == {
+            'type', 'severity', 'file_path', 'line_start', 'line_end',
+            'message', 'suggestion', 'code_snippet', 'confidence'
+        }
+        assert plain.to_dict()['type'] == 'correctness'
+        assert {k: metric.to_dict()[k] for k in ('category', 'metric_name', 'metric_value')} == {
+            'category': 'complexity', 'metric_name': 'cyclomatic_complexity', 'metric_value': 0.0
+        }
+    
+    def test_positional_fields_match_parsers(self):
+        """Test the leading field order that providers build findings with positionally."""
+        from dataclasses import fields
+
+        assert [field.name for field in fields(ReviewFinding)][:9] == [
+            'type', 'severity', 'file_path', 'line_start', 'line_end',
+            'message', 'suggestion', 'code_snippet', 'confidence'
+        ]
+    
+    def test_review_type_from_value(self):
+        """Test review types are looked up by value, raising KeyError when unknown."""
+        assert all(ReviewType.from_value(rt.value) is rt for rt in ReviewType)
+        with pytest.raises(KeyError):
+            ReviewType.from_value('unknown')
+
+
+class TestReviewInstructions:
+    """Test review instructions are built once per combination of review types."""
+    
+    def test_instructions_follow_requested_order_and_are_reused(self):
+        """Test instructions join per-type sections in order and repeat calls share the string."""
+        from reviewr.providers.base import LLMProvider
+        
+        review_types = [ReviewType.PERFORMANCE, ReviewType.SECURITY, ReviewType.EXPLAIN]
+        instructions = LLMProvider._build_review_instructions(None, review_types, review_types)
+        
+        assert instructions.startswith('PERFORMANCE REVIEW:')
+        assert '\n\nSECURITY REVIEW (CRITICAL FOCUS):' in instructions
+        assert instructions is LLMProvider._build_review_instructions(None, review_types, review_types)
+    
+    def test_secondary_review_types_get_summary_lines(self):
+        """Test only primary review types (by default the first) get detailed instructions."""
+        from reviewr.providers.base import LLMProvider
+        
+        review_types = [ReviewType.CORRECTNESS, ReviewType.PERFORMANCE, ReviewType.STANDARDS]
+        default = LLMProvider._build_review_instructions(None, review_types)
+        chosen = LLMProvider._build_review_instructions(None, review_types, [ReviewType.STANDARDS])
+        
+        assert default.startswith('CORRECTNESS REVIEW:')
+        assert default.endswith('\n\nPERFORMANCE: slow algorithms, N+1 queries, blocking I/O, leaks, no caching'
+                                '\n\nSTANDARDS: language idioms, style, naming, imports, error-handling patterns')
+        assert chosen.startswith('CORRECTNESS: ') and 'STANDARDS REVIEW:' in chosen
+        assert len(default) < len(LLMProvider._build_review_instructions(None, review_types, review_types))
+
+    
+    def test_security_prompt_fills_prebuilt_skeleton(self):
+        """Test the security prompt keeps braces in code and context literally."""
+        from reviewr.providers.base import CodeChunk, LLMProvider
+        
+        chunk = CodeChunk('q = f"{table}"', 'db.py', 7, 7, 'python', context='rows = {}')
+        prompt = LLMProvider._build_security_focused_prompt(LLMProvider, chunk, [ReviewType.SECURITY])
+        
+        assert 'FILE: db.py\nLINES: 7-7\nLANGUAGE: python' in prompt
+        assert '```python\nq = f"{table}"\n```' in prompt
+        assert 'SURROUNDING CODE CONTEXT:\n```python\nrows = {}\n```' in prompt
+        assert prompt.rstrip().endswith('BEGIN ANALYSIS NOW:')
+
+
 if __name__ == '__main__':
     pytest.main([__file__, '-v'])
 